@@ -0,0 +1,209 @@
+"""Apply a script of terminal commands to image files, outside the browser.
+
+The script has one command per line in the syntax typed into the terminal, blank lines and lines starting with
+`#` are skipped. Every image gets its own `Terminal` and `PaintImage` with displays that show nothing, so the
+preview is never rendered, and is written to the output directory once the script ran. Files are processed in
+parallel by a pool of `--jobs` processes.
+
+    python batch.py recipe.txt "photos/*.jpg" --output edited --jobs 8
+"""
+
+import argparse
+import glob
+import os
+import pathlib
+import sys
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import NamedTuple
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.resolve() / "src"))
+
+from image import Box, PaintImage
+from terminal import ERROR_COLOUR, Terminal
+
+# Formats that can't store an alpha channel, images are converted to RGB before saving in them.
+OPAQUE_FORMATS = (".jpg", ".jpeg", ".bmp")
+
+
+class NullImageDisplay:
+    """Image display showing nothing, see `image.ImageDisplay`."""
+
+    def display_image(self, image_src: str, source_size: tuple[int, int] | None = None) -> None:
+        """Ignore a frame."""
+
+    def display_image_bytes(
+        self,
+        data: bytes | memoryview,
+        mime_type: str = "image/png",
+        source_size: tuple[int, int] | None = None,
+    ) -> None:
+        """Ignore a frame."""
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Return None, there is no preview to fit the image in."""
+        return None
+
+    def update_region(self, box: Box, data: bytes) -> None:
+        """Ignore a region."""
+
+    def show_gallery(self, names: list[str]) -> None:
+        """Ignore the gallery."""
+
+    def show_thumbnail(self, name: str, data: bytes, mime_type: str) -> None:
+        """Ignore a thumbnail."""
+
+    def hide_gallery(self) -> None:
+        """Ignore the gallery."""
+
+
+class NullTerminalDisplay:
+    """Terminal display keeping the error lines printed to it, see `terminal.TerminalDisplay`."""
+
+    def __init__(self) -> None:
+        self.terminal: Terminal | None = None
+        self.background_color = ""
+        self.errors: list[str] = []
+
+    def print_terminal_output(self, text: str, color: str | None = None) -> None:
+        """Keep the line if it is an error."""
+        if color == ERROR_COLOUR:
+            self.errors.append(text)
+
+    def print_terminal_lines(self, lines: list[str], color: str | None = None) -> None:
+        """Keep the lines if they are errors."""
+        if color == ERROR_COLOUR:
+            self.errors.extend(lines)
+
+
+class Outcome(NamedTuple):
+    """What happened to one image."""
+
+    source: str
+    output: str | None
+    error: str | None
+
+
+def parse_script(text: str) -> list[str]:
+    """Return the commands of a script, without blank lines and comments."""
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+
+
+def read_script(path: str) -> list[str]:
+    """Return the commands of a script file, `-` reads it from standard input."""
+    return parse_script(sys.stdin.read() if path == "-" else pathlib.Path(path).read_text(encoding="utf-8"))
+
+
+def find_images(patterns: list[str]) -> Iterator[pathlib.Path]:
+    """Yield the files matching paths or glob patterns, each once, in order."""
+    seen = set()
+    for pattern in patterns:
+        # Patterns are matched like a shell would, for shells that don't expand them, e.g. on Windows
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]  # noqa: PTH207
+        for match in matches:
+            path = pathlib.Path(match)
+            if path.is_file() and path not in seen:
+                seen.add(path)
+                yield path
+
+
+def output_path(source: pathlib.Path, output_dir: pathlib.Path, extension: str | None) -> pathlib.Path:
+    """Return where the edited image is written, under its own name and optionally another extension."""
+    return output_dir / (source.stem + (extension or source.suffix))
+
+
+def run_script(
+    load: Callable[[PaintImage], int],
+    commands: list[str],
+    *,
+    keep_going: bool = False,
+) -> tuple[PaintImage, str | None]:
+    """Load an image and run the commands on it, without rendering a preview.
+
+    :param load: loads the image into a `PaintImage` and returns its result, e.g. `PaintImage.load_path`
+    :param keep_going: run the remaining commands after one failed, otherwise the script stops
+    :return: the edited image and None, or the image and why the script stopped
+    """
+    display = NullTerminalDisplay()
+    image = PaintImage(NullImageDisplay())
+    terminal = Terminal(image, display)
+    result = load(image)
+    if result == 1:
+        return image, "could not read the image"
+    if result == 2:  # noqa: PLR2004
+        return image, f"image has more than {image.max_image_pixels} pixels"
+
+    for line, command in enumerate(commands, 1):
+        terminal.run_str(command)
+        if display.errors and not keep_going:
+            return image, f"`{command}` (line {line}): {display.errors[0]}"
+    return image, None
+
+
+def process(
+    source: pathlib.Path,
+    commands: list[str],
+    output: pathlib.Path,
+    *,
+    keep_going: bool = False,
+) -> Outcome:
+    """Run the commands on an image and save it.
+
+    :param keep_going: run the remaining commands after one failed, otherwise the image is skipped
+    """
+    image, error = run_script(lambda image: image.load_path(source), commands, keep_going=keep_going)
+    if error is not None:
+        return Outcome(str(source), None, error)
+
+    img = image.img
+    if output.suffix.lower() in OPAQUE_FORMATS and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    try:
+        img.save(output)
+    except (OSError, ValueError) as e:
+        return Outcome(str(source), None, f"could not save {output}: {e}")
+    return Outcome(str(source), str(output), None)
+
+
+def main() -> int:
+    """Run the script on every image, return 1 if any image failed."""
+    parser = argparse.ArgumentParser(description="Apply a script of terminal commands to image files.")
+    parser.add_argument("script", help="file with one command per line, - to read it from standard input")
+    parser.add_argument("images", nargs="+", help="image files or glob patterns, e.g. 'photos/**/*.jpg'")
+    parser.add_argument("--output", "-o", type=pathlib.Path, required=True, help="directory to write images to")
+    parser.add_argument("--format", help="extension of the written images, e.g. png, the input's by default")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="processes to use, default all cores")
+    parser.add_argument("--keep-going", action="store_true", help="don't skip an image when a command fails")
+    args = parser.parse_args()
+
+    commands = read_script(args.script)
+    sources = list(find_images(args.images))
+    if not sources:
+        print("No images found.")
+        return 1
+    args.output.mkdir(parents=True, exist_ok=True)
+    extension = f".{args.format.lstrip('.')}" if args.format else None
+    jobs = [(source, output_path(source, args.output, extension)) for source in sources]
+    if len({output for _, output in jobs}) < len(jobs):
+        print("Images with the same name would overwrite each other in the output directory.")
+        return 1
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        futures = [
+            executor.submit(process, source, commands, output, keep_going=args.keep_going) for source, output in jobs
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            outcome = future.result()
+            if outcome.error is None:
+                print(f"[{done}/{len(jobs)}] {outcome.source} -> {outcome.output}")
+            else:
+                failed += 1
+                print(f"[{done}/{len(jobs)}] {outcome.source}: {outcome.error}", file=sys.stderr)
+
+    print(f"{len(jobs) - failed} of {len(jobs)} images written to {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Headless benchmarks of `PaintImage` and the command layer, run with `python -m benchmarks`.
+
+The app modules are imported from `src` on plain CPython, with stub displays in place of the GUI.
+"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent.resolve() / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
@@ -0,0 +1,48 @@
+"""Command line of the benchmarks, see `python -m benchmarks --help`."""
+
+import argparse
+import pathlib
+import sys
+
+from benchmarks.runner import check, measure, save
+from benchmarks.scenarios import SCENARIOS, SIZES, Workload
+
+
+def main() -> int:
+    """Run the benchmarks, return 1 if any regressed against the baseline."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark PaintImage and commands.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), metavar="NAME")
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=list(SIZES), metavar="SIZE")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each case")
+    parser.add_argument("--output", type=pathlib.Path, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", type=pathlib.Path, help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative slowdown, default 0.1")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and sizes")
+    args = parser.parse_args()
+
+    if args.list:
+        for scenario in SCENARIOS.values():
+            print(f"{scenario.name:<12} {scenario.description}")
+        print("sizes:", ", ".join(f"{name} ({width}x{height})" for name, (width, height) in SIZES.items()))
+        return 0
+
+    print(f"{'scenario':<12} {'size':<8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+    results = []
+    for size_name in args.sizes:
+        for name in args.scenarios:
+            result = measure(SCENARIOS[name], Workload(SIZES[size_name]), size_name, min_time=args.min_time)
+            results.append(result)
+            print(
+                f"{name:<12} {size_name:<8} {result['ops_per_sec']:>10.1f} {result['p50_ms']:>9.3f} "
+                f"{result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['peak_memory_kib']:>9.0f}",
+            )
+
+    if args.output is not None:
+        save(results, args.output)
+    if args.baseline is not None:
+        return check(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""Shim of Pyodide's `js` module, the globals of the fake page modelled in `benchmarks.dom`."""
+
+from typing import Any
+
+from benchmarks import dom
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    return getattr(dom.browser, name)
@@ -0,0 +1 @@
+"""Shim of Pyodide's `pyodide` package, only `pyodide.ffi`, see `benchmarks.dom`."""
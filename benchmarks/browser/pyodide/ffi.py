@@ -0,0 +1,5 @@
+"""Shim of `pyodide.ffi`, proxies are counted in `benchmarks.dom.stats`."""
+
+from benchmarks.dom import PyProxy, create_once_callable, create_proxy, to_js
+
+__all__ = ["PyProxy", "create_once_callable", "create_proxy", "to_js"]
@@ -0,0 +1,755 @@
+"""A model of the parts of the browser the GUI uses, so it runs on plain CPython.
+
+`install` puts the `js` and `pyodide` shim packages from `benchmarks/browser` on `sys.path`, they expose the
+objects defined here. Every crossing between Python and the fake JS side is counted in `stats`: property reads
+and writes, method calls, conversions and calls of Python proxies from JS. Nothing is rendered, layout metrics
+are fixed values that can be set on the elements.
+
+Timers, animation frames and asynchronous events like an image load are queued, `run_pending` runs them.
+"""
+
+import itertools
+import json
+import math
+import sys
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+SHIM_DIR = Path(__file__).parent.resolve() / "browser"
+
+# Methods changing the document, counted as DOM operations along with property writes on nodes.
+DOM_MUTATIONS = frozenset(
+    {
+        "appendChild",
+        "replaceChildren",
+        "removeChild",
+        "remove",
+        "setAttribute",
+        "setProperty",
+        "add",
+        "toggle",
+        "drawImage",
+        "putImageData",
+    },
+)
+# Height of a line of text and width of a character in pixels, text wider than an element wraps onto more lines.
+LINE_HEIGHT = 18
+CHAR_WIDTH = 8
+
+
+def text_height(text: str, width: int) -> int:
+    """Return the height of text wrapped to lines of a width, both in pixels."""
+    return LINE_HEIGHT * max(math.ceil(len(text) * CHAR_WIDTH / width), 1)
+
+
+# Layout metrics of elements, what the page would compute.
+LAYOUT_DEFAULTS = {
+    "clientWidth": 800,
+    "clientHeight": 400,
+    "offsetLeft": 0,
+    "offsetTop": 0,
+    "scrollHeight": 0,
+    "scrollTop": 0,
+}
+
+
+class Stats:
+    """Counts of the operations done on the fake JS side."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear the counts."""
+        self.ops: Counter[str] = Counter()
+        self.ffi = 0
+        self.dom_ops = 0
+        self.proxies_created = 0
+        self.proxies_destroyed = 0
+
+    @property
+    def live_proxies(self) -> int:
+        """Proxies created and not destroyed yet, these keep their Python objects alive."""
+        return self.proxies_created - self.proxies_destroyed
+
+    def count(self, op: str, *, dom: bool = False) -> None:
+        """Count an operation crossing the FFI, `dom` if it changes the document."""
+        self.ops[op] += 1
+        self.ffi += 1
+        if dom:
+            self.dom_ops += 1
+
+    def snapshot(self) -> dict[str, int]:
+        """Return the totals."""
+        return {
+            "ffi": self.ffi,
+            "dom_ops": self.dom_ops,
+            "proxies_created": self.proxies_created,
+            "live_proxies": self.live_proxies,
+        }
+
+
+stats = Stats()
+_tasks: deque[Callable[[], object]] = deque()
+_frames: deque[Callable[[float], object]] = deque()
+
+
+class JsObject:
+    """A JS object: reading and writing its properties and calling its methods is counted.
+
+    Properties live in `_props`. Methods are Python methods named like the JS ones, calling `_call` to be counted.
+    Reading a missing property gives None, like `undefined` converted by Pyodide.
+    """
+
+    _dom = False
+
+    def __init__(self, **props: Any) -> None:  # noqa: ANN401
+        object.__setattr__(self, "_props", dict(props))
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        if name.startswith("_"):
+            raise AttributeError(name)
+        stats.count("get")
+        getter = getattr(type(self), f"_get_{name}", None)
+        if getter is not None:
+            return getter(self)
+        return self._props.get(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:  # noqa: ANN401
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+            return
+        stats.count("set", dom=self._dom)
+        setter = getattr(type(self), f"_set_{name}", None)
+        if setter is not None:
+            setter(self, value)
+        else:
+            self._props[name] = value
+
+    def _call(self, method: str) -> None:
+        stats.count(method, dom=self._dom and method in DOM_MUTATIONS)
+
+
+class Event(JsObject):
+    """A DOM event, given to listeners."""
+
+    def __init__(self, event_type: str, target: JsObject | None = None, **props: Any) -> None:  # noqa: ANN401
+        super().__init__(type=event_type, target=target, defaultPrevented=False, **props)
+
+    def preventDefault(self) -> None:  # noqa: N802
+        """Cancel the default action."""
+        self._call("preventDefault")
+        self._props["defaultPrevented"] = True
+
+    def stopPropagation(self) -> None:  # noqa: N802
+        """Stop the event from reaching the parents of the target."""
+        self._call("stopPropagation")
+        self._props["propagationStopped"] = True
+
+
+class EventTarget(JsObject):
+    """An object with event listeners."""
+
+    def __init__(self, **props: Any) -> None:  # noqa: ANN401
+        super().__init__(**props)
+        self._listeners: dict[str, list[Callable[[Any], object]]] = {}
+
+    def addEventListener(self, event_type: str, listener: Callable[[Any], object]) -> None:  # noqa: N802
+        """Add a listener, a Python callable has to be a proxy to outlive the call."""
+        self._call("addEventListener")
+        self._listeners.setdefault(event_type, []).append(listener)
+
+    def removeEventListener(self, event_type: str, listener: Callable[[Any], object]) -> None:  # noqa: N802
+        """Remove a listener."""
+        self._call("removeEventListener")
+        listeners = self._listeners.get(event_type, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    def listener_count(self, event_type: str | None = None) -> int:
+        """Return the number of listeners, for one type of event or all of them."""
+        if event_type is not None:
+            return len(self._listeners.get(event_type, ()))
+        return sum(len(listeners) for listeners in self._listeners.values())
+
+    def dispatch(self, event_type: str, **props: Any) -> Event:  # noqa: ANN401
+        """Fire an event on this object, calling its listeners and then those of its parents.
+
+        Not counted itself, the calls of the listeners are.
+        """
+        event = Event(event_type, target=self, **props)
+        target: EventTarget | None = self
+        while target is not None and not event._props.get("propagationStopped"):
+            for listener in list(target._listeners.get(event_type, ())):
+                stats.count("callback")
+                listener(event)
+            target = target._parent if isinstance(target, Node) else None
+        return event
+
+
+class CSSStyleDeclaration(JsObject):
+    """Inline style of an element, CSS variables are read back with `getPropertyValue`."""
+
+    _dom = True
+
+    def setProperty(self, name: str, value: str) -> None:  # noqa: N802
+        """Set a CSS property or variable."""
+        self._call("setProperty")
+        self._props[name] = value
+
+    def getPropertyValue(self, name: str) -> str:  # noqa: N802
+        """Return a CSS property or variable, "" if not set."""
+        self._call("getPropertyValue")
+        return self._props.get(name, "")
+
+
+class DOMTokenList(JsObject):
+    """`classList` of an element, kept in sync with its `className`."""
+
+    _dom = True
+
+    def __init__(self, element: "Element") -> None:
+        super().__init__()
+        self._element = element
+
+    def _classes(self) -> list[str]:
+        return self._element._props.get("className", "").split()
+
+    def _store(self, classes: list[str]) -> None:
+        self._element._props["className"] = " ".join(classes)
+
+    def add(self, name: str) -> None:
+        """Add a class."""
+        self._call("add")
+        if name not in self._classes():
+            self._store([*self._classes(), name])
+
+    def remove(self, name: str) -> None:
+        """Remove a class."""
+        self._call("remove")
+        self._store([cls for cls in self._classes() if cls != name])
+
+    def toggle(self, name: str) -> bool:
+        """Add a class if missing, otherwise remove it."""
+        self._call("toggle")
+        classes = self._classes()
+        if name in classes:
+            self._store([cls for cls in classes if cls != name])
+            return False
+        self._store([*classes, name])
+        return True
+
+    def contains(self, name: str) -> bool:
+        """Return whether the element has a class."""
+        self._call("contains")
+        return name in self._classes()
+
+
+class Node(EventTarget):
+    """A node of the document tree."""
+
+    _dom = True
+
+    def __init__(self, **props: Any) -> None:  # noqa: ANN401
+        super().__init__(**props)
+        self._parent: Node | None = None
+        self._children: list[Node] = []
+
+    def _get_parentElement(self) -> "Node | None":  # noqa: N802
+        return self._parent
+
+    def _get_childElementCount(self) -> int:  # noqa: N802
+        return len(self._children)
+
+    def _get_children(self) -> list["Node"]:
+        return list(self._children)
+
+    def appendChild(self, child: "Node") -> "Node":  # noqa: N802
+        """Append a node, moving it from its current parent, or the children of a fragment."""
+        self._call("appendChild")
+        self._append(child)
+        return child
+
+    def replaceChildren(self, *nodes: "Node") -> None:  # noqa: N802
+        """Replace all children with the nodes, or the children of fragments among them."""
+        self._call("replaceChildren")
+        for child in self._children:
+            child._parent = None
+        self._children = []
+        for node in nodes:
+            self._append(node)
+
+    def _append(self, child: "Node") -> None:
+        if isinstance(child, DocumentFragment):
+            for grandchild in list(child._children):
+                self._append(grandchild)
+            return
+        if child._parent is not None:
+            child._parent._children.remove(child)
+        child._parent = self
+        self._children.append(child)
+
+    def removeChild(self, child: "Node") -> "Node":  # noqa: N802
+        """Remove a child node."""
+        self._call("removeChild")
+        if child._parent is not self:
+            msg = "NotFoundError: the node to be removed is not a child of this node"
+            raise ValueError(msg)
+        self._children.remove(child)
+        child._parent = None
+        return child
+
+    def remove(self) -> None:
+        """Remove the node from its parent."""
+        self._call("remove")
+        if self._parent is not None:
+            self._parent._children.remove(self)
+            self._parent = None
+
+    def iter_tree(self) -> Iterator["Node"]:
+        """Yield the node and all its descendants, not counted."""
+        yield self
+        for child in self._children:
+            yield from child.iter_tree()
+
+
+class DocumentFragment(Node):
+    """A fragment collecting nodes, appending it moves its children instead."""
+
+
+class Element(Node):
+    """An HTML element."""
+
+    def __init__(self, tag_name: str, **props: Any) -> None:  # noqa: ANN401
+        super().__init__(tagName=tag_name.upper(), className="", textContent="", innerHTML="", **props)
+        self._props["style"] = CSSStyleDeclaration()
+        self._props["classList"] = DOMTokenList(self)
+        self._attributes: dict[str, str] = {}
+        self._context: CanvasRenderingContext2D | None = None
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        if not name.startswith("_") and name not in self._props and name in LAYOUT_DEFAULTS:
+            stats.count("get")
+            return LAYOUT_DEFAULTS[name]
+        return super().__getattr__(name)
+
+    def _get_offsetHeight(self) -> int:  # noqa: N802
+        if "offsetHeight" in self._props:
+            return self._props["offsetHeight"]
+        return text_height(self._props["textContent"], self._props.get("clientWidth", LAYOUT_DEFAULTS["clientWidth"]))
+
+    def _set_textContent(self, value: str) -> None:  # noqa: N802
+        self._props["textContent"] = value
+        self._children.clear()
+
+    def _set_innerHTML(self, value: str) -> None:  # noqa: N802
+        self._props["innerHTML"] = value
+        self._children.clear()
+
+    def setAttribute(self, name: str, value: str) -> None:  # noqa: N802
+        """Set an attribute, `id` and `style` also set the properties of the same name."""
+        self._call("setAttribute")
+        self._attributes[name] = value
+        if name == "id":
+            self._props["id"] = value
+        elif name == "style":
+            self._props["style"]._props["cssText"] = value
+
+    def getAttribute(self, name: str) -> str | None:  # noqa: N802
+        """Return an attribute, None if not set."""
+        self._call("getAttribute")
+        return self._attributes.get(name)
+
+    def user_types(self, text: str) -> None:
+        """Set the value of an input like the user typing it would, not counted."""
+        self._props["value"] = text
+
+    def user_picks(self, *files: "File") -> None:
+        """Pick files in a file input and fire its change event, like the user in the file dialog would."""
+        self._props["files"] = FileList(files)
+        self.dispatch("change")
+
+    def click(self) -> None:
+        """Fire a click event."""
+        self._call("click")
+        self.dispatch("click")
+
+    def focus(self) -> None:
+        """Focus the element."""
+        self._call("focus")
+
+    def getContext(self, _context_type: str, _options: Any = None) -> "CanvasRenderingContext2D":  # noqa: ANN401, N802
+        """Return the 2D context of a canvas."""
+        self._call("getContext")
+        if self._context is None:
+            self._context = CanvasRenderingContext2D(self)
+        return self._context
+
+
+class HTMLImageElement(Element):
+    """An image, setting `src` fires `load` once the pending tasks run, with `natural_size` as its size."""
+
+    natural_size = (400, 250)
+
+    def __init__(self) -> None:
+        super().__init__("img")
+
+    def _set_src(self, value: str) -> None:
+        self._props["src"] = value
+        self._props["naturalWidth"], self._props["naturalHeight"] = self.natural_size
+        _tasks.append(lambda: self.dispatch("load"))
+
+
+class CanvasRenderingContext2D(JsObject):
+    """2D context of a canvas, drawing is only counted."""
+
+    _dom = True
+
+    def __init__(self, canvas: Element) -> None:
+        super().__init__(canvas=canvas)
+
+    def drawImage(self, *_args: Any) -> None:  # noqa: ANN401, N802
+        """Draw an image into the canvas."""
+        self._call("drawImage")
+
+    def putImageData(self, *_args: Any) -> None:  # noqa: ANN401, N802
+        """Copy pixels into the canvas."""
+        self._call("putImageData")
+
+    def getImageData(self, _x: int, _y: int, width: int, height: int) -> JsObject:  # noqa: N802
+        """Return transparent black pixels."""
+        self._call("getImageData")
+        return JsObject(data=[0] * (width * height * 4), width=width, height=height)
+
+
+class Document(Node):
+    """The document, with a `head`, a `body` and the loading screen of `index.html`."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._props["head"] = Element("head")
+        self._props["body"] = Element("body")
+        loading = Element("div", id="loading")
+        self._props["body"]._children.append(loading)
+        loading._parent = self._props["body"]
+
+    def createElement(self, tag_name: str) -> Element:  # noqa: N802
+        """Create an element, an `img` when created through `Image.new`."""
+        self._call("createElement")
+        return Element(tag_name)
+
+    def createDocumentFragment(self) -> DocumentFragment:  # noqa: N802
+        """Create an empty fragment."""
+        self._call("createDocumentFragment")
+        return DocumentFragment()
+
+    def getElementById(self, element_id: str) -> Element | None:  # noqa: N802
+        """Return the element with an id in the body, None if there is none."""
+        self._call("getElementById")
+        for node in self._props["body"].iter_tree():
+            if node._props.get("id") == element_id:
+                return node
+        return None
+
+    def getComputedStyle(self, element: Element) -> CSSStyleDeclaration:  # noqa: N802
+        """Return the inline style, there are no style sheets to compute the style from."""
+        self._call("getComputedStyle")
+        return element._props["style"]
+
+
+class Selection(JsObject):
+    """An empty text selection."""
+
+    def toString(self) -> str:  # noqa: N802
+        """Return the selected text."""
+        self._call("toString")
+        return ""
+
+
+class Window(EventTarget):
+    """The window, only the properties the GUI reads."""
+
+    def __init__(self) -> None:
+        super().__init__(devicePixelRatio=1)
+
+    def getSelection(self) -> Selection:  # noqa: N802
+        """Return the text selection."""
+        self._call("getSelection")
+        return Selection()
+
+
+class ArrayBuffer(JsObject):
+    """Bytes owned by JS."""
+
+    def __init__(self, data: bytes) -> None:
+        super().__init__(byteLength=len(data))
+        self._data = bytes(data)
+
+    def to_bytes(self) -> bytes:
+        """Copy the bytes into Python, see `JsBuffer.to_bytes`."""
+        stats.count("to_bytes")
+        return self._data
+
+
+class File(JsObject):
+    """A file picked or dropped by the user."""
+
+    def __init__(self, data: bytes, name: str = "image.png", mime_type: str = "image/png") -> None:
+        super().__init__(name=name, type=mime_type, size=len(data))
+        self._data = bytes(data)
+
+
+class FileList(JsObject):
+    """Files picked in a file input."""
+
+    def __init__(self, files: tuple[File, ...]) -> None:
+        super().__init__(length=len(files))
+        self._files = files
+
+    def item(self, index: int) -> File:
+        """Return a file."""
+        self._call("item")
+        return self._files[index]
+
+
+class FileReader(EventTarget):
+    """Reads files, `load` and then `loadend` fire once the pending tasks run."""
+
+    def readAsArrayBuffer(self, file: File) -> None:  # noqa: N802
+        """Read a file, its contents are the `result` on load."""
+        self._call("readAsArrayBuffer")
+
+        def load() -> None:
+            self._props["result"] = ArrayBuffer(file._data)
+            self.dispatch("load")
+            self.dispatch("loadend")
+
+        _tasks.append(load)
+
+
+class Worker(EventTarget):
+    """A Web Worker, messages posted to it are kept in `messages`."""
+
+    def __init__(self, url: str) -> None:
+        super().__init__(url=url)
+        self._messages: list[Any] = []
+
+    def postMessage(self, message: Any, _transfer: Any = None) -> None:  # noqa: ANN401, N802
+        """Keep a message posted to the worker."""
+        self._call("postMessage")
+        self._messages.append(message)
+
+
+class Constructor:
+    """A JS class, instantiated with `new` like through Pyodide."""
+
+    def __init__(self, factory: Callable[..., Any], name: str) -> None:
+        self.factory = factory
+        self.name = name
+
+    def new(self, *args: Any) -> Any:  # noqa: ANN401
+        """Create an instance."""
+        stats.count(f"new {self.name}")
+        return self.factory(*args)
+
+
+class ObjectURLs:
+    """`URL` with its object URLs, `live` holds the ones not revoked yet."""
+
+    def __init__(self) -> None:
+        self.live: dict[str, Any] = {}
+        self._ids = itertools.count(1)
+
+    def createObjectURL(self, blob: Any) -> str:  # noqa: ANN401, N802
+        """Return a URL of a Blob."""
+        stats.count("createObjectURL")
+        url = f"blob:shim/{next(self._ids)}"
+        self.live[url] = blob
+        return url
+
+    def revokeObjectURL(self, url: str) -> None:  # noqa: N802
+        """Release a URL of a Blob."""
+        stats.count("revokeObjectURL")
+        self.live.pop(url, None)
+
+
+class Performance:
+    """`performance`, on the clock of `time.perf_counter`."""
+
+    def __init__(self) -> None:
+        self.timeOrigin = time.time() * 1000
+        self._start = time.perf_counter()
+
+    def now(self) -> float:
+        """Return milliseconds since the time origin."""
+        stats.count("now")
+        return (time.perf_counter() - self._start) * 1000
+
+
+class Browser:
+    """The globals of the fake page, what `import js` gives."""
+
+    def __init__(self) -> None:
+        self.document = Document()
+        self.window = Window()
+        self.globalThis = JsObject()
+        self.performance = Performance()
+        self.URL = ObjectURLs()
+        self.Object = JsObject(fromEntries=from_entries)
+        self.JSON = JsObject(parse=json.loads, stringify=json.dumps)
+        self.Blob = Constructor(lambda parts, options=None: JsObject(parts=parts, options=options), "Blob")
+        self.Image = Constructor(HTMLImageElement, "Image")
+        self.ImageData = Constructor(
+            lambda data, width, height: JsObject(data=data, width=width, height=height),
+            "ImageData",
+        )
+        self.FileReader = Constructor(FileReader, "FileReader")
+        self.Worker = Constructor(Worker, "Worker")
+
+    def setTimeout(self, callback: Callable[[], object], _delay: float = 0) -> None:  # noqa: N802
+        """Queue a callback as a task."""
+        stats.count("setTimeout")
+        _tasks.append(callback)
+
+    def requestAnimationFrame(self, callback: Callable[[float], object]) -> None:  # noqa: N802
+        """Queue a callback for the next frame."""
+        stats.count("requestAnimationFrame")
+        _frames.append(callback)
+
+
+def from_entries(entries: Iterable[tuple[str, Any]] | dict[str, Any]) -> JsObject:
+    """`Object.fromEntries`, the `dict_converter` of `to_js`."""
+    return JsObject(**dict(entries))
+
+
+class PyBuffer:
+    """A Python buffer lent to JS, see `PyProxy.getBuffer`."""
+
+    def __init__(self, data: memoryview) -> None:
+        self.data = data
+        self.released = False
+
+    def release(self) -> None:
+        """Give the buffer back."""
+        stats.count("release")
+        self.released = True
+
+
+class PyProxy:
+    """A Python object handed to JS, kept alive until destroyed.
+
+    A proxy made by `create_once_callable` destroys itself after its call.
+    """
+
+    def __init__(self, obj: Any, *, once: bool = False) -> None:  # noqa: ANN401
+        self._obj = obj
+        self._once = once
+        self.destroyed = False
+        stats.proxies_created += 1
+
+    def __call__(self, *args: Any) -> Any:  # noqa: ANN401
+        """Call the Python object, like JS calling the proxy."""
+        if self.destroyed:
+            msg = "This borrowed proxy was automatically destroyed"
+            raise RuntimeError(msg)
+        try:
+            return self._obj(*args)
+        finally:
+            if self._once:
+                self.destroy()
+
+    def destroy(self) -> None:
+        """Release the Python object."""
+        if not self.destroyed:
+            self.destroyed = True
+            stats.proxies_destroyed += 1
+
+    def getBuffer(self, _buffer_type: str = "u8") -> PyBuffer:  # noqa: N802
+        """Lend the buffer of the object to JS."""
+        stats.count("getBuffer")
+        return PyBuffer(memoryview(self._obj))
+
+
+def create_proxy(obj: Any) -> PyProxy:  # noqa: ANN401
+    """`pyodide.ffi.create_proxy`."""
+    stats.count("create_proxy")
+    return PyProxy(obj)
+
+
+def create_once_callable(func: Callable[..., Any]) -> PyProxy:
+    """`pyodide.ffi.create_once_callable`."""
+    stats.count("create_once_callable")
+    return PyProxy(func, once=True)
+
+
+def to_js(obj: Any, *, dict_converter: Callable[[Any], Any] | None = None, **_options: Any) -> Any:  # noqa: ANN401
+    """`pyodide.ffi.to_js`, lists become lists and dicts go through `dict_converter`."""
+    stats.count("to_js")
+
+    def convert(value: Any) -> Any:  # noqa: ANN401
+        if isinstance(value, dict):
+            items = [(key, convert(item)) for key, item in value.items()]
+            return dict_converter(items) if dict_converter is not None else dict(items)
+        if isinstance(value, list | tuple):
+            return [convert(item) for item in value]
+        return value
+
+    return convert(obj)
+
+
+browser = Browser()
+
+
+def install() -> None:
+    """Make `import js` and `import pyodide` give the shim, has to run before the GUI is imported."""
+    if str(SHIM_DIR) not in sys.path:
+        sys.path.insert(0, str(SHIM_DIR))
+
+
+def reset() -> Browser:
+    """Start over with an empty page, cleared counts and no pending tasks."""
+    global browser  # noqa: PLW0603
+    stats.reset()
+    browser = Browser()
+    _tasks.clear()
+    _frames.clear()
+    return browser
+
+
+def run_pending(max_rounds: int = 100) -> int:
+    """Run queued tasks and animation frames, including ones they queue, like the event loop would.
+
+    :return: number of callbacks run
+    """
+    ran = 0
+    for _ in range(max_rounds):
+        if not _tasks and not _frames:
+            break
+        while _tasks:
+            stats.count("callback")
+            _tasks.popleft()()
+            ran += 1
+        frames = list(_frames)
+        _frames.clear()
+        timestamp = browser.performance.now()
+        for frame in frames:
+            stats.count("callback")
+            frame(timestamp)
+            ran += 1
+    return ran
+
+
+@contextmanager
+def counting() -> Iterator[dict[str, int]]:
+    """Count the operations done in the `with` block, the counts are filled in when it ends."""
+    before = stats.snapshot()
+    counts: dict[str, int] = {}
+    try:
+        yield counts
+    finally:
+        after = stats.snapshot()
+        counts.update({key: after[key] - before[key] for key in after})
@@ -0,0 +1,222 @@
+"""GUI benchmarks on the fake browser of `benchmarks.dom`, run with `python -m benchmarks.gui`.
+
+Commands are typed into the terminal and submitted with Enter like a user would, with the engine running on the
+page. Besides timings each case reports the DOM operations, FFI crossings and proxies left alive per operation.
+These counts don't depend on the machine, comparing them against a baseline catches extra DOM work and leaks.
+"""
+
+import argparse
+import io
+import itertools
+import pathlib
+import sys
+from typing import Any
+
+from PIL import Image
+
+from benchmarks import dom
+from benchmarks.dom import LAYOUT_DEFAULTS
+from benchmarks.runner import check, measure, save
+from benchmarks.scenarios import Scenario
+
+KEYCODE_ENTER = 13
+
+
+class Page:
+    """A fake page with the app's layout on it, the terminal and image engine running on the page.
+
+    :param reset: start from an empty page with cleared counts, otherwise the layout is added to the current page
+    """
+
+    def __init__(self, *, reset: bool = True) -> None:
+        dom.install()
+        if reset:
+            dom.reset()
+        # The GUI imports `js` when imported, only possible once the shim is installed
+        from gui.element import Element  # noqa: PLC0415
+        from gui.layout import Layout  # noqa: PLC0415
+
+        self.layout = Layout(parent=Element(element=dom.browser.document.body))
+        dom.run_pending()
+        self.text_input = self.layout.terminal_gui.input.text_input.html_element
+        self.canvas = self.layout.image_preview.image_manager.image_element.html_element
+
+    def submit(self, command: str) -> None:
+        """Type a command, press Enter and let the page render the result."""
+        self.text_input.user_types(command)
+        self.text_input.dispatch("keydown", keyCode=KEYCODE_ENTER, key="Enter")
+        dom.run_pending()
+
+    def type(self, text: str) -> None:
+        """Type text into the terminal, which shows the predicted command."""
+        self.text_input.user_types(text)
+        self.text_input.dispatch("input")
+        dom.run_pending()
+
+
+def _png(size: tuple[int, int]) -> bytes:
+    buffer = io.BytesIO()
+    Image.linear_gradient("L").resize(size).convert("RGB").save(buffer, "png")
+    return buffer.getvalue()
+
+
+UPLOAD = dom.File(_png((800, 500)))
+
+
+def _open_page(_page: Page) -> None:
+    Page(reset=False)
+
+
+def _mouse_move(page: Page) -> None:
+    page.canvas.dispatch("mousemove", clientX=120, clientY=80)
+
+
+def _upload_click(page: Page) -> None:
+    preview = page.layout.image_preview
+    preview.html_element.click()
+    preview.file_handler.file_input.html_element.user_picks(UPLOAD)
+    dom.run_pending()
+
+
+def _window_resize(_page: Page) -> None:
+    for _ in range(10):
+        dom.browser.window.dispatch("resize")
+    dom.run_pending()
+
+
+def _gallery(page: Page) -> None:
+    page.submit("gallery")
+    page.submit("gallery close")
+
+
+def _upload(page: Page) -> None:
+    page.layout.image_preview.file_handler.process_file(UPLOAD)
+    dom.run_pending()
+
+
+GUI_SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("startup", "build the layout and render the default image", _open_page),
+        Scenario("ping", "submit `ping`", lambda page: page.submit("ping")),
+        Scenario("help", "submit `help`, printing the list of commands", lambda page: page.submit("help")),
+        Scenario("help_page", "submit `help ls`, printing a page of help", lambda page: page.submit("help ls")),
+        Scenario("draw_line", "submit `draw_line` and render it", lambda page: page.submit("draw_line 0 0 99 60")),
+        Scenario("typing", "type a partial command and show its prediction", lambda page: page.type("draw_li")),
+        Scenario("mouse_move", "move the mouse over the preview", _mouse_move),
+        Scenario("window_resize", "resize the window 10 times in one frame", _window_resize),
+        Scenario("upload", "read an uploaded 800x500 PNG and display it", _upload),
+        Scenario("upload_click", "click the preview and pick the 800x500 PNG in the file dialog", _upload_click),
+        Scenario("gallery", "open the gallery of saved images from cached thumbnails and close it", _gallery),
+    )
+}
+
+
+def soak(names: list[str], runs: int) -> int:
+    """Run each scenario `runs` times on one page, return 1 if any left proxies alive.
+
+    Counting starts after a first run, which may create what later runs reuse, e.g. the file input of uploads.
+    Building a page keeps its listeners for as long as the page is open, `startup` is left out.
+    """
+    dom.install()
+    from gui.element import live_listeners  # noqa: PLC0415
+
+    print(f"{'scenario':<12} {'runs':>8} {'proxies':>8} {'listeners':>10}")
+    leaked = False
+    for name in names:
+        if name == "startup":
+            continue
+        page = Page()
+        GUI_SCENARIOS[name].run(page)
+        proxies, listeners = dom.stats.live_proxies, live_listeners.total()
+        for _ in range(runs):
+            GUI_SCENARIOS[name].run(page)
+        proxies, listeners = dom.stats.live_proxies - proxies, live_listeners.total() - listeners
+        leaked = leaked or proxies > 0 or listeners > 0
+        print(f"{name:<12} {runs:>8} {proxies:>8} {listeners:>10}")
+    return 1 if leaked else 0
+
+
+def check_history() -> int:
+    """Scroll through a history with wrapped lines, return 1 if the rows rendered don't match the layout.
+
+    Lines on the fake page wrap past `dom.CHAR_WIDTH` characters, every seventh line here wraps onto three rows.
+    At each position the rendered rows have to cover the view and sit where the lines above them end.
+    """
+    page = Page()
+    history = page.layout.terminal_gui.history
+    texts = [f"wrapped {i} " + "x" * 220 if i % 7 == 0 else f"line {i}" for i in range(300)]
+    history.add_lines(texts)
+    dom.run_pending()
+
+    container = history["parentElement"]
+    width = LAYOUT_DEFAULTS["clientWidth"]
+    tops = [0, *itertools.accumulate(dom.text_height(text, width) for text in texts)]
+    errors = []
+    # The page can't scroll past the end of the history
+    for scroll_top in range(0, tops[-1] - container.clientHeight, 50):
+        container.scrollTop = scroll_top
+        container.dispatch("scroll")
+        dom.run_pending()
+        rendered = [texts.index(row.textContent) for row in history.rows.html_element.children]
+        offset = float(history.rows["style"].transform.removeprefix("translateY(").removesuffix("px)"))
+        if rendered != list(range(rendered[0], rendered[-1] + 1)):
+            errors.append(f"at {scroll_top}px the rows {rendered} aren't consecutive lines")
+        if offset != tops[rendered[0]]:
+            errors.append(
+                f"at {scroll_top}px the rows start at {offset:g}px, line {rendered[0]} at {tops[rendered[0]]}px",
+            )
+        if tops[rendered[0]] > scroll_top or tops[rendered[-1] + 1] < scroll_top + container.clientHeight:
+            errors.append(f"at {scroll_top}px lines {rendered[0]} to {rendered[-1]} don't cover the view")
+    if history["style"].height != f"{tops[-1]}px":
+        errors.append(f"the history is {history['style'].height} tall, its lines {tops[-1]}px")
+
+    for error in errors:
+        print(f"FAILED {error}")
+    if not errors:
+        print("The terminal history renders wrapped lines where they belong.")
+    return 1 if errors else 0
+
+
+def main() -> int:
+    """Run the GUI benchmarks, return 1 if any regressed against the baseline."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gui", description="Benchmark the GUI.")
+    parser.add_argument("--scenarios", nargs="+", choices=GUI_SCENARIOS, default=list(GUI_SCENARIOS), metavar="NAME")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend timing each case")
+    parser.add_argument("--output", type=pathlib.Path, help="write the results as JSON to this file")
+    parser.add_argument("--baseline", type=pathlib.Path, help="results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative slowdown, default 0.1")
+    parser.add_argument("--soak", type=int, metavar="RUNS", help="check for leaks over RUNS runs instead")
+    parser.add_argument("--check-history", action="store_true", help="check the layout of wrapped history lines")
+    args = parser.parse_args()
+
+    if args.check_history:
+        return check_history()
+    if args.soak is not None:
+        return soak(args.scenarios, args.soak)
+
+    print(f"{'scenario':<12} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'DOM ops':>8} {'FFI':>8} {'proxies':>8}")
+    results = []
+    for name in args.scenarios:
+        result: dict[str, Any] = measure(
+            GUI_SCENARIOS[name],
+            Page(),
+            "page",
+            min_time=args.min_time,
+            counting=dom.counting,
+        )
+        results.append(result)
+        print(
+            f"{name:<12} {result['ops_per_sec']:>10.1f} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} "
+            f"{result['dom_ops_per_op']:>8.1f} {result['ffi_per_op']:>8.1f} {result['live_proxies_per_op']:>8.2f}",
+        )
+
+    if args.output is not None:
+        save(results, args.output)
+    if args.baseline is not None:
+        return check(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
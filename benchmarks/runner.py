@@ -0,0 +1,152 @@
+"""Running scenarios and comparing results against a baseline."""
+
+import json
+import pathlib
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+import numpy as np
+import PIL
+
+from benchmarks.scenarios import Scenario
+from profiling import percentile
+
+# Operations run while tracing allocations, kept low since tracemalloc slows everything down.
+MEMORY_OPS = 10
+# Peak memory growth below this is noise, not a regression.
+MEMORY_SLACK_KIB = 64
+# Per operation counts of the GUI benchmarks, deterministic so any increase is a regression.
+COUNTS = ("dom_ops_per_op", "ffi_per_op", "live_proxies_per_op")
+
+Result = dict[str, Any]
+
+
+def measure(  # noqa: PLR0913
+    scenario: Scenario,
+    workload: object,
+    size_name: str,
+    *,
+    min_time: float = 0.5,
+    min_ops: int = 5,
+    max_ops: int = 10_000,
+    counting: Callable[[], AbstractContextManager[dict[str, int]]] | None = None,
+) -> Result:
+    """Time a scenario on a workload, a `Workload` or for the GUI benchmarks a page.
+
+    Operations run until `min_time` seconds were spent in them, at least `min_ops` and at most `max_ops` times.
+    Peak memory is measured in a separate pass, allocations made by Pillow and NumPy in C are not included.
+
+    :param counting: context manager counting operations, e.g. `dom.counting`, the counts are reported per op
+    :return: ops per second, latency percentiles in milliseconds and peak memory in KiB
+    """
+
+    def run_once() -> float:
+        if scenario.prepare is not None:
+            scenario.prepare(workload)
+        start = time.perf_counter()
+        scenario.run(workload)
+        return time.perf_counter() - start
+
+    run_once()  # warm up caches and lazy imports
+    timings: list[float] = []
+    total = 0.0
+    with counting() if counting is not None else nullcontext({}) as counts:
+        while len(timings) < min_ops or (total < min_time and len(timings) < max_ops):
+            timings.append(run_once())
+            total += timings[-1]
+
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(MEMORY_OPS):
+            run_once()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    result = {
+        "scenario": scenario.name,
+        "size": size_name,
+        "ops": len(timings),
+        "ops_per_sec": len(timings) / total,
+        "p50_ms": percentile(timings, 0.50) * 1000,
+        "p95_ms": percentile(timings, 0.95) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "peak_memory_kib": peak / 1024,
+    }
+    for name, count in counts.items():
+        result[f"{name}_per_op"] = count / len(timings)
+    return result
+
+
+def environment() -> dict[str, str]:
+    """Describe where the benchmarks ran, results from different machines aren't comparable."""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "pillow": PIL.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def compare(results: list[Result], baseline: list[Result], tolerance: float) -> list[str]:
+    """Return the regressions of results against a baseline.
+
+    A result regressed when its ops per second dropped, or its peak memory grew, by more than `tolerance`,
+    or when it does more DOM operations, FFI crossings or leaves more proxies alive per operation.
+    Results without a baseline are skipped.
+
+    :param tolerance: allowed relative change, e.g. 0.1 for 10 %
+    """
+    previous = {(result["scenario"], result["size"]): result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get((result["scenario"], result["size"]))
+        if base is None:
+            continue
+        name = f"{result['scenario']} @ {result['size']}"
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['ops_per_sec']:.1f} ops/s, was {base['ops_per_sec']:.1f} ops/s",
+            )
+        memory_limit = max(base["peak_memory_kib"] * (1 + tolerance), base["peak_memory_kib"] + MEMORY_SLACK_KIB)
+        if result["peak_memory_kib"] > memory_limit:
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory_kib']:.0f} KiB, was {base['peak_memory_kib']:.0f} KiB",
+            )
+        regressions.extend(
+            f"{name}: {count} {result[count]:g}, was {base[count]:g}"
+            for count in COUNTS
+            if count in result and count in base and result[count] > base[count]
+        )
+    return regressions
+
+
+def save(results: list[Result], path: pathlib.Path) -> None:
+    """Write results as JSON, with the environment they were measured in."""
+    report = {"created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "environment": environment(), "results": results}
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {path}")
+
+
+def check(results: list[Result], baseline_path: pathlib.Path, tolerance: float) -> int:
+    """Print the regressions against the results saved in `baseline_path`.
+
+    :return: exit status, 1 if anything regressed
+    """
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if baseline["environment"] != environment():
+        print("Warning: the baseline was recorded in another environment.")
+    regressions = compare(results, baseline["results"], tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions against {baseline_path}.")
+    return 1 if regressions else 0
@@ -0,0 +1,165 @@
+"""Benchmark scenarios, each timing one operation on a canvas of a given size.
+
+Operations are timed up to the preview update, `flush` renders the touched region to the stub preview like the
+next animation frame would in the browser.
+"""
+
+import random
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from PIL import Image
+
+from benchmarks.stubs import StubImagePreview, StubTerminalGui
+from image import PaintImage
+from terminal import Terminal
+from utils.color import Color
+
+# Canvas sizes by name, from the default canvas up to 8K.
+SIZES = {
+    "400x250": (400, 250),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+}
+# Extent of the drawn shapes in pixels.
+SHAPE_SIZE = 64
+
+FG = Color(255, 64, 0)
+BG = Color(0, 128, 255, 128)
+
+
+def make_canvas(size: tuple[int, int]) -> Image.Image:
+    """Return a noisy RGB canvas, so encoding it costs about what it costs for a photo."""
+    return Image.merge("RGB", [Image.effect_noise(size, sigma) for sigma in (32, 48, 64)])
+
+
+class Workload:
+    """A `PaintImage` and `Terminal` wired to stub displays, with a canvas of the given size."""
+
+    def __init__(self, size: tuple[int, int], seed: int = 0) -> None:
+        self.size = size
+        self.preview = StubImagePreview()
+        self.terminal_gui = StubTerminalGui()
+        self.image = PaintImage(self.preview)
+        self.image.img = make_canvas(size)
+        self.image.refresh_image()
+        self.image.flush()
+        self.terminal = Terminal(self.image, self.terminal_gui)
+        self.random = random.Random(seed)  # noqa: S311
+
+    def point(self) -> tuple[int, int]:
+        """Return a random position a shape of `SHAPE_SIZE` fits at."""
+        width, height = self.size
+        return (
+            self.random.randrange(max(width - SHAPE_SIZE, 1)),
+            self.random.randrange(max(height - SHAPE_SIZE, 1)),
+        )
+
+    def polygon(self) -> list[tuple[int, int]]:
+        """Return the vertices of a random pentagon."""
+        x, y = self.point()
+        offsets = ((32, 0), (64, 24), (52, 64), (12, 64), (0, 24))
+        return [(x + dx, y + dy) for dx, dy in offsets]
+
+    def run(self, command: str) -> None:
+        """Run a command line and render its result."""
+        self.terminal.run_str(command)
+        self.image.flush()
+
+
+class Scenario(NamedTuple):
+    """A timed operation on a workload, `prepare` runs untimed before each one."""
+
+    name: str
+    description: str
+    run: Callable[[Any], object]
+    prepare: Callable[[Any], object] | None = None
+
+
+def _pixel(workload: Workload) -> None:
+    workload.image.set_pixel(*workload.point(), FG)
+    workload.image.flush()
+
+
+def _line(workload: Workload) -> None:
+    x, y = workload.point()
+    workload.image.draw_line(x, y, x + SHAPE_SIZE, y + SHAPE_SIZE * 3 // 4, FG)
+    workload.image.flush()
+
+
+def _rect(workload: Workload) -> None:
+    x, y = workload.point()
+    workload.image.fill_rect(x, y, SHAPE_SIZE, SHAPE_SIZE * 3 // 4, BG, FG, 2)
+    workload.image.flush()
+
+
+def _circle(workload: Workload) -> None:
+    x, y = workload.point()
+    workload.image.draw_circle(x + SHAPE_SIZE // 2, y + SHAPE_SIZE // 2, SHAPE_SIZE // 2, BG, FG, 2)
+    workload.image.flush()
+
+
+def _polygon(workload: Workload) -> None:
+    workload.image.draw_polygon(workload.polygon(), BG, FG, 2)
+    workload.image.flush()
+
+
+def _undo(workload: Workload) -> None:
+    workload.image.undo()
+    workload.image.flush()
+
+
+def _encode(workload: Workload) -> None:
+    workload.image.refresh_image()
+    workload.image.flush()
+
+
+def _encode_full(workload: Workload) -> None:
+    workload.image.get_png_bytes()
+
+
+def _command_pixel(workload: Workload) -> None:
+    x, y = workload.point()
+    workload.run(f"draw_pixel {x} {y} --fg red")
+
+
+def _command_line(workload: Workload) -> None:
+    x, y = workload.point()
+    workload.run(f"draw_line {x} {y} {x + SHAPE_SIZE} {y + SHAPE_SIZE * 3 // 4} --fg red")
+
+
+def _command_rect(workload: Workload) -> None:
+    x, y = workload.point()
+    workload.run(f"draw_rectangle {x} {y} {SHAPE_SIZE} {SHAPE_SIZE * 3 // 4} --fg red --bg blue --outline 2")
+
+
+def _command_circle(workload: Workload) -> None:
+    x, y = workload.point()
+    radius = SHAPE_SIZE // 2
+    workload.run(f"draw_circle {x + radius} {y + radius} {radius} --fg red --bg blue --outline 2")
+
+
+def _command_polygon(workload: Workload) -> None:
+    vertices = " ".join(f"{x} {y}" for x, y in workload.polygon())
+    workload.run(f"draw_polygon {vertices} --fg red --bg blue --outline 2")
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("pixel", "PaintImage.set_pixel", _pixel),
+        Scenario("line", "PaintImage.draw_line", _line),
+        Scenario("rect", "PaintImage.fill_rect with outline", _rect),
+        Scenario("circle", "PaintImage.draw_circle with outline", _circle),
+        Scenario("polygon", "PaintImage.draw_polygon of a pentagon", _polygon),
+        Scenario("undo", "PaintImage.undo of a line", _undo, prepare=_line),
+        Scenario("encode", "render and encode a full preview frame", _encode),
+        Scenario("encode_full", "encode the full resolution image as PNG", _encode_full),
+        Scenario("cmd_pixel", "draw_pixel through Terminal.run_str", _command_pixel),
+        Scenario("cmd_line", "draw_line through Terminal.run_str", _command_line),
+        Scenario("cmd_rect", "draw_rectangle through Terminal.run_str", _command_rect),
+        Scenario("cmd_circle", "draw_circle through Terminal.run_str", _command_circle),
+        Scenario("cmd_polygon", "draw_polygon through Terminal.run_str", _command_polygon),
+    )
+}
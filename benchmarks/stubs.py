@@ -0,0 +1,71 @@
+"""Stand-ins for the `ImagePreview` and `TerminalGui`, counting what would be sent to the DOM."""
+
+from typing import TYPE_CHECKING
+
+from image import Box
+
+if TYPE_CHECKING:
+    from terminal import Terminal
+
+
+class StubImagePreview:
+    """Image display discarding frames, see `image.ImageDisplay`."""
+
+    def __init__(self, size: tuple[int, int] = (1280, 800)) -> None:
+        self.size = size
+        self.frames = 0
+        self.regions = 0
+        self.thumbnails = 0
+        self.bytes_displayed = 0
+
+    def display_image(self, image_src: str, source_size: tuple[int, int] | None = None) -> None:  # noqa: ARG002
+        """Count a frame displayed from a URL."""
+        self.frames += 1
+        self.bytes_displayed += len(image_src)
+
+    def display_image_bytes(
+        self,
+        data: bytes | memoryview,
+        mime_type: str = "image/png",  # noqa: ARG002
+        source_size: tuple[int, int] | None = None,  # noqa: ARG002
+    ) -> None:
+        """Count an encoded frame."""
+        self.frames += 1
+        self.bytes_displayed += memoryview(data).nbytes
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Return the size of the pretend preview, in device pixels."""
+        return self.size
+
+    def update_region(self, box: Box, data: bytes) -> None:  # noqa: ARG002
+        """Count a region update."""
+        self.regions += 1
+        self.bytes_displayed += len(data)
+
+    def show_gallery(self, names: list[str]) -> None:
+        """Ignore the gallery, thumbnails are counted."""
+
+    def show_thumbnail(self, name: str, data: bytes, mime_type: str) -> None:  # noqa: ARG002
+        """Count a thumbnail."""
+        self.thumbnails += 1
+        self.bytes_displayed += len(data)
+
+    def hide_gallery(self) -> None:
+        """Ignore the gallery."""
+
+
+class StubTerminalGui:
+    """Terminal display keeping the lines printed to it, see `terminal.TerminalDisplay`."""
+
+    def __init__(self) -> None:
+        self.terminal: Terminal | None = None
+        self.background_color = ""
+        self.lines: list[tuple[str, str | None]] = []
+
+    def print_terminal_output(self, text: str, color: str | None = None) -> None:
+        """Keep a printed line."""
+        self.lines.append((text, color))
+
+    def print_terminal_lines(self, lines: list[str], color: str | None = None) -> None:
+        """Keep printed lines."""
+        self.lines.extend((text, color) for text in lines)
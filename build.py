@@ -1,10 +1,18 @@
 """The build script for the website."""
 
 import argparse
+import ast
+import hashlib
 import http.server
+import importlib.util
+import io
+import json
+import marshal
 import pathlib
+import re
 import shutil
-import socketserver
+import sys
+import zipfile
 
 _this_dir = pathlib.Path(__file__).parent.resolve()
 
@@ -12,11 +20,202 @@ _this_dir = pathlib.Path(__file__).parent.resolve()
 BUILD_DIR = _this_dir / "build"
 PUBLIC_DIR = _this_dir / "public"
 SRC_DIR = _this_dir / "src"
+COMMANDS_DIR = SRC_DIR / "commands"
+COMMAND_INDEX = COMMANDS_DIR / "command_index.py"
+# Modules of the commands package that don't define commands
+COMMAND_SUPPORT_MODULES = ("__init__", "base_command", "command_index", "registry")
 
+# Where the pages load Pyodide from, replaced by a local copy with --pyodide-dir
+PYODIDE_CDN_URL = "https://cdn.jsdelivr.net/pyodide/v0.28.1/full/"
+PYODIDE_PAGES = ("index.html", "worker.js")
+# Python version of that Pyodide release, compiled bundles only load on the same version
+PYODIDE_PYTHON = (3, 13)
 
-def _zip_dir(src: pathlib.Path, dest: pathlib.Path) -> None:
-    """Create a zip file from a directory and places it in `dest`."""
-    shutil.make_archive(str(dest), "zip", str(src))
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+# Fixed timestamp of archive entries, so unchanged sources always give the same archive and name
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+HASHED_NAME = re.compile(rf"-[0-9a-f]{{{HASH_LENGTH}}}\.zip$")
+
+
+def _literal(value: str) -> str:
+    """Return a double quoted Python literal of a string."""
+    return json.dumps(value)
+
+
+def _tuple_items(values: tuple[str, ...]) -> str:
+    """Return the items of a tuple literal of strings."""
+    items = ", ".join(_literal(value) for value in values)
+    return items + "," if len(values) == 1 else items
+
+
+def _find_commands(path: pathlib.Path) -> list[dict]:
+    """Return the BaseCommand subclasses of a module with their literal class attributes the index needs."""
+    found = []
+    for node in ast.parse(path.read_text(encoding="utf-8"), str(path)).body:
+        if not isinstance(node, ast.ClassDef) or not any(
+            isinstance(base, ast.Name) and base.id == "BaseCommand" for base in node.bases
+        ):
+            continue
+
+        command = {"module": f"commands.{path.stem}", "class_name": node.name, "known_options": (), "raw_args": False}
+        for statement in node.body:
+            if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+                target, value = statement.targets[0], statement.value
+            elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+                target, value = statement.target, statement.value
+            else:
+                continue
+            if isinstance(target, ast.Name) and target.id in ("name", "help_pages", "known_options", "raw_args"):
+                try:
+                    command[target.id] = ast.literal_eval(value)
+                except ValueError:
+                    msg = f"{path.name}: {node.name}.{target.id} must be a literal to be indexed"
+                    raise ValueError(msg) from None
+
+        if "name" not in command or "help_pages" not in command:
+            msg = f"{path.name}: {node.name} needs a literal `name` and `help_pages`"
+            raise ValueError(msg)
+        found.append(command)
+    return found
+
+
+def _write_command_index() -> None:
+    """Generate `commands/command_index.py`, the static index the command registry loads commands from."""
+    commands = [
+        command
+        for path in sorted(COMMANDS_DIR.glob("*.py"))
+        if path.stem not in COMMAND_SUPPORT_MODULES
+        for command in _find_commands(path)
+    ]
+
+    lines = [
+        '"""Static index of the terminal commands.',
+        "",
+        "Generated by build.py from the command modules, don't edit it by hand.",
+        '"""',
+        "",
+        "from commands.registry import CommandInfo",
+        "",
+        "COMMAND_INDEX: dict[str, CommandInfo] = {",
+    ]
+    for command in sorted(commands, key=lambda command: command["name"]):
+        lines += [
+            f"    {_literal(command['name'])}: CommandInfo(",
+            f"        module={_literal(command['module'])},",
+            f"        class_name={_literal(command['class_name'])},",
+            "        help_pages=(",
+        ]
+        for page in command["help_pages"]:
+            page_lines = page.splitlines(keepends=True) or [""]
+            lines += [f"            {_literal(line)}" for line in page_lines[:-1]]
+            lines.append(f"            {_literal(page_lines[-1])},")
+        lines += [
+            "        ),",
+            f"        known_options=({_tuple_items(command['known_options'])}),",
+            f"        raw_args={command['raw_args']},",
+            "    ),",
+        ]
+    lines.append("}")
+
+    source = "\n".join(lines) + "\n"
+    if not COMMAND_INDEX.exists() or COMMAND_INDEX.read_text(encoding="utf-8") != source:
+        COMMAND_INDEX.write_text(source, encoding="utf-8")
+        print(f"Updated {COMMAND_INDEX.relative_to(_this_dir)}")
+
+
+def _compile_module(source: bytes, filename: str) -> bytes:
+    """Compile a module to an unchecked hash-based .pyc (PEP 552), without docstrings or asserts.
+
+    The bundle has no sources, so the .pyc is never checked against one.
+    """
+    code = compile(source, filename, "exec", dont_inherit=True, optimize=2)
+    flags = (0b01).to_bytes(4, "little")
+    return importlib.util.MAGIC_NUMBER + flags + importlib.util.source_hash(source) + marshal.dumps(code)
+
+
+def _collect_sources(*, compiled: bool) -> dict[str, dict[str, bytes]]:
+    """Group the files of `src` into archives.
+
+    Modules are grouped by top level package, modules outside packages go to "main", everything that isn't
+    Python goes to "assets". Modules are compiled to .pyc when `compiled` is set.
+    """
+    archives: dict[str, dict[str, bytes]] = {}
+    for path in sorted(SRC_DIR.rglob("*")):
+        relative = path.relative_to(SRC_DIR)
+        if not path.is_file() or "__pycache__" in relative.parts or path.suffix == ".pyc":
+            continue
+
+        arcname = relative.as_posix()
+        data = path.read_bytes()
+        if path.suffix != ".py":
+            archive = "assets"
+        else:
+            archive = relative.parts[0] if len(relative.parts) > 1 else "main"
+            if compiled:
+                data = _compile_module(data, arcname)
+                arcname = relative.with_suffix(".pyc").as_posix()
+        archives.setdefault(archive, {})[arcname] = data
+    return archives
+
+
+def _write_archive(name: str, files: dict[str, bytes]) -> str:
+    """Write a zip archive named after its content hash into the build.
+
+    :return: the file name of the archive
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for arcname in sorted(files):
+            info = zipfile.ZipInfo(arcname, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, files[arcname])
+
+    data = buffer.getvalue()
+    filename = f"{name}-{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}.zip"
+    (BUILD_DIR / filename).write_bytes(data)
+    return filename
+
+
+def _build_sources(*, compiled: bool) -> None:
+    """Bundle `src` into content-hashed archives and list them in the manifest the pages load them from."""
+    manifest = {
+        "python": ".".join(map(str, PYODIDE_PYTHON)) if compiled else None,
+        "archives": [
+            {"file": _write_archive(name, files), "kind": "assets" if name == "assets" else "code"}
+            for name, files in _collect_sources(compiled=compiled).items()
+        ],
+    }
+    (BUILD_DIR / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+
+
+def _vendor_pyodide(pyodide_dir: pathlib.Path) -> None:
+    """Copy a Pyodide distribution into the build and load it from there instead of the CDN.
+
+    The distribution must contain the pyodide.js runtime and the packages the app loads (Pillow, NumPy),
+    e.g. the extracted `pyodide-<version>.tar.bz2` release matching `PYODIDE_CDN_URL`. Its Python version, read
+    from `pyodide-lock.json`, must be `PYODIDE_PYTHON`.
+    """
+    if not (pyodide_dir / "pyodide.js").is_file():
+        msg = f"No pyodide.js in {pyodide_dir}"
+        raise FileNotFoundError(msg)
+    lock_path = pyodide_dir / "pyodide-lock.json"
+    if not lock_path.is_file():
+        msg = f"No pyodide-lock.json in {pyodide_dir}"
+        raise FileNotFoundError(msg)
+    info = json.loads(lock_path.read_text(encoding="utf-8"))["info"]
+    python = tuple(int(part) for part in info["python"].split(".")[:2])
+    if python != PYODIDE_PYTHON:
+        msg = (
+            f"Pyodide {info['version']} in {pyodide_dir} runs Python {info['python']}, "
+            f"the app is built for Python {'.'.join(map(str, PYODIDE_PYTHON))}"
+        )
+        raise ValueError(msg)
+    shutil.copytree(pyodide_dir, BUILD_DIR / "pyodide", dirs_exist_ok=True)
+    for page in PYODIDE_PAGES:
+        path = BUILD_DIR / page
+        path.write_text(path.read_text(encoding="utf-8").replace(PYODIDE_CDN_URL, "pyodide/"), encoding="utf-8")
 
 
 class _DevHandler(http.server.SimpleHTTPRequestHandler):
@@ -25,6 +224,39 @@ class _DevHandler(http.server.SimpleHTTPRequestHandler):
     def __init__(self, request, client_address, server) -> None:  # noqa: ANN001
         super().__init__(request, client_address, server, directory=BUILD_DIR)
 
+    def end_headers(self) -> None:
+        # Hashed archives never change, everything else is revalidated so new builds are picked up
+        if HASHED_NAME.search(self.path.split("?", 1)[0]):
+            self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        else:
+            self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+
+def _serve_render(args: argparse.Namespace) -> None:
+    """Serve the website and the render endpoint, with a pool of render workers started up front."""
+    # Imported here, the render service needs the app's dependencies, building doesn't
+    import render_service  # noqa: PLC0415
+
+    options = {
+        "workers": args.render_workers,
+        "queue_size": args.render_queue,
+        "timeout": args.render_timeout,
+    }
+    pool = render_service.RenderPool(**{name: value for name, value in options.items() if value is not None})
+    pool.warm_up()
+
+    class _RenderHandler(render_service.RenderRequests, _DevHandler):
+        pass
+
+    print(f"Serving on http://localhost:{args.port}, rendering with {pool.workers} workers")
+    httpd = http.server.ThreadingHTTPServer(("", args.port), _RenderHandler)
+    httpd.render_pool = pool
+    try:
+        httpd.serve_forever()
+    finally:
+        pool.shutdown()
+
 
 def main() -> None:
     """Define the build entry point."""
@@ -32,8 +264,35 @@ def main() -> None:
     parser.add_argument("--no-clean", action="store_false", dest="clean", default=True)
     parser.add_argument("--serve", action="store_true", default=False)
     parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--pyodide-dir",
+        type=pathlib.Path,
+        default=None,
+        help="local Pyodide distribution to bundle, so the app loads without network access",
+    )
+    parser.add_argument(
+        "--render",
+        action="store_true",
+        default=False,
+        help="also serve POST /render and GET /metrics, see render_service.py",
+    )
+    parser.add_argument("--render-workers", type=int, default=None, help="render worker processes, default all cores")
+    parser.add_argument("--render-queue", type=int, default=None, help="render requests waiting before 503s")
+    parser.add_argument("--render-timeout", type=float, default=None, help="seconds before a render gets a 504")
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        default=False,
+        help="bundle modules precompiled to .pyc for the Pyodide Python version, without docstrings",
+    )
     args = parser.parse_args()
 
+    if args.compile and sys.version_info[:2] != PYODIDE_PYTHON:
+        parser.error(
+            f"--compile needs Python {'.'.join(map(str, PYODIDE_PYTHON))} to match Pyodide, "
+            f"this is Python {sys.version_info.major}.{sys.version_info.minor}",
+        )
+
     if not BUILD_DIR.exists():  # FileNotFoundError if this isn't here
         BUILD_DIR.mkdir(exist_ok=True)
 
@@ -41,12 +300,18 @@ def main() -> None:
         shutil.rmtree(BUILD_DIR)
         BUILD_DIR.mkdir(exist_ok=True)
 
-    _zip_dir(SRC_DIR, BUILD_DIR / "src")
+    _write_command_index()
+    _build_sources(compiled=args.compile)
     shutil.copytree(PUBLIC_DIR, BUILD_DIR, dirs_exist_ok=True)
+    if args.pyodide_dir is not None:
+        _vendor_pyodide(args.pyodide_dir)
 
     if args.serve:
+        if args.render:
+            _serve_render(args)
+            return
         print(f"Serving on http://localhost:{args.port}")
-        httpd = socketserver.TCPServer(("", args.port), _DevHandler)
+        httpd = http.server.ThreadingHTTPServer(("", args.port), _DevHandler)
         httpd.serve_forever()
     else:
         print("Add --serve to start")
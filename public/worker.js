@@ -0,0 +1,41 @@
+// Runs the terminal and image engine off the page, see src/worker.py.
+importScripts("https://cdn.jsdelivr.net/pyodide/v0.28.1/full/pyodide.js");
+
+// Messages the page sends while Python is loading, handed to the engine once it starts
+const pending = [];
+const queueMessage = (event) => pending.push(event.data);
+self.addEventListener("message", queueMessage);
+
+// Startup phases of the worker, see index.html
+const marks = {};
+const mark = (phase) => (marks[phase] = performance.timeOrigin + performance.now());
+
+(async () => {
+  // Sources are listed in the manifest written by build.py, see index.html
+  const manifest = fetch("manifest.json").then((response) => response.json());
+  const sources = manifest.then(({ archives }) =>
+    Promise.all(archives.map(({ file }) => fetch(file).then((response) => response.arrayBuffer()))),
+  );
+  const pyodide = await loadPyodide();
+  mark("worker_pyodide_loaded");
+  // Precompiled sources only load on the Python version they were compiled for, see index.html
+  const { python } = await manifest;
+  const runtimePython = pyodide.runPython("import sys; f'{sys.version_info.major}.{sys.version_info.minor}'");
+  if (python && python !== runtimePython) {
+    throw new Error(
+      `The app was compiled for Python ${python}, but Pyodide ${pyodide.version} runs Python ${runtimePython}. ` +
+        "Rebuild it for this Pyodide release.",
+    );
+  }
+  await Promise.all([
+    pyodide.loadPackage(["pillow", "numpy"]).then(() => mark("worker_packages_loaded")),
+    sources.then((buffers) => {
+      buffers.forEach((buffer) => pyodide.unpackArchive(buffer, "zip"));
+      mark("worker_sources_unpacked");
+    }),
+  ]);
+  const worker = pyodide.pyimport("worker");
+  mark("worker_imported");
+  self.removeEventListener("message", queueMessage);
+  worker.main(pending, marks);
+})();
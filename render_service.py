@@ -0,0 +1,233 @@
+"""HTTP endpoint rendering a script of terminal commands on an uploaded image, for tools that can't drive a browser.
+
+`POST /render` takes a multipart/form-data body with an `image` file and a `script` in the format of `batch.py`,
+and answers with the edited image as PNG. Scripts run in a pool of worker processes that imported the engine and
+every command when they started, so a request only pays for decoding, the commands and encoding.
+
+At most `workers + queue_size` requests are accepted at once, more are turned away with 503 and a Retry-After
+header instead of piling up. A request that isn't rendered within the timeout is answered with 504, its script
+still finishes in the worker and holds its place until then. `GET /metrics` reports the queue and latencies.
+
+    python build.py --serve --render
+    curl -F image=@photo.png -F script=@recipe.txt http://localhost:8000/render -o edited.png
+
+`RenderRequests` is a handler mixin, `build.py` combines it with the static file handler of the dev server.
+"""
+
+import email.parser
+import email.policy
+import http.server
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+
+from batch import parse_script, run_script
+
+from commands import all_commands
+from profiling import CommandStats
+
+RENDER_PATH = "/render"
+METRICS_PATH = "/metrics"
+RENDER_WORKERS = os.cpu_count() or 1
+RENDER_QUEUE_SIZE = 16
+RENDER_TIMEOUT = 30.0
+# Largest request body accepted, in bytes
+MAX_BODY_SIZE = 64 * 1024 * 1024
+# Seconds a client turned away for a full queue is asked to wait
+RETRY_AFTER = 1
+
+
+def _start_worker() -> None:
+    """Import every command in a new worker process, before it takes its first request."""
+    # Looking a command up imports its module
+    for name in all_commands:
+        all_commands.get(name)
+
+
+def _render(data: bytes, commands: list[str]) -> tuple[bytes | None, str | None]:
+    """Run a script on an encoded image in a worker process.
+
+    :return: the edited image encoded as PNG and None, or None and why the script failed
+    """
+    image, error = run_script(lambda image: image.load_from_bytes(data), commands)
+    if error is not None:
+        return None, error
+    return bytes(image.get_png_bytes()), None
+
+
+class RenderPool:
+    """Bounded pool of warm worker processes running render scripts.
+
+    :param workers: number of worker processes
+    :param queue_size: number of requests waiting for a worker before more are rejected
+    :param timeout: seconds a request waits for its image
+    """
+
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        queue_size: int = RENDER_QUEUE_SIZE,
+        timeout: float = RENDER_TIMEOUT,
+    ) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_start_worker)
+        self.latency = CommandStats()
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def warm_up(self) -> None:
+        """Start every worker process now, instead of on the first requests."""
+        for future in [self.executor.submit(_start_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes once they finished their scripts."""
+        self.executor.shutdown()
+
+    def submit(self, data: bytes, commands: list[str]) -> "Future[tuple[bytes | None, str | None]] | None":
+        """Queue a script, return None if the queue is full."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            return None
+
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        future = self.executor.submit(_render, data, commands)
+        future.add_done_callback(lambda done: self._finish(done, start))
+        return future
+
+    def _finish(self, future: "Future[tuple[bytes | None, str | None]]", start: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if future.exception() is None and future.result()[1] is None:
+                self.completed += 1
+                self.latency.record("render", time.perf_counter() - start)
+            else:
+                self.failed += 1
+        self._slots.release()
+
+    def render(self, data: bytes, commands: list[str]) -> tuple[HTTPStatus, bytes | str]:
+        """Run a script on an encoded image and wait for it.
+
+        :return: OK and the PNG, or the status and message of the error
+        """
+        future = self.submit(data, commands)
+        if future is None:
+            return HTTPStatus.SERVICE_UNAVAILABLE, "All workers are busy and the queue is full."
+        try:
+            png, error = future.result(self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            return HTTPStatus.GATEWAY_TIMEOUT, f"The script didn't finish within {self.timeout:g} seconds."
+        # e.g. a worker process that died
+        except Exception as e:  # noqa: BLE001
+            return HTTPStatus.INTERNAL_SERVER_ERROR, f"The worker failed: {e!r}"
+        if png is None:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, error or "The script failed."
+        return HTTPStatus.OK, png
+
+    def metrics(self) -> dict:
+        """Return the state of the queue, the request counts and the latency percentiles in milliseconds."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queued": max(self.in_flight - self.workers, 0),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "latency_ms": self.latency.summary().get("render", {"count": 0}),
+            }
+
+
+def parse_form(content_type: str, body: bytes) -> dict[str, bytes]:
+    """Return the fields of a multipart/form-data body by name."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body,
+    )
+    if not message.is_multipart():
+        return {}
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = part.get_payload(decode=True) or b""
+    return fields
+
+
+class RenderRequests(http.server.BaseHTTPRequestHandler):
+    """Handles `POST /render` and `GET /metrics` with the `render_pool` of the server.
+
+    Other GET requests go to the next handler class, e.g. `SimpleHTTPRequestHandler` serving files.
+    """
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Render a script on an image."""
+        if self.path.split("?", 1)[0] != RENDER_PATH:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        if self.headers.get("Content-Length") is None:
+            self.send_error(HTTPStatus.LENGTH_REQUIRED, "Send the Content-Length of the body.")
+            return
+        try:
+            length = int(self.headers["Content-Length"])
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_error(HTTPStatus.BAD_REQUEST, "Content-Length must be a number of bytes.")
+            return
+        if length > MAX_BODY_SIZE:
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Bodies are limited to {MAX_BODY_SIZE} bytes.")
+            return
+        fields = parse_form(self.headers.get("Content-Type", ""), self.rfile.read(length))
+        if "image" not in fields or "script" not in fields:
+            self.send_error(HTTPStatus.BAD_REQUEST, "Send multipart/form-data with `image` and `script` fields.")
+            return
+        try:
+            commands = parse_script(fields["script"].decode("utf-8"))
+        except UnicodeDecodeError:
+            self.send_error(HTTPStatus.BAD_REQUEST, "The script must be UTF-8 text.")
+            return
+
+        status, result = self.server.render_pool.render(fields["image"], commands)
+        if isinstance(result, str):
+            self._send(status, result.encode(), "text/plain; charset=utf-8")
+        else:
+            self._send(status, result, "image/png")
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Report the render metrics, or serve the request with the next handler class."""
+        if self.path.split("?", 1)[0] == METRICS_PATH:
+            self._send(HTTPStatus.OK, json.dumps(self.server.render_pool.metrics()).encode(), "application/json")
+            return
+        serve = getattr(super(), "do_GET", None)
+        if serve is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+        else:
+            serve()
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", str(RETRY_AFTER))
+        self.end_headers()
+        self.wfile.write(body)
@@ -60,7 +60,8 @@ class Background(BaseCommand):
         @author Philip
         """
         if not all(arg.isdigit() for arg in args):
-            return ""
+            # A color name is being typed
+            return (terminal.completion.color(args[0]) or "") if len(args) == 1 else ""
 
         match len(args):
             case 0:
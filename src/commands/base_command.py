@@ -13,6 +13,7 @@ class BaseCommand:
 
     `name` and `help_pages` should be overwritten in full command implementation.
     `known_options` is the options that a command can take.
+    `raw_args` commands get every word after the command name as an argument, options aren't parsed.
 
     The options "fg" and "bg" are special and represent the foreground and background color for drawing.
     If these are requested, they will always be supplied
@@ -30,6 +31,7 @@ class BaseCommand:
         """,
     )
     known_options: tuple[str, ...] = ()
+    raw_args: bool = False
 
     def __call__(self, terminal: "Terminal", *args: str, **options: str | Color) -> bool:
         """Preforms the command being called using `*args`.
@@ -0,0 +1,347 @@
+"""Static index of the terminal commands.
+
+Generated by build.py from the command modules, don't edit it by hand.
+"""
+
+from commands.registry import CommandInfo
+
+COMMAND_INDEX: dict[str, CommandInfo] = {
+    "bg": CommandInfo(
+        module="commands.background",
+        class_name="Background",
+        help_pages=(
+            "Sets the background color for use in drawing commands.\n"
+            "\n"
+            "        Usage: bg <color>\n"
+            "        Examples:\n"
+            "        bg 255 255 255\n"
+            "        bg 100 0 0 255\n"
+            "        bg gold\n"
+            "        bg #C0FFEE\n"
+            "        bg rgb(0 200 150)\n"
+            "        bg rgba(0 255 255 100)\n"
+            "        bg hsv(360 100 100)\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "draw_circle": CommandInfo(
+        module="commands.draw_circle",
+        class_name="DrawCircle",
+        help_pages=(
+            "\n"
+            "        Usage: draw_circle <x> <y> <radius>\n"
+            "\n"
+            "        arguments x,y: coordinate numbers\n"
+            "        argument radius: color name\n"
+            "        ",
+            "\n"
+            "        Options:\n"
+            "        fg <color>: set fill color for circle\n"
+            "        bg <color>: set border color for circle\n"
+            "        no-fill: don't fill circle\n"
+            "        outline <int>: set size of outline around circle\n"
+            "        ",
+        ),
+        known_options=("fg", "bg", "no-fill", "outline"),
+        raw_args=False,
+    ),
+    "draw_line": CommandInfo(
+        module="commands.draw_line",
+        class_name="DrawLine",
+        help_pages=(
+            "\n"
+            "        Usage: draw_line <x1> <y1> <x2> <y2>\n"
+            "\n"
+            "        arguments x1,y1: starting coordinates\n"
+            "        arguments x2,y2: ending coordinates\n"
+            "        argument color: color name\n"
+            "        arguments r,g,b: red,green,blue numbers\n"
+            "        ",
+            "\n"
+            "        Options:\n"
+            "        fg <color>: set color of line\n"
+            "        ",
+        ),
+        known_options=("fg",),
+        raw_args=False,
+    ),
+    "draw_pixel": CommandInfo(
+        module="commands.draw_pixel",
+        class_name="DrawPixel",
+        help_pages=(
+            "\n"
+            "        Usage: draw_pixel <x> <y>\n"
+            "\n"
+            "        arguments x,y: coordinate numbers\n"
+            "        ",
+            "\n"
+            "        Options:\n"
+            "        fg <color>: set color of pixel\n"
+            "        ",
+        ),
+        known_options=("fg",),
+        raw_args=False,
+    ),
+    "draw_polygon": CommandInfo(
+        module="commands.draw_polygon",
+        class_name="DrawPolygon",
+        help_pages=(
+            "\n"
+            "        Usage: draw_rectangle <x1> <y1> <x2> <y2> <x3> <y3> ...\n"
+            "\n"
+            "        arguments x,y: coordinate numbers for points on polygon\n"
+            "        Requires at least 3 points and even number of arguments\n"
+            "        ",
+            "\n"
+            "        Options:\n"
+            "        fg <color>: set fill color for polygon\n"
+            "        bg <color>: set border color for polygon\n"
+            "        no-fill: don't fill polygon\n"
+            "        outline <int>: set size of outline around polygon\n"
+            "        ",
+        ),
+        known_options=("fg", "bg", "no-fill", "outline"),
+        raw_args=False,
+    ),
+    "draw_rectangle": CommandInfo(
+        module="commands.draw_rectangle",
+        class_name="DrawRectangle",
+        help_pages=(
+            "\n"
+            "        Usage: draw_rectangle <x> <y> <width> <height>\n"
+            "\n"
+            "        arguments x,y: coordinate numbers\n"
+            "        arguments width,height: width and height of the rectangle\n"
+            "        ",
+            "\n"
+            "        Options:\n"
+            "        fg <color>: set fill color for rectangle\n"
+            "        bg <color>: set border color for rectangle\n"
+            "        no-fill: don't fill rectangle\n"
+            "        outline <int>: set size of outline around rectangle\n"
+            "        ",
+        ),
+        known_options=("fg", "bg", "no-fill", "outline"),
+        raw_args=False,
+    ),
+    "fg": CommandInfo(
+        module="commands.foreground",
+        class_name="Foreground",
+        help_pages=(
+            "Sets the foreground color for use in drawing commands.\n"
+            "\n"
+            "        Usage: fg <color>\n"
+            "        Examples:\n"
+            "        bg 255 255 255\n"
+            "        bg 100 0 0 255\n"
+            "        bg gold\n"
+            "        bg #C0FFEE\n"
+            "        bg rgb(0 200 150)\n"
+            "        bg rgba(0 255 255 100)\n"
+            "        bg hsv(360 100 100)\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "gallery": CommandInfo(
+        module="commands.gallery",
+        class_name="Gallery",
+        help_pages=(
+            "\n"
+            "        Usage: gallery [pattern]\n"
+            "        Shows thumbnails of the images in the image directory over the preview,\n"
+            "        click one to load it.\n"
+            "        pattern: only show files matching it, e.g. *.png\n"
+            "\n"
+            "        Usage: gallery close\n"
+            "        Hides the gallery.\n"
+            "\n"
+            "        Thumbnails are made in the background and kept in memory,\n"
+            "        the gallery opens instantly once they were made.\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "help": CommandInfo(
+        module="commands.help",
+        class_name="Help",
+        help_pages=(
+            "help is a command that displays the help documentation of the command given.\n"
+            "\n"
+            "        Usage: help <command> <page>\n"
+            "\n"
+            "        The help documentation may also contain multiple pages so it can either be call multiple times\n"
+            "        with the same arguments to get the next page or be called with the page number you are looking for\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "image_info": CommandInfo(
+        module="commands.image_info",
+        class_name="ImageInfo",
+        help_pages=(
+            "\n"
+            "        Usage: image_info\n"
+            "        or you can get specific pixel info: image_info <x> <y>\n"
+            "        No arguments.\n"
+            "        Displays: size, number of colors, channel mean and standard deviation,\n"
+            "        dominant colors, memory used by undo history\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "load_image": CommandInfo(
+        module="commands.load_image",
+        class_name="LoadImage",
+        help_pages=(
+            "\n"
+            "        Usage: load_image <image_name.png>\n"
+            "\n"
+            "        Default image loading: load_image default\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "ls": CommandInfo(
+        module="commands.ls",
+        class_name="Ls",
+        help_pages=(
+            "\n"
+            "        Usage: ls [pattern] [--long] [--sort name|size|date|pixels] [--reverse]\n"
+            "\n"
+            "        Lists the directory of images.\n"
+            "        pattern: only list files matching it, e.g. *.png\n"
+            "        --long: also show the file size, dimensions, mode and modification date\n"
+            "        --sort: order the files by name (default), file size, date or number of pixels\n"
+            "        --reverse: reverse the order\n"
+            "        ",
+        ),
+        known_options=("long", "sort", "reverse"),
+        raw_args=False,
+    ),
+    "ping": CommandInfo(
+        module="commands.ping",
+        class_name="Ping",
+        help_pages=(
+            "Pong!!!\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "redo": CommandInfo(
+        module="commands.redo",
+        class_name="Redo",
+        help_pages=(
+            "\n"
+            "        Usage: redo\n"
+            "\n"
+            "        Reapplies the last change undone with `undo`.\n"
+            "        Making a new change clears what can be redone.\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "save_image": CommandInfo(
+        module="commands.save_image",
+        class_name="SaveImage",
+        help_pages=(
+            "\n"
+            "        Usage: save_image <image_name.png>\n"
+            "\n"
+            "        Allowed characters: A-Z a-z 0-9 _\n"
+            "\n"
+            "        flags:\n"
+            "        --overwrite overwrites previous image\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "startup": CommandInfo(
+        module="commands.startup",
+        class_name="Startup",
+        help_pages=(
+            "\n"
+            "        Usage: startup\n"
+            "        Shows when each phase of loading the app ended and how long it took, in milliseconds,\n"
+            "        from the page starting to load to the first image frame.\n"
+            "\n"
+            "        Options:\n"
+            "        json: print the report as JSON, the page also exposes it as `startupTiming`\n"
+            "        ",
+        ),
+        known_options=("json",),
+        raw_args=False,
+    ),
+    "terminal_background": CommandInfo(
+        module="commands.terminal_background",
+        class_name="TerminalBackground",
+        help_pages=(
+            "terminal_background is a command that changes background color of the terminal.\n"
+            "\n"
+            "        Usage: terminal_background <color>\n"
+            "        Exemple: bg rgb(255, 100, 0)\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "time": CommandInfo(
+        module="commands.time",
+        class_name="Time",
+        help_pages=(
+            "\n"
+            "        Usage: time <command>\n"
+            "        Runs the command and shows how long it took, in milliseconds, split into stages:\n"
+            "        parse, validation, undo, rasterize, encode and dom.\n"
+            "        The preview is updated before the time is reported, so encoding and displaying the frame are included.\n"
+            "\n"
+            "        Usage: time --stats\n"
+            "        Shows the p50, p95 and p99 run time of each command run so far.\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=True,
+    ),
+    "trace": CommandInfo(
+        module="commands.trace",
+        class_name="Trace",
+        help_pages=(
+            "\n"
+            "        Usage: trace start|stop|dump\n"
+            "        Records how long running commands, drawing, encoding and displaying the image take.\n"
+            "\n"
+            "        start: clear the recorded spans and start recording\n"
+            "        stop: stop recording\n"
+            "        dump: download the recorded spans as trace.json,\n"
+            "              open it in chrome://tracing or https://ui.perfetto.dev\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+    "undo": CommandInfo(
+        module="commands.undo",
+        class_name="Undo",
+        help_pages=(
+            "\n"
+            "        Usage: undo\n"
+            "\n"
+            "        Undoes the last thing you did.\n"
+            "        Can be repeated to step further back, use `redo` to reapply undone changes.\n"
+            "        Loading an image starts a new history.\n"
+            "        ",
+        ),
+        known_options=(),
+        raw_args=False,
+    ),
+}
@@ -46,7 +46,7 @@ class DrawLine(BaseCommand):
             terminal.output_error("Bad amount of arguments, see help for options")
             return False
 
-        size = terminal.image.img.size
+        size = terminal.image.size
         if not (
             args[0].isdigit() and args[1].isdigit() and 0 <= int(args[0]) < size[0] and 0 <= int(args[1]) < size[1]
         ):
@@ -47,7 +47,7 @@ class DrawPolygon(BaseCommand):
             terminal.output_error("Bad amount of arguments, see help for options")
             return False
 
-        size = terminal.image.img.size
+        size = terminal.image.size
         points: list[tuple[int, int]] = []
         for x, y in zip(args[::2], args[1::2], strict=False):
             if not (x.isdigit() and y.isdigit() and 0 <= int(x) < size[0] and 0 <= int(y) < size[1]):
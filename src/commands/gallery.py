@@ -0,0 +1,60 @@
+from fnmatch import fnmatch
+from typing import TYPE_CHECKING
+
+from commands.base_command import BaseCommand
+from image_index import image_index
+
+if TYPE_CHECKING:
+    from terminal import Terminal
+
+
+class Gallery(BaseCommand):
+    """Show thumbnails of the saved images over the preview."""
+
+    name: str = "gallery"
+    help_pages: tuple[str, ...] = (
+        """
+        Usage: gallery [pattern]
+        Shows thumbnails of the images in the image directory over the preview,
+        click one to load it.
+        pattern: only show files matching it, e.g. *.png
+
+        Usage: gallery close
+        Hides the gallery.
+
+        Thumbnails are made in the background and kept in memory,
+        the gallery opens instantly once they were made.
+        """,
+    )
+
+    def __call__(self, terminal: "Terminal", *args: str, **_options: str) -> bool:
+        """Show or close the gallery.
+
+        :param terminal: The terminal instance.
+        :param args: Arguments to be passed to the command.
+        :param options: Options passed to the command with optional arguments with those options.
+        :return: True if command was executed successfully.
+        """
+        if len(args) > 1:
+            terminal.output_error("Usage: gallery [pattern] or gallery close")
+            return False
+        if args == ("close",):
+            terminal.gallery.close()
+            return True
+
+        names = [name for name, entry in image_index.items() if entry.size and (not args or fnmatch(name, args[0]))]
+        if not names:
+            terminal.output_error("No images to show.")
+            return False
+        pending = terminal.gallery.show(names)
+        message = f"Showing {len(terminal.gallery.names)} images, click one to load it or use `gallery close`."
+        if pending:
+            message += f" Making {pending} thumbnails."
+        terminal.output_info(message)
+        return True
+
+    def predict_args(self, _terminal: "Terminal", *args: str, **_options: str) -> str | None:
+        """Argument predictor."""
+        if len(args) == 1 and args[0] and "close".startswith(args[0]):
+            return "close"
+        return ""
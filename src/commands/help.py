@@ -37,9 +37,13 @@ class Help(BaseCommand):
         page = 1
         match len(args):
             case 0:
-                terminal.output_info("Available commands: ")
-                terminal.output_info(", ".join(sorted(commands.all_commands.keys())))
-                terminal.output_info("for more information on a command use `help command`.")
+                terminal.output_lines(
+                    (
+                        "Available commands: ",
+                        ", ".join(sorted(commands.all_commands.keys())),
+                        "for more information on a command use `help command`.",
+                    ),
+                )
                 return True
             case 1:
                 page = 1
@@ -56,22 +60,25 @@ class Help(BaseCommand):
             terminal.output_error("use `help` to see a list of available commands")
             return False
 
-        command = commands.all_commands[args[0]]
+        help_pages = commands.all_commands.help_pages(args[0])
 
-        if page > len(command.help_pages):
+        if page > len(help_pages):
             terminal.output_error(f"`{args[0]}` is not a valid page.")
             return False
 
-        terminal.output_info(f"help for `{args[0]}`\t\t page: {page}/{len(command.help_pages)}")
-        for line in command.help_pages[page - 1].split("\n"):
-            terminal.output_info(line.strip())
+        terminal.output_lines(
+            (
+                f"help for `{args[0]}`\t\t page: {page}/{len(help_pages)}",
+                *(line.strip() for line in help_pages[page - 1].split("\n")),
+            ),
+        )
 
         return True
 
-    def predict_args(self, _terminal: "Terminal", *args: str, **_options: str) -> str | None:
+    def predict_args(self, terminal: "Terminal", *args: str, **_options: str) -> str | None:
         """Predicts the next argument for help.
 
-        :param _terminal: The terminal instance.
+        :param terminal: The terminal instance.
         :param args: Arguments already passed to the command.
         :return: The predicted continuance of the arguments for the command. If new argument, start with space.
                  If no more arguments "". If error in arguments, return None.
@@ -83,10 +90,7 @@ class Help(BaseCommand):
                 return " help"
             case 1:
                 if args[0] not in commands.all_commands:
-                    for command in commands.all_commands:
-                        if command.startswith(args[0]):
-                            return command
-                    return None  # invalid command
+                    return terminal.completion.command(args[0])  # None if invalid command
                 return " 1"
             case 2:
                 if args[1].isdigit():
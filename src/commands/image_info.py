@@ -18,7 +18,8 @@ class ImageInfo(BaseCommand):
         Usage: image_info
         or you can get specific pixel info: image_info <x> <y>
         No arguments.
-        Displays: size, number of colors
+        Displays: size, number of colors, channel mean and standard deviation,
+        dominant colors, memory used by undo history
         """,
     )
 
@@ -32,25 +33,37 @@ class ImageInfo(BaseCommand):
 
         @author Mira
         """
-        info = terminal.image.get_info()
         if len(args) == 2:  # noqa: PLR2004
-            # check if the pixel is in an image
-            if (
-                args[0].isdigit()
-                and args[0].isdigit()
-                and 0 <= int(args[0]) < info["size"][0]
-                and 0 <= int(args[1]) < info["size"][1]
-            ):
-                terminal.output_info(f"Image pixel info (x:{int(args[0])} y:{int(args[1])}):")
-                terminal.output_info(f"Color: rgb{terminal.image.get_pixel(int(args[0]), int(args[1]))}")
+            # check if the pixel is in an image, a single pixel is read without the statistics of `get_info`
+            width, height = terminal.image.size
+            if args[0].isdigit() and args[1].isdigit() and 0 <= int(args[0]) < width and 0 <= int(args[1]) < height:
+                terminal.output_lines(
+                    (
+                        f"Image pixel info (x:{int(args[0])} y:{int(args[1])}):",
+                        f"Color: rgb{terminal.image.get_pixel(int(args[0]), int(args[1]))}",
+                    ),
+                )
                 return True
             terminal.output_error("Incorrectly placed x and y coordinates of a pixel.")
             return False
-        terminal.output_info("Image info:")
-        terminal.output_info(f"Size: {info['size'][0]}x{info['size'][1]} pixels")
-        terminal.output_info(f"Edit count: {info['edits']}")
-        if info["colors"]:
-            terminal.output_info(f"Colors: {len(info['colors'])}")
+        info = terminal.image.get_info()
+        stats = info["colors"]
+        terminal.output_lines(
+            (
+                "Image info:",
+                f"Size: {info['size'][0]}x{info['size'][1]} pixels",
+                f"Edit count: {info['edits']}",
+                f"Colors: {stats.color_count}",
+                "Mean: "
+                + " ".join(f"{channel}:{value:.1f}" for channel, value in zip("RGBA", stats.mean, strict=True)),
+                "Std dev: "
+                + " ".join(f"{channel}:{value:.1f}" for channel, value in zip("RGBA", stats.stddev, strict=True)),
+                "Dominant colors: "
+                + ", ".join(f"rgba{color} {count / stats.pixel_count:.1%}" for color, count in stats.dominant_colors),
+                f"Undo history: {info['undo_levels']} undo, {info['redo_levels']} redo, "
+                f"{info['history_bytes'] / 1024:.1f} KiB",
+            ),
+        )
         return True
 
     def predict_args(self, _terminal: "Terminal", *args: str, **_options: str) -> str | None:
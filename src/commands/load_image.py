@@ -1,4 +1,3 @@
-from pathlib import Path
 from typing import TYPE_CHECKING
 
 from commands.base_command import BaseCommand
@@ -6,8 +5,6 @@ from commands.base_command import BaseCommand
 if TYPE_CHECKING:
     from terminal import Terminal
 
-IMAGES_PATH = Path(__file__).parent.parent.resolve() / "images"
-
 
 class LoadImage(BaseCommand):
     """load_image is a command that loads the given image.
@@ -40,17 +37,21 @@ class LoadImage(BaseCommand):
         if args[0] == "default":
             terminal.image.load()
             terminal.output_info("default image loaded")
-        elif terminal.image.load(args[0]):
-            terminal.output_error("Image not found.")
-            return False
+        else:
+            result = terminal.image.load(args[0])
+            if result == 1:
+                terminal.output_error("Image not found.")
+                return False
+            if result == 2:  # noqa: PLR2004
+                terminal.output_error(f"Image has more than {terminal.image.max_image_pixels} pixels.")
+                return False
+        if terminal.gallery.open:
+            terminal.gallery.close()
         terminal.output_info(f"image `{args[0]}` loaded")
         return True
 
-    def predict_args(self, _terminal: "Terminal", *args: str, **_options: str) -> str | None:
+    def predict_args(self, terminal: "Terminal", *args: str, **_options: str) -> str | None:
         """Argument predictor."""
         if len(args) != 1:
             return ""
-        for path in IMAGES_PATH.iterdir():
-            if path.name.startswith(args[0]):
-                return path.name
-        return ""
+        return terminal.completion.image(args[0]) or ""
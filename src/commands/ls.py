@@ -1,12 +1,35 @@
-from pathlib import Path
+import time
+from fnmatch import fnmatch
 from typing import TYPE_CHECKING
 
 from commands.base_command import BaseCommand
+from image_index import ImageEntry, image_index
 
 if TYPE_CHECKING:
     from terminal import Terminal
 
-IMAGES_PATH = Path(__file__).parent.parent.resolve() / "images"
+SORT_KEYS = {
+    "name": lambda entry: entry.name,
+    "size": lambda entry: entry.bytes,
+    "date": lambda entry: entry.mtime,
+    "pixels": lambda entry: entry.size[0] * entry.size[1] if entry.size else 0,
+}
+
+
+def format_bytes(count: float) -> str:
+    """Return a byte count in B, KiB or MiB."""
+    for unit in ("B", "KiB"):
+        if count < 1024:  # noqa: PLR2004
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} MiB"
+
+
+def format_entry(entry: ImageEntry) -> str:
+    """Return the line of a file in the long listing."""
+    size = f"{entry.size[0]}x{entry.size[1]}" if entry.size else "-"
+    date = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.mtime))
+    return f"{entry.name}  {format_bytes(entry.bytes)}  {size}  {entry.mode or '-'}  {date}"
 
 
 class Ls(BaseCommand):
@@ -18,15 +41,19 @@ class Ls(BaseCommand):
     name: str = "ls"
     help_pages: tuple[str, ...] = (
         """
-        Usage: ls
+        Usage: ls [pattern] [--long] [--sort name|size|date|pixels] [--reverse]
 
         Lists the directory of images.
-        Does not need any arguments.
+        pattern: only list files matching it, e.g. *.png
+        --long: also show the file size, dimensions, mode and modification date
+        --sort: order the files by name (default), file size, date or number of pixels
+        --reverse: reverse the order
         """,
     )
+    known_options: tuple[str, ...] = ("long", "sort", "reverse")
 
-    def __call__(self, terminal: "Terminal", *args: str, **_options: str) -> bool:
-        """List all image files.
+    def __call__(self, terminal: "Terminal", *args: str, **options: str) -> bool:
+        """List image files from the image index.
 
         :param terminal: The terminal instance.
         :param args: Arguments to be passed to the command.
@@ -35,9 +62,22 @@ class Ls(BaseCommand):
 
         @author Mira
         """
-        if args:
-            terminal.output_error("No arguments needed")
-        terminal.output_info("Files: " + " ".join([path.name for path in IMAGES_PATH.iterdir() if path.is_file()]))
+        if len(args) > 1:
+            terminal.output_error("Give at most one pattern, e.g. `ls *.png`.")
+            return False
+        sort = options.get("sort") or "name"
+        if sort not in SORT_KEYS:
+            terminal.output_error(f"Can't sort by `{sort}`, use one of: {', '.join(SORT_KEYS)}.")
+            return False
+
+        entries = [entry for name, entry in image_index.items() if not args or fnmatch(name, args[0])]
+        entries.sort(key=SORT_KEYS[sort], reverse="reverse" in options)
+        if not entries:
+            terminal.output_info("No files.")
+        elif "long" in options:
+            terminal.output_lines(format_entry(entry) for entry in entries)
+        else:
+            terminal.output_info("Files: " + " ".join(entry.name for entry in entries))
         return True
 
     def predict_args(self, _terminal: "Terminal", *_args: str, **_options: str) -> str | None:
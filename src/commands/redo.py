@@ -0,0 +1,38 @@
+from typing import TYPE_CHECKING
+
+from commands.base_command import BaseCommand
+
+if TYPE_CHECKING:
+    from terminal import Terminal
+
+
+class Redo(BaseCommand):
+    """Magic Redo button, the other half of `undo`."""
+
+    name: str = "redo"
+    help_pages: tuple[str, ...] = (
+        """
+        Usage: redo
+
+        Reapplies the last change undone with `undo`.
+        Making a new change clears what can be redone.
+        """,
+    )
+
+    def __call__(self, terminal: "Terminal", *_args: str, **_options: str) -> bool:
+        """Reapply the last undone change.
+
+        :param terminal: The terminal instance.
+        :param args: Arguments to be passed to the command.
+        :param options: Options passed to the command with optional arguments with those options.
+        :return: True if command was executed successfully.
+        """
+        if terminal.image.redo():
+            terminal.output_error("Nothing to redo.")
+            return False
+        terminal.output_success("Redone :)")
+        return True
+
+    def predict_args(self, _terminal: "Terminal", *_args: str, **_options: str) -> str | None:
+        """Argument predictor."""
+        return ""
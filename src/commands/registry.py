@@ -0,0 +1,69 @@
+import importlib
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from commands.base_command import BaseCommand
+
+
+class CommandInfo(NamedTuple):
+    """What is known about a command without importing it, see `commands.command_index`."""
+
+    module: str
+    class_name: str
+    help_pages: tuple[str, ...]
+    known_options: tuple[str, ...] = ()
+    raw_args: bool = False
+
+
+class CommandRegistry(Mapping[str, "BaseCommand"]):
+    """Commands by name, imported and instantiated the first time they are looked up.
+
+    Names, help pages and known options come from a static index, so listing commands, checking options
+    or printing help doesn't import any command module. `version` changes whenever the set of commands does.
+    """
+
+    def __init__(self, index: Mapping[str, CommandInfo]) -> None:
+        self.index = dict(index)
+        self.version = 0
+        self._commands: dict[str, BaseCommand] = {}
+
+    def __getitem__(self, name: str) -> "BaseCommand":
+        command = self._commands.get(name)
+        if command is None:
+            info = self.index[name]
+            command_class = getattr(importlib.import_module(info.module), info.class_name)
+            command = self._commands[name] = command_class()
+        return command
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def loaded(self) -> tuple[str, ...]:
+        """Names of the commands imported so far."""
+        return tuple(self._commands)
+
+    def help_pages(self, name: str) -> tuple[str, ...]:
+        """Return the help pages of a command without importing it."""
+        return self.index[name].help_pages
+
+    def known_options(self, name: str) -> tuple[str, ...]:
+        """Return the options a command takes without importing it."""
+        return self.index[name].known_options
+
+    def raw_args(self, name: str) -> bool:
+        """Return whether a command takes its arguments unparsed, without importing it."""
+        return self.index[name].raw_args
+
+    def register(self, name: str, info: CommandInfo) -> None:
+        """Add or replace a command that isn't in the generated index."""
+        self.index[name] = info
+        self._commands.pop(name, None)
+        self.version += 1
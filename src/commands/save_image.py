@@ -1,14 +1,12 @@
-from pathlib import Path
 from string import ascii_letters, digits
 from typing import TYPE_CHECKING
 
 from commands.base_command import BaseCommand
+from image_index import image_index
 
 if TYPE_CHECKING:
     from terminal import Terminal
 
-IMAGES_PATH = Path(__file__).parent.parent.resolve() / "images"
-
 
 class SaveImage(BaseCommand):
     """...
@@ -53,22 +51,22 @@ class SaveImage(BaseCommand):
                 terminal.output_error("Invalid characters in Image name.")
                 terminal.output_error("Please check `help save_image` for more information.")
                 return False
-        if (IMAGES_PATH / path).exists() and not args.__contains__("--overwrite"):
+        if path in image_index and not args.__contains__("--overwrite"):
             terminal.output_error("This path already exists, use --overwrite to overwrite it")
             return False
         terminal.image.save(path)
         terminal.output_info(f"Image succesfully saved as `{path}`")
         return True
 
-    def predict_args(self, _terminal: "Terminal", *args: str, **_options: str) -> str | None:
+    def predict_args(self, terminal: "Terminal", *args: str, **_options: str) -> str | None:
         """Argument predictor."""
         if len(args) > 2 or len(args) == 0:  # noqa: PLR2004
             return ""
         if args[0].endswith(".png"):
-            if (IMAGES_PATH / args[0]).exists():
+            if args[0] in image_index:
                 return args[0] + " --overwrite"
             return ""
-        for path in IMAGES_PATH.iterdir():
-            if path.name.startswith(args[0]):
-                return path.name + " --overwrite"
+        name = terminal.completion.image(args[0])
+        if name is not None:
+            return name + " --overwrite"
         return args[0].split(".")[0] + ".png"
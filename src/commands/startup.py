@@ -0,0 +1,54 @@
+from typing import TYPE_CHECKING
+
+from commands.base_command import BaseCommand
+from timing import startup
+
+if TYPE_CHECKING:
+    from terminal import Terminal
+
+
+class Startup(BaseCommand):
+    """Report how long each startup phase took."""
+
+    name: str = "startup"
+    help_pages: tuple[str, ...] = (
+        """
+        Usage: startup
+        Shows when each phase of loading the app ended and how long it took, in milliseconds,
+        from the page starting to load to the first image frame.
+
+        Options:
+        json: print the report as JSON, the page also exposes it as `startupTiming`
+        """,
+    )
+    known_options = ("json",)
+
+    def __call__(self, terminal: "Terminal", *_args: str, **options: str) -> bool:
+        """Print the startup phases.
+
+        :param terminal: The terminal instance.
+        :param args: Arguments to be passed to the command.
+        :param options: Options passed to the command with optional arguments with those options.
+        :return: True if command was executed successfully.
+        """
+        if "json" in options:
+            terminal.output_info(startup.to_json())
+            return True
+
+        report = startup.report()
+        if not report["phases"]:
+            terminal.output_error("No startup phases were recorded.")
+            return False
+
+        width = max(len(phase["phase"]) for phase in report["phases"])
+        lines = [f"Startup: {report['total_ms']:.0f} ms"]
+        lines.extend(
+            f"  {phase['phase']:<{width}}  {phase['end_ms']:>8.1f} ms  (+{phase['duration_ms']:.1f} ms)"
+            for phase in report["phases"]
+        )
+        terminal.output_lines(lines)
+        return True
+
+    def predict_args(self, _terminal: "Terminal", *_args: str, **_options: str) -> str | None:
+        """Argument predictor."""
+        return ""
@@ -0,0 +1,84 @@
+from typing import TYPE_CHECKING
+
+from commands.base_command import BaseCommand
+from profiling import STAGES, profiler
+
+if TYPE_CHECKING:
+    from terminal import Terminal
+
+
+class Time(BaseCommand):
+    """Run a command and report how long each stage of it took."""
+
+    name: str = "time"
+    help_pages: tuple[str, ...] = (
+        """
+        Usage: time <command>
+        Runs the command and shows how long it took, in milliseconds, split into stages:
+        parse, validation, undo, rasterize, encode and dom.
+        The preview is updated before the time is reported, so encoding and displaying the frame are included.
+
+        Usage: time --stats
+        Shows the p50, p95 and p99 run time of each command run so far.
+        """,
+    )
+    raw_args = True
+
+    def __call__(self, terminal: "Terminal", *args: str, **_options: str) -> bool:
+        """Run a command with the profiler active and print its stage timings.
+
+        :param terminal: The terminal instance.
+        :param args: The command line to time, or `--stats`.
+        :param options: Not used, options are passed on to the timed command.
+        :return: True if command was executed successfully.
+        """
+        if not args:
+            terminal.output_error("Give a command to time, or --stats.")
+            return False
+
+        if args == ("--stats",):
+            return self.print_stats(terminal)
+
+        # Renders already scheduled by earlier commands aren't part of this one
+        terminal.image.flush()
+        with profiler.profile() as timings:
+            terminal.run_str(" ".join(args))
+            terminal.image.flush()
+
+        terminal.output_lines(
+            (
+                f"{args[0]}: {sum(timings.values()) * 1000:.2f} ms",
+                *(
+                    f"  {stage:<10}  {timings[stage] * 1000:>8.2f} ms"
+                    for stage in (*STAGES, "other")
+                    if stage in timings
+                ),
+            ),
+        )
+        return True
+
+    @staticmethod
+    def print_stats(terminal: "Terminal") -> bool:
+        """Print the run time percentiles of each command.
+
+        :param terminal: The terminal instance.
+        :return: True if any command was run.
+        """
+        summary = terminal.command_stats.summary()
+        if not summary:
+            terminal.output_error("No commands were run yet.")
+            return False
+
+        width = max(len(command) for command in summary)
+        lines = [f"{'command':<{width}}  {'runs':>5}  {'p50':>8}  {'p95':>8}  {'p99':>8}"]
+        lines.extend(
+            f"{command:<{width}}  {stats['count']:>5}  "
+            f"{stats['p50']:>8.2f}  {stats['p95']:>8.2f}  {stats['p99']:>8.2f}"
+            for command, stats in summary.items()
+        )
+        terminal.output_lines(lines)
+        return True
+
+    def predict_args(self, _terminal: "Terminal", *_args: str, **_options: str) -> str | None:
+        """Argument predictor."""
+        return ""
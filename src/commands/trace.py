@@ -0,0 +1,65 @@
+from typing import TYPE_CHECKING
+
+from commands.base_command import BaseCommand
+from tracing import TRACE_FILE, tracer
+
+if TYPE_CHECKING:
+    from terminal import Terminal
+
+ACTIONS = ("start", "stop", "dump")
+
+
+class Trace(BaseCommand):
+    """Record spans of the work done by commands and the preview, and download them as a Chrome trace."""
+
+    name: str = "trace"
+    help_pages: tuple[str, ...] = (
+        """
+        Usage: trace start|stop|dump
+        Records how long running commands, drawing, encoding and displaying the image take.
+
+        start: clear the recorded spans and start recording
+        stop: stop recording
+        dump: download the recorded spans as trace.json,
+              open it in chrome://tracing or https://ui.perfetto.dev
+        """,
+    )
+
+    def __call__(self, terminal: "Terminal", *args: str, **_options: str) -> bool:
+        """Start, stop or dump tracing.
+
+        :param terminal: The terminal instance.
+        :param args: Arguments to be passed to the command.
+        :param options: Options passed to the command with optional arguments with those options.
+        :return: True if command was executed successfully.
+        """
+        if len(args) != 1 or args[0] not in ACTIONS:
+            terminal.output_error("Usage: trace start|stop|dump")
+            return False
+
+        if args[0] == "start":
+            tracer.start()
+            terminal.output_info(f"Tracing started, the latest {tracer.spans.maxlen} spans are kept.")
+        elif args[0] == "stop":
+            tracer.stop()
+            terminal.output_info(f"Tracing stopped, {len(tracer.spans)} spans recorded.")
+        else:
+            if not tracer.spans:
+                terminal.output_error("No spans recorded, use `trace start` first.")
+                return False
+            if not tracer.dump():
+                terminal.output_error("Traces can only be downloaded in the browser.")
+                return False
+            terminal.output_success(f"Trace of {len(tracer.spans)} spans saved as `{TRACE_FILE}`.")
+        return True
+
+    def predict_args(self, _terminal: "Terminal", *args: str, **_options: str) -> str | None:
+        """Argument predictor."""
+        if not args:
+            return " start"
+        if len(args) > 1:
+            return None
+        for action in ACTIONS:
+            if action.startswith(args[0]):
+                return action
+        return None
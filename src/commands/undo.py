@@ -18,7 +18,8 @@ class Undo(BaseCommand):
         Usage: undo
 
         Undoes the last thing you did.
-        Can be only done once!
+        Can be repeated to step further back, use `redo` to reapply undone changes.
+        Loading an image starts a new history.
         """,
     )
 
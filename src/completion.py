@@ -0,0 +1,189 @@
+"""Completion of the text typed into the terminal, queried on every key press.
+
+Command names, the options of each command, CSS color names and the files of the image directory are kept in
+prefix tries, a lookup walks the typed prefix and doesn't depend on how many names there are. Whole predictions
+are memoized by the typed text and the terminal colors, since `fg` and `bg` predict the current color. The command
+tries are rebuilt when the command registry's version changes, image names come from `image_index`, and memoized
+predictions are dropped when either changes.
+"""
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from utils.color import CSS_COLORS
+
+if TYPE_CHECKING:
+    from commands.registry import CommandRegistry
+    from image_index import ImageIndex
+    from terminal import Terminal
+
+# Number of typed texts whose prediction is kept
+COMPLETION_CACHE_SIZE = 256
+# Options whose value is a color
+COLOR_OPTIONS = ("fg", "bg")
+
+
+class _Node:
+    """Node of a `PrefixTrie`, `first` is the smallest word below it."""
+
+    __slots__ = ("children", "first")
+
+    def __init__(self, first: str) -> None:
+        self.children: dict[str, _Node] = {}
+        self.first = first
+
+
+class PrefixTrie:
+    """Set of words answering which is the smallest one starting with a prefix, in time of the prefix length."""
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: _Node | None = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str) -> None:
+        """Add a word."""
+        if self._root is None:
+            self._root = _Node(word)
+        node = self._root
+        node.first = min(node.first, word)
+        for character in word:
+            child = node.children.get(character)
+            if child is None:
+                child = node.children[character] = _Node(word)
+            else:
+                child.first = min(child.first, word)
+            node = child
+
+    def first(self, prefix: str) -> str | None:
+        """Return the smallest word starting with the prefix, None if there is none."""
+        node = self._root
+        for character in prefix:
+            if node is None:
+                return None
+            node = node.children.get(character)
+        return None if node is None else node.first
+
+
+class CompletionEngine:
+    """Predicts commands, options, colors and image names for a terminal.
+
+    :param commands: the registry commands are completed from
+    :param images: the index of the directory image names are completed from
+    :param cache_size: number of predictions kept
+    """
+
+    def __init__(
+        self,
+        commands: "CommandRegistry",
+        images: "ImageIndex",
+        cache_size: int = COMPLETION_CACHE_SIZE,
+    ) -> None:
+        self.commands = commands
+        self.images = images
+        self.cache_size = cache_size
+        self.colors = PrefixTrie(CSS_COLORS)
+
+        self._commands_version: int | None = None
+        self._command_trie = PrefixTrie()
+        self._option_tries: dict[str, PrefixTrie] = {}
+        self._images_version: int | None = None
+        self._predictions: OrderedDict[tuple[str, tuple[int, ...], tuple[int, ...]], str | None] = OrderedDict()
+
+    def invalidate(self) -> None:
+        """Forget memoized predictions, e.g. after the state predictions come from changed."""
+        self._predictions.clear()
+
+    def _check_commands(self) -> None:
+        if self._commands_version != self.commands.version:
+            self._commands_version = self.commands.version
+            self._command_trie = PrefixTrie(self.commands)
+            self._option_tries.clear()
+            self.invalidate()
+
+    def _check_images(self) -> None:
+        self.images.refresh()
+        if self._images_version != self.images.version:
+            self._images_version = self.images.version
+            self.invalidate()
+
+    def command(self, prefix: str) -> str | None:
+        """Return the first command name starting with the prefix."""
+        self._check_commands()
+        return self._command_trie.first(prefix)
+
+    def option(self, command: str, prefix: str) -> str | None:
+        """Return the first option of a command starting with the prefix, without the leading `--`."""
+        self._check_commands()
+        trie = self._option_tries.get(command)
+        if trie is None:
+            trie = self._option_tries[command] = PrefixTrie(self.commands.known_options(command))
+        return trie.first(prefix)
+
+    def color(self, prefix: str) -> str | None:
+        """Return the first CSS color name starting with the prefix."""
+        return self.colors.first(prefix.lower())
+
+    def image(self, prefix: str) -> str | None:
+        """Return the first file name in the image directory starting with the prefix."""
+        return self.images.first(prefix)
+
+    def predict(self, terminal: "Terminal", command_str: str) -> str | None:
+        """Predict the command and arguments being typed, see `Terminal.predict_command`."""
+        self._check_commands()
+        self._check_images()
+        # The colors `fg` and `bg` predict are part of the key, running them doesn't forget other predictions
+        key = (command_str, terminal.foreground_color.rgba, terminal.background_color.rgba)
+        if key in self._predictions:
+            self._predictions.move_to_end(key)
+            return self._predictions[key]
+
+        prediction = self._predict(terminal, command_str)
+        self._predictions[key] = prediction
+        if len(self._predictions) > self.cache_size:
+            self._predictions.popitem(last=False)
+        return prediction
+
+    def _predict(self, terminal: "Terminal", command_str: str) -> str | None:
+        # Imported here, the terminal module imports this one
+        from terminal import get_options  # noqa: PLC0415
+
+        if command_str.strip() == "":
+            return ""
+
+        command, *args = command_str.strip().split()
+        if command not in self.commands:
+            return self._command_trie.first(command)
+
+        if args and not command_str[-1].isspace():
+            completed = self._complete_option(command, args)
+            if completed is not None:
+                return completed
+
+        args, options = get_options(args)
+        prediction = self.commands[command].predict_args(terminal, *args, **options)
+        if prediction is None:
+            return None
+        if prediction == "":
+            return command_str
+        output = command
+        if not prediction.startswith(" "):
+            args.pop()
+            prediction = " " + prediction
+        if args:
+            output += " " + " ".join(args)
+        return output + prediction
+
+    def _complete_option(self, command: str, args: list[str]) -> str | None:
+        """Complete an option name or the color value of an option being typed, None if neither is."""
+        last = args[-1]
+        completed = None
+        if last.startswith("--"):
+            option = self.option(command, last[2:])
+            completed = None if option is None else "--" + option
+        elif len(args) > 1 and args[-2].startswith("--") and args[-2][2:] in COLOR_OPTIONS and last.isalpha():
+            completed = self.color(last)
+        if completed is None or completed == last:
+            return None
+        return " ".join((command, *args[:-1], completed))
@@ -0,0 +1,163 @@
+"""The terminal and image engine, driven through messages so it can run in a Web Worker.
+
+The engine owns the `Terminal` and `PaintImage`, the page only keeps the GUI and talks to it through a `Channel`,
+see `engine_protocol` for the messages. Nothing here touches the DOM, so the engine runs the same in a worker,
+in the page or headless with `engine_protocol.channel_pair`.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from engine_protocol import (
+    Channel,
+    Message,
+    error_message,
+    gallery_close_message,
+    gallery_message,
+    image_link_message,
+    image_message,
+    output_lines_message,
+    output_message,
+    prediction_message,
+    region_message,
+    terminal_style_message,
+    thumbnail_message,
+)
+from image import PaintImage
+from render_scheduler import Box
+from terminal import Terminal
+from timing import startup
+
+
+class RemoteTerminalDisplay:
+    """Terminal display forwarding output to the `TerminalGui` on the other end of a channel."""
+
+    def __init__(self, channel: Channel) -> None:
+        self.channel = channel
+        self.terminal: Terminal | None = None
+        self._background_color = ""
+
+    @property
+    def background_color(self) -> str:
+        """The background color of the terminal, as last set from the engine."""
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, value: str) -> None:
+        self._background_color = value
+        self.channel.post(terminal_style_message("background_color", value))
+
+    def print_terminal_output(self, text: str, color: str | None = None) -> None:
+        """Print the given text to the terminal output."""
+        self.channel.post(output_message(text, color))
+
+    def print_terminal_lines(self, lines: list[str], color: str | None = None) -> None:
+        """Print several lines to the terminal output at once."""
+        self.channel.post(output_lines_message(lines, color))
+
+
+class RemoteImageDisplay:
+    """Image display forwarding frames to the `ImagePreview` on the other end of a channel.
+
+    Frames and regions are posted with their buffers transferred. The display size is the one last reported by
+    the page with a `resize` message.
+    """
+
+    def __init__(self, channel: Channel) -> None:
+        self.channel = channel
+        self.size: tuple[int, int] | None = None
+
+    def display_image(self, image_src: str, source_size: tuple[int, int] | None = None) -> None:
+        """Display an image from a URL."""
+        self.channel.post(image_link_message(image_src, source_size))
+
+    def display_image_bytes(
+        self,
+        data: bytes | memoryview,
+        mime_type: str = "image/png",
+        source_size: tuple[int, int] | None = None,
+    ) -> None:
+        """Display an encoded image file."""
+        self.channel.post(image_message(data, mime_type, source_size), transfer=[data])
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Return the size in device pixels the image can be displayed at, None if not reported yet."""
+        return self.size
+
+    def update_region(self, box: Box, data: bytes) -> None:
+        """Replace a region of the displayed image with raw RGBA pixels."""
+        self.channel.post(region_message(box, data), transfer=[data])
+
+    def show_gallery(self, names: list[str]) -> None:
+        """Show a gallery of image files over the image."""
+        self.channel.post(gallery_message(names))
+
+    def show_thumbnail(self, name: str, data: bytes, mime_type: str) -> None:
+        """Show the thumbnail of a file in the gallery."""
+        self.channel.post(thumbnail_message(name, data, mime_type), transfer=[data])
+
+    def hide_gallery(self) -> None:
+        """Hide the gallery."""
+        self.channel.post(gallery_close_message())
+
+
+class Engine:
+    """Runs the terminal and image behind a channel, handling the messages the page sends.
+
+    `request_frame` schedules preview renders like it does for `PaintImage`, in a worker it is the worker's
+    `requestAnimationFrame`. Without it renders wait for `image.flush`.
+    """
+
+    def __init__(
+        self,
+        channel: Channel,
+        request_frame: Callable[[Callable[[Any], None]], Any] | None = None,
+    ) -> None:
+        self.channel = channel
+        self.terminal_display = RemoteTerminalDisplay(channel)
+        self.image_display = RemoteImageDisplay(channel)
+
+        self.image = PaintImage(self.image_display, request_frame=request_frame)
+        self.image.load()
+        startup.mark("image_loaded")
+        self.terminal = Terminal(self.image, self.terminal_display)
+
+        self._handlers: dict[str, Callable[[Message], None]] = {
+            "run": self._on_run,
+            "predict": self._on_predict,
+            "load": self._on_load,
+            "resize": self._on_resize,
+            "startup": self._on_startup,
+        }
+        channel.on_message = self.handle_message
+
+    def handle_message(self, message: Message) -> None:
+        """Handle a message from the page."""
+        handler = self._handlers.get(message.get("type"))
+        if handler is None:
+            print(f"Warning: engine received an unknown message {message.get('type')!r}.")
+            return
+        handler(message)
+
+    def _on_run(self, message: Message) -> None:
+        self.terminal.run_str(message["command"])
+
+    def _on_predict(self, message: Message) -> None:
+        text = message["text"]
+        prediction = self.terminal.predict_command(text) if text else None
+        self.channel.post(prediction_message(message["id"], text, prediction))
+
+    def _on_load(self, message: Message) -> None:
+        result = self.image.load_from_bytes(message["data"])
+        if result == 1:
+            self.channel.post(error_message("Could not read the image file."))
+        elif result == 2:  # noqa: PLR2004
+            self.channel.post(error_message(f"Image has more than {self.image.max_image_pixels} pixels."))
+
+    def _on_resize(self, message: Message) -> None:
+        size = message["display_size"]
+        self.image_display.size = (int(size[0]), int(size[1])) if size else None
+        self.image.update_preview_scale()
+
+    def _on_startup(self, message: Message) -> None:
+        startup.record(message["marks"], message["origin"])
@@ -0,0 +1,184 @@
+"""Messages exchanged between the page and the engine running in a Web Worker.
+
+Every message is a dict with a "type" key. Pixel and file data travel as buffers, listed in `transfer` when posted
+so the browser moves them to the other thread instead of copying them.
+
+Page to engine:
+
+- `run`: run a command line, `{"command": str}`
+- `predict`: predict the command being typed, `{"id": int, "text": str}`, answered with `prediction`
+- `load`: load an image file, `{"data": buffer}`, answered with `error` if it can't be loaded
+- `resize`: the preview is shown at another size, `{"display_size": [width, height] | None}`
+- `startup`: startup phases the page went through, `{"origin": float | None, "marks": {phase: float}}`
+
+Engine to page:
+
+- `output`: print a line in the terminal, `{"text": str, "color": str | None}`
+- `output_lines`: print several lines in the terminal at once, `{"lines": [str], "color": str | None}`
+- `terminal_style`: set a style property of the terminal, `{"name": str, "value": str}`
+- `prediction`: `{"id": int, "text": str, "prediction": str | None}`
+- `image`: display an encoded frame, `{"data": buffer, "mime_type": str, "source_size": [width, height] | None}`
+- `image_link`: display a frame from a URL, `{"src": str, "source_size": [width, height] | None}`
+- `region`: replace a region of the displayed frame, `{"box": [left, upper, right, lower], "data": buffer}`
+- `gallery`: show a gallery of image files over the preview, `{"names": [str]}`
+- `thumbnail`: show the thumbnail of a file in the gallery, `{"name": str, "data": buffer, "mime_type": str}`
+- `gallery_close`: hide the gallery, `{}`
+- `error`: show an error in the preview, `{"message": str}`
+- `startup_report`: startup phases once the first frame is rendered, `{"report": dict}`, see `timing`
+- `trace`: start, stop or dump tracing on the page too, `{"action": str, "events": [dict]}`, see `tracing`
+"""
+
+from collections import deque
+from collections.abc import Callable, Sequence
+from typing import Any, Protocol
+
+Message = dict[str, Any]
+Buffer = bytes | memoryview
+
+
+def run_message(command: str) -> Message:
+    """Return a message running a command line in the engine."""
+    return {"type": "run", "command": command}
+
+
+def predict_message(request_id: int, text: str) -> Message:
+    """Return a message asking the engine to predict the command being typed."""
+    return {"type": "predict", "id": request_id, "text": text}
+
+
+def load_message(data: Buffer) -> Message:
+    """Return a message loading an image file in the engine."""
+    return {"type": "load", "data": data}
+
+
+def resize_message(display_size: tuple[int, int] | None) -> Message:
+    """Return a message telling the engine the size the preview is shown at."""
+    return {"type": "resize", "display_size": list(display_size) if display_size else None}
+
+
+def startup_message(origin: float | None, marks: dict[str, float]) -> Message:
+    """Return a message handing the startup marks of the page to the engine."""
+    return {"type": "startup", "origin": origin, "marks": marks}
+
+
+def output_message(text: str, color: str | None = None) -> Message:
+    """Return a message printing a line in the terminal."""
+    return {"type": "output", "text": text, "color": color}
+
+
+def output_lines_message(lines: list[str], color: str | None = None) -> Message:
+    """Return a message printing several lines in the terminal at once."""
+    return {"type": "output_lines", "lines": lines, "color": color}
+
+
+def terminal_style_message(name: str, value: str) -> Message:
+    """Return a message setting a style property of the terminal."""
+    return {"type": "terminal_style", "name": name, "value": value}
+
+
+def prediction_message(request_id: int, text: str, prediction: str | None) -> Message:
+    """Return the answer to a `predict` message."""
+    return {"type": "prediction", "id": request_id, "text": text, "prediction": prediction}
+
+
+def image_message(data: Buffer, mime_type: str, source_size: tuple[int, int] | None) -> Message:
+    """Return a message displaying an encoded frame."""
+    return {
+        "type": "image",
+        "data": data,
+        "mime_type": mime_type,
+        "source_size": list(source_size) if source_size else None,
+    }
+
+
+def image_link_message(src: str, source_size: tuple[int, int] | None) -> Message:
+    """Return a message displaying a frame from a URL."""
+    return {"type": "image_link", "src": src, "source_size": list(source_size) if source_size else None}
+
+
+def region_message(box: tuple[int, int, int, int], data: Buffer) -> Message:
+    """Return a message replacing a region of the displayed frame."""
+    return {"type": "region", "box": list(box), "data": data}
+
+
+def gallery_message(names: list[str]) -> Message:
+    """Return a message showing a gallery of image files over the preview."""
+    return {"type": "gallery", "names": names}
+
+
+def thumbnail_message(name: str, data: Buffer, mime_type: str) -> Message:
+    """Return a message showing the thumbnail of a file in the gallery."""
+    return {"type": "thumbnail", "name": name, "data": data, "mime_type": mime_type}
+
+
+def gallery_close_message() -> Message:
+    """Return a message hiding the gallery."""
+    return {"type": "gallery_close"}
+
+
+def startup_report_message(report: dict[str, Any]) -> Message:
+    """Return a message handing the startup report of the engine to the page."""
+    return {"type": "startup_report", "report": report}
+
+
+def trace_message(action: str, events: list[dict[str, Any]]) -> Message:
+    """Return a message handing a `trace` action of the engine to the page, with the engine's trace events."""
+    return {"type": "trace", "action": action, "events": events}
+
+
+def error_message(message: str) -> Message:
+    """Return a message showing an error in the preview."""
+    return {"type": "error", "message": message}
+
+
+class Channel(Protocol):
+    """One end of a message channel between the page and the engine."""
+
+    on_message: Callable[[Message], None] | None
+
+    def post(self, message: Message, transfer: Sequence[Buffer] = ()) -> None:
+        """Send a message to the other end.
+
+        :param message: the message
+        :param transfer: buffers of the message the other end takes ownership of
+        """
+        ...
+
+
+class FakeChannel:
+    """In-process channel end, used to run the engine and the page side together without a worker.
+
+    Messages are queued on the receiving end until `pump` is called on it, like they would wait for the other
+    thread. Buffers are copied when posted, so neither end can see the other's memory, transferred or not.
+    """
+
+    def __init__(self) -> None:
+        self.on_message: Callable[[Message], None] | None = None
+        self.peer: FakeChannel | None = None
+        self.inbox: deque[Message] = deque()
+
+    def post(self, message: Message, transfer: Sequence[Buffer] = ()) -> None:  # noqa: ARG002
+        """Queue a message on the other end."""
+        self.peer.inbox.append(
+            {key: bytes(value) if isinstance(value, Buffer) else value for key, value in message.items()},
+        )
+
+    def pump(self) -> int:
+        """Deliver queued messages, including ones posted while delivering.
+
+        :return: number of messages delivered
+        """
+        delivered = 0
+        while self.inbox:
+            message = self.inbox.popleft()
+            if self.on_message is not None:
+                self.on_message(message)
+            delivered += 1
+        return delivered
+
+
+def channel_pair() -> tuple[FakeChannel, FakeChannel]:
+    """Return both ends of an in-process channel."""
+    page, engine = FakeChannel(), FakeChannel()
+    page.peer, engine.peer = engine, page
+    return page, engine
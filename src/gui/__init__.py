@@ -127,20 +127,32 @@ body {
     background-color: var(--terminal-output-color);
 }
 
+.terminal-success {
+    --terminal-output-color: var(--terminal-success-color);
+}
+
+.terminal-error {
+    --terminal-output-color: var(--terminal-error-color);
+}
+
 .terminal-input-verb-text, .command-verb-span {
     text-decoration: underline;
 }
 """
 
 
-def init_gui() -> Element:
+def init_gui(worker_url: str | None = None) -> Element:
     """Initialize the top-level layout for the application.
 
+    Args:
+        worker_url: Script of a Web Worker to run the terminal and image engine in, `None` to run it on the page
+
     ---
 
     Authors:
         - Jont
         - Ricky
+
     """
     # Hide the loading screen
     js.document.getElementById("loading").style.display = "none"
@@ -153,7 +165,7 @@ def init_gui() -> Element:
     js.document.head.appendChild(base_style.html_element)
 
     # Create the main layout with image preview, separator, and terminal
-    layout = Layout(parent=body)
+    layout = Layout(parent=body, worker_url=worker_url)
 
     # Set up global event handlers
     body.on("click", lambda _: layout.description["classList"].remove("open"))
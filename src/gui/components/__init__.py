@@ -5,10 +5,11 @@ from .image_preview import ImagePreview
 from .separator import Separator
 from .terminal_gui import TerminalGui
 from .terminal_input import TerminalInput
-from .terminal_io import TerminalHistory, TerminalInputVerb, TerminalOutput, UserInput
+from .terminal_io import HistoryLine, TerminalHistory, TerminalInputVerb, TerminalOutput, UserInput
 
 __all__ = [
     "Description",
+    "HistoryLine",
     "ImagePreview",
     "Separator",
     "TerminalGui",
@@ -1,9 +1,9 @@
-import base64
 from collections.abc import Callable
 from typing import Any
 
 import js  # type: ignore[import]
-from pyodide.ffi import create_proxy
+
+from gui.element import Element, EventListeners
 
 
 class FileUploadHandler:
@@ -17,13 +17,13 @@ class FileUploadHandler:
 
     def __init__(
         self,
-        on_file_processed: Callable[[str], None],
+        on_file_processed: Callable[[bytes, str], None],
         on_error: Callable[[str], None],
     ) -> None:
         """Initialize file upload handler.
 
         Args:
-            on_file_processed: Callback when file is successfully processed with data URL
+            on_file_processed: Callback when file is successfully processed with the file contents and MIME type
             on_error: Callback when an error occurs during file processing
 
         ---
@@ -33,6 +33,7 @@ class FileUploadHandler:
         """
         self.on_file_processed = on_file_processed
         self.on_error = on_error
+        self.file_input: Element | None = None
 
     def handle_click_upload(self, _event: Any) -> None:  # noqa: ANN401
         """Handle click to upload functionality.
@@ -45,27 +46,27 @@ class FileUploadHandler:
         :author: Ricky
 
         """
-        # Create a hidden file input
-        file_input = js.document.createElement("input")
-        file_input.type = "file"
-        file_input.accept = "image/*"
-        file_input.style.display = "none"
-
-        # Handle file selection
-        def handle_file_select(e: Any) -> None:  # noqa: ANN401
-            files = e.target.files
-            if files.length > 0:
-                self.process_file(files.item(0))
-
-        # Create a persistent proxy for the event handler
-        file_select_proxy = create_proxy(handle_file_select)
-        file_input.addEventListener("change", file_select_proxy)
-        js.document.body.appendChild(file_input)
-        file_input.click()
-        js.document.body.removeChild(file_input)
+        # The hidden file input and its listener are created once and reused for every click
+        if self.file_input is None:
+            self.file_input = Element(element=js.document.createElement("input"))
+            self.file_input["type"] = "file"
+            self.file_input["accept"] = "image/*"
+            self.file_input["style"].display = "none"
+            self.file_input.on("change", self._handle_file_select)
+
+        # Cleared so picking the same file again is a change too
+        self.file_input["value"] = ""
+        js.document.body.appendChild(self.file_input.html_element)
+        self.file_input.html_element.click()
+        js.document.body.removeChild(self.file_input.html_element)
+
+    def _handle_file_select(self, event: Any) -> None:  # noqa: ANN401
+        files = event.target.files
+        if files.length > 0:
+            self.process_file(files.item(0))
 
     def process_file(self, file: Any) -> None:  # noqa: ANN401
-        """Process the uploaded file and convert it to a data URL.
+        """Read the uploaded file and hand its contents over.
 
         Args:
             file: The file to process
@@ -77,34 +78,27 @@ class FileUploadHandler:
         """
         reader = js.FileReader.new()
 
-        # Create a persistent proxy for the load event handler
-        def on_load(event: Any) -> None:  # noqa: ANN401
-            # Get the file data
-            array_buffer = event.target.result
+        # `loadend` fires once whether the file was read or not, so its listener is always removed
+        def on_load_end(_event: Any) -> None:  # noqa: ANN401
+            if reader.error is not None:
+                self.on_error(f"Error reading file: {reader.error.message}")
+                return
 
-            # Convert to data URL for display
             try:
-                # Convert array buffer to bytes
-                uint8_array = js.Uint8Array.new(array_buffer)
-                file_bytes = bytes(uint8_array.to_py())
-
-                # Create base64 data URL
-                file_b64 = base64.b64encode(file_bytes).decode("utf-8")
+                # Copy the array buffer into Python memory once, no intermediate copies or base64
+                file_data = reader.result.to_bytes()
 
                 # Determine MIME type based on file type
                 mime_type = "image/png"  # Default
                 if hasattr(file, "type") and file.type:
                     mime_type = str(file.type)
 
-                data_url = f"data:{mime_type};base64,{file_b64}"
-                self.on_file_processed(data_url)
+                self.on_file_processed(file_data, mime_type)
 
             except ImportError as e:
                 self.on_error(f"Error importing required modules: {e!s}")
             except (AttributeError, TypeError, ValueError) as e:
                 self.on_error(f"Error processing image data: {e!s}")
 
-        # Use create_proxy to ensure the event handler persists
-        load_proxy = create_proxy(on_load)
-        reader.addEventListener("load", load_proxy)
+        EventListeners(reader).add("loadend", on_load_end, once=True)
         reader.readAsArrayBuffer(file)
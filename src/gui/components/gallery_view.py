@@ -0,0 +1,128 @@
+from collections.abc import Callable
+from typing import Any
+
+import js  # type: ignore[import]
+from pyodide.ffi import to_js
+
+from gui.components.image_display_manager import js_buffer
+from gui.element import Element
+
+
+class GalleryView(Element):
+    """A grid of image thumbnails shown over the image preview.
+
+    Tiles are created when the gallery is shown and filled in as their thumbnails arrive. A single click listener
+    on the grid serves every tile, so showing hundreds of images doesn't create a proxy per tile.
+    """
+
+    def __init__(self, parent: Element, on_select: Callable[[str], None] | None = None) -> None:
+        """Initialize the hidden gallery.
+
+        Args:
+            parent: The image preview the gallery is shown over
+            on_select: Called with the file name of a clicked thumbnail
+
+        """
+        super().__init__(
+            "div",
+            parent=parent,
+            style="""
+            position: absolute;
+            inset: 0;
+            display: none;
+            grid-template-columns: repeat(auto-fill, minmax(120px, 1fr));
+            grid-auto-rows: min-content;
+            gap: 12px;
+            padding: 12px;
+            overflow-y: auto;
+            background: var(--image-preview-background);
+            z-index: 2;
+            """,
+        )
+        self.class_name = "gallery"
+        self.on_select = on_select
+        self._tiles: list[Element] = []
+        self._images: dict[str, Element] = {}
+        self._object_urls: list[str] = []
+        self.on("click", self._on_click)
+
+    @property
+    def visible(self) -> bool:
+        """Whether the gallery is shown."""
+        return self["style"].display != "none"
+
+    def show(self, names: list[str]) -> None:
+        """Show an empty tile for each file, replacing the tiles shown before.
+
+        Args:
+            names: File names of the images, in the order they are shown
+
+        """
+        self._clear()
+        for name in names:
+            # Clicks on the image and caption go to the tile, which knows the file name
+            tile = Element(
+                "figure",
+                parent=self,
+                style="margin: 0; cursor: pointer; text-align: center; color: white; font-size: 12px;",
+                **{"data-name": name},
+            )
+            self._images[name] = Element(
+                "img",
+                parent=tile,
+                style="""
+                width: 100%;
+                aspect-ratio: 1;
+                object-fit: contain;
+                background: rgba(255, 255, 255, 0.05);
+                pointer-events: none;
+                """,
+                alt=name,
+            )
+            caption = Element(
+                "figcaption",
+                parent=tile,
+                style="overflow: hidden; text-overflow: ellipsis; white-space: nowrap; pointer-events: none;",
+            )
+            caption.text = name
+            self._tiles.append(tile)
+        self["style"].display = "grid"
+
+    def show_thumbnail(self, name: str, data: bytes | memoryview, mime_type: str) -> None:
+        """Display the thumbnail of a tile through a Blob object URL.
+
+        Args:
+            name: File name of the tile
+            data: The encoded thumbnail
+            mime_type: The MIME type of the thumbnail
+
+        """
+        image = self._images.get(name)
+        if image is None:
+            return
+        with js_buffer(data) as view:
+            blob = js.Blob.new(to_js([view]), to_js({"type": mime_type}, dict_converter=js.Object.fromEntries))
+        object_url = js.URL.createObjectURL(blob)
+        self._object_urls.append(object_url)
+        image["src"] = object_url
+
+    def hide(self) -> None:
+        """Hide the gallery and free its thumbnails."""
+        self["style"].display = "none"
+        self._clear()
+
+    def _clear(self) -> None:
+        for tile in self._tiles:
+            self.remove_child(tile)
+        self._tiles.clear()
+        self._images.clear()
+        for object_url in self._object_urls:
+            js.URL.revokeObjectURL(object_url)
+        self._object_urls.clear()
+
+    def _on_click(self, event: Any) -> None:  # noqa: ANN401
+        # Clicks stay in the gallery, they would open the upload dialog of the preview
+        event.stopPropagation()
+        name = event.target.getAttribute("data-name")
+        if name and self.on_select is not None:
+            self.on_select(name)
@@ -1,8 +1,35 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
 
 import js  # type: ignore[import]
+from pyodide.ffi import create_proxy, to_js
 
 from gui.element import Element
+from tracing import tracer
+
+# Region of the image in Pillow box convention: (left, upper, right, lower), right and lower exclusive.
+Box = tuple[int, int, int, int]
+
+
+@contextmanager
+def js_buffer(data: bytes | memoryview, buffer_type: str = "u8") -> Iterator[Any]:
+    """Expose a Python buffer to JS as a typed array view over WASM memory, without copying.
+
+    The view is only valid inside the `with` block, whatever JS does with it has to copy the data out before it ends.
+
+    Args:
+        data: The buffer to expose
+        buffer_type: Typed array type of the view, see `PyProxy.getBuffer`
+
+    """
+    proxy = create_proxy(memoryview(data))
+    buffer = proxy.getBuffer(buffer_type)
+    try:
+        yield buffer.data
+    finally:
+        buffer.release()
+        proxy.destroy()
 
 
 class ImageDisplayManager:
@@ -17,6 +44,7 @@ class ImageDisplayManager:
 
     image_container: Element
     image_element: Element
+    image_loader: Element
     placeholder_text: Element
     cursor_info: Element
     color_info: Element | None
@@ -29,13 +57,17 @@ class ImageDisplayManager:
     ) -> None:
         self.container = container
         self.current_image_src: str | None = None
+        self.source_size: tuple[int, int] | None = None
+        self._object_url: str | None = None
         self.cursor_info = cursor_info_element
         self.color_info = color_info_element
         self._canvas_context: Any | None = None
+        self._loading = False
+        self._pending_regions: list[tuple[Box, bytes]] = []
         self._setup_elements()
 
     def _setup_elements(self) -> None:
-        """Create the image container, image element, and placeholder text.
+        """Create the image container, preview canvas, and placeholder text.
 
         ---
 
@@ -56,9 +88,9 @@ class ImageDisplayManager:
             """,
         )
 
-        # Image element
+        # Preview canvas, kept for the lifetime of the preview so edits can be drawn into it in place
         self.image_element = Element(
-            "img",
+            "canvas",
             parent=self.image_container,
             style="""
             max-width: 100%;
@@ -67,6 +99,13 @@ class ImageDisplayManager:
             object-fit: contain;
             """,
         )
+        self._canvas_context = self.image_element["getContext"](
+            "2d",
+            to_js({"willReadFrequently": True}, dict_converter=js.Object.fromEntries),
+        )
+
+        # Detached image used to decode full frames before they are drawn into the canvas
+        self.image_loader = Element(element=js.Image.new())
 
         # Create placeholder text
         self.placeholder_text = Element(
@@ -84,10 +123,14 @@ class ImageDisplayManager:
         # Events
         self.image_element.on("mousemove", self._on_image_mouse_move)
         self.image_element.on("mouseleave", self._on_image_mouse_leave)
-        self.image_element.on("load", self._on_image_load)
+        self.image_loader.on("load", self._on_image_load)
+        self.image_loader.on("error", self._on_image_error)
 
+    @tracer.traced(category="gui")
     def _on_image_load(self, _event: Any) -> None:  # noqa: ANN401
-        """Prepare an offscreen canvas for pixel color sampling.
+        """Draw a decoded full frame into the preview canvas.
+
+        Regions that arrived while the frame was decoding are applied on top of it.
 
         Args:
             _event: The load event
@@ -98,18 +141,31 @@ class ImageDisplayManager:
 
         """
         try:
-            natural_width = self.image_element["naturalWidth"]
-            natural_height = self.image_element["naturalHeight"]
-            canvas = js.document.createElement("canvas")
-            canvas.width = natural_width
-            canvas.height = natural_height
-            ctx = canvas.getContext("2d")
-            ctx.willReadFrequently = True
-            ctx.drawImage(self.image_element.html_element, 0, 0)
-            self._canvas_context = ctx
+            self.image_element["width"] = self.image_loader["naturalWidth"]
+            self.image_element["height"] = self.image_loader["naturalHeight"]
+            self._canvas_context.drawImage(self.image_loader.html_element, 0, 0)
         except (AttributeError, RuntimeError) as exc:  # pragma: no cover
-            print(f"Failed to prepare canvas for color sampling: {exc}")
+            print(f"Failed to draw image into the preview canvas: {exc}")
+
+        self._loading = False
+        pending, self._pending_regions = self._pending_regions, []
+        for box, data in pending:
+            self._put_region(box, data)
+
+    def _on_image_error(self, _event: Any) -> None:  # noqa: ANN401
+        """Give up on a full frame the browser couldn't decode, the previous frame stays on the canvas.
+
+        Regions that arrived while it was decoding belong to the lost frame and are dropped.
+
+        Args:
+            _event: The error event
+
+        """
+        self._loading = False
+        self._pending_regions.clear()
+        self.show_error("The preview frame could not be decoded.")
 
+    @tracer.traced(category="gui")
     def _on_image_mouse_move(self, event: Any) -> None:  # noqa: ANN401
         """Update cursor and color display while the mouse moves over the image.
 
@@ -129,23 +185,23 @@ class ImageDisplayManager:
                 self.color_info.text = ""
             return
 
-        natural_width = self.image_element["naturalWidth"]
-        natural_height = self.image_element["naturalHeight"]
-        intrinsic_mouse_x = int(
-            ((event.clientX - self.image_element["offsetLeft"]) / self.image_element["clientWidth"]) * natural_width,
-        )
-        intrinsic_mouse_y = int(
-            ((event.clientY - self.image_element["offsetTop"]) / self.image_element["clientHeight"]) * natural_height,
-        )
-        intrinsic_mouse_x = max(0, min(intrinsic_mouse_x, natural_width - 1))
-        intrinsic_mouse_y = max(0, min(intrinsic_mouse_y, natural_height - 1))
+        # The canvas may hold a downscaled preview, cursor coordinates are reported in full resolution pixels
+        canvas_width = self.image_element["width"]
+        canvas_height = self.image_element["height"]
+        natural_width, natural_height = self.source_size or (canvas_width, canvas_height)
+        relative_x = (event.clientX - self.image_element["offsetLeft"]) / self.image_element["clientWidth"]
+        relative_y = (event.clientY - self.image_element["offsetTop"]) / self.image_element["clientHeight"]
+        intrinsic_mouse_x = max(0, min(int(relative_x * natural_width), natural_width - 1))
+        intrinsic_mouse_y = max(0, min(int(relative_y * natural_height), natural_height - 1))
+        canvas_x = max(0, min(int(relative_x * canvas_width), canvas_width - 1))
+        canvas_y = max(0, min(int(relative_y * canvas_height), canvas_height - 1))
         self.cursor_info.text = f"X: {intrinsic_mouse_x}, Y: {intrinsic_mouse_y}"
 
-        if self.color_info is not None and self._canvas_context is not None:
+        if self.color_info is not None and self._canvas_context is not None and not self._loading:
             try:
                 pixel = self._canvas_context.getImageData(
-                    intrinsic_mouse_x,
-                    intrinsic_mouse_y,
+                    canvas_x,
+                    canvas_y,
                     1,
                     1,
                 ).data
@@ -159,6 +215,7 @@ class ImageDisplayManager:
                 self.color_info.text = "R: - G: - B: -"
                 print(f"Color sample error: {exc}")
 
+    @tracer.traced(category="gui")
     def _on_image_mouse_leave(self, _event: Any) -> None:  # noqa: ANN401
         """Clear info when mouse leaves the image.
 
@@ -174,22 +231,87 @@ class ImageDisplayManager:
         if self.color_info is not None:
             self.color_info.text = ""
 
-    def display_image(self, image_src: str) -> None:
+    @tracer.traced(category="gui")
+    def display_image(self, image_src: str, source_size: tuple[int, int] | None = None) -> None:
         """Display an image in the preview area.
 
         Args:
             image_src: The source URL of the image to display
+            source_size: Size of the full resolution image when a downscaled preview is displayed
 
         ---
 
         :author: Ricky
 
         """
+        if self._object_url is not None and self._object_url != image_src:
+            js.URL.revokeObjectURL(self._object_url)
+            self._object_url = None
         self.current_image_src = image_src
-        self.image_element["src"] = image_src
+        self.source_size = source_size
+        self._loading = True
+        self._pending_regions.clear()
+        self.image_loader["src"] = image_src
         self.image_element["style"].display = "block"
         self.placeholder_text["style"].display = "none"
 
+    @tracer.traced(category="gui")
+    def display_image_bytes(
+        self,
+        data: bytes | memoryview,
+        mime_type: str = "image/png",
+        source_size: tuple[int, int] | None = None,
+    ) -> None:
+        """Display an encoded image through a Blob object URL.
+
+        The bytes are handed to JS as a view over WASM memory, the Blob takes the only copy.
+        The previous object URL is revoked once it is replaced.
+
+        Args:
+            data: The encoded image file
+            mime_type: The MIME type of the encoded image
+            source_size: Size of the full resolution image when a downscaled preview is displayed
+
+        """
+        with js_buffer(data) as view:
+            blob = js.Blob.new(
+                to_js([view]),
+                to_js({"type": mime_type}, dict_converter=js.Object.fromEntries),
+            )
+        object_url = js.URL.createObjectURL(blob)
+        self.display_image(object_url, source_size)
+        self._object_url = object_url
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Get the size in device pixels the image can be displayed at, None if not laid out yet."""
+        ratio = js.window.devicePixelRatio or 1
+        width = int(self.image_container["clientWidth"] * ratio)
+        height = int(self.image_container["clientHeight"] * ratio)
+        if width <= 0 or height <= 0:
+            return None
+        return width, height
+
+    @tracer.traced(category="gui")
+    def update_region(self, box: Box, data: bytes) -> None:
+        """Draw a region of raw pixels into the displayed image.
+
+        Args:
+            box: The region of the image being replaced
+            data: RGBA pixels of the region, row by row
+
+        """
+        if self._loading:
+            self._pending_regions.append((box, data))
+            return
+        self._put_region(box, data)
+
+    def _put_region(self, box: Box, data: bytes) -> None:
+        """Copy a region of raw RGBA pixels into the preview canvas with `putImageData`."""
+        left, upper, right, lower = box
+        with js_buffer(data, "u8clamped") as pixels:
+            image_data = js.ImageData.new(pixels, right - left, lower - upper)
+            self._canvas_context.putImageData(image_data, left, upper)
+
     def hide_image(self) -> None:
         """Hide the current image. Useful during drag operations.
 
@@ -1,9 +1,15 @@
+from collections.abc import Callable
 from typing import Any
 
+import js  # type: ignore[import]
+from pyodide.ffi import create_once_callable
+
 from gui.components.drag_drop_handler import DragDropHandler
 from gui.components.file_upload_handler import FileUploadHandler
-from gui.components.image_display_manager import ImageDisplayManager
-from gui.element import Element, HTMLElement
+from gui.components.gallery_view import GalleryView
+from gui.components.image_display_manager import Box, ImageDisplayManager
+from gui.element import Element, EventListeners, HTMLElement
+from render_scheduler import RenderScheduler
 
 
 class ImagePreview(Element):
@@ -85,6 +91,9 @@ class ImagePreview(Element):
             self.color_info,
         )
 
+        # Gallery of saved images shown over the image, filled by the `gallery` command
+        self.gallery = GalleryView(self)
+
         # Initialize the file upload handler
         self.file_handler = FileUploadHandler(
             on_file_processed=self._on_file_processed,
@@ -108,11 +117,17 @@ class ImagePreview(Element):
         self.on("click", self.file_handler.handle_click_upload)
         self.image = None
 
-    def _on_file_processed(self, data_url: str) -> None:
+        # A window resize changes the size the image is shown at, a burst of them is handled once per frame
+        self.resize_scheduler = RenderScheduler(self._on_window_resize, request_frame=self.request_frame)
+        self.window_listeners = EventListeners(js.window)
+        self.window_listeners.add("resize", lambda _: self.resize_scheduler.mark_dirty())
+
+    def _on_file_processed(self, data: bytes, mime_type: str) -> None:
         """Handle successfully processed file.
 
         Args:
-            data_url: The data URL of the processed image
+            data: The contents of the processed image file
+            mime_type: The MIME type of the file
 
         ---
 
@@ -120,9 +135,23 @@ class ImagePreview(Element):
 
         """
         if self.image is not None:
-            self.image.load_from_image_link(data_url)
+            result = self.image.load_from_bytes(data)
+            if result == 1:
+                self._on_error("Could not read the image file.")
+            elif result == 2:  # noqa: PLR2004
+                self._on_error(f"Image has more than {self.image.max_image_pixels} pixels.")
         else:
-            self.image_manager.display_image(data_url)
+            self.image_manager.display_image_bytes(data, mime_type)
+
+    def _on_window_resize(self, _regions: list[Box] | None) -> None:
+        """Render the image again if its new display size calls for another preview resolution.
+
+        Args:
+            _regions: Not used, the scheduler passes the regions it would render
+
+        """
+        if self.image is not None:
+            self.image.update_preview_scale()
 
     def _on_error(self, error_message: str) -> None:
         """Handle file processing error.
@@ -150,15 +179,79 @@ class ImagePreview(Element):
         """
         self.file_handler.process_file(file)
 
-    def display_image(self, image_src: str) -> None:
+    def display_image(self, image_src: str, source_size: tuple[int, int] | None = None) -> None:
         """Display an image in the preview area.
 
         Args:
             image_src: The source URL of the image to display
+            source_size: Size of the full resolution image when a downscaled preview is displayed
 
         ---
 
         :author: Ricky
 
         """
-        self.image_manager.display_image(image_src)
+        self.image_manager.display_image(image_src, source_size)
+
+    def display_image_bytes(
+        self,
+        data: bytes | memoryview,
+        mime_type: str = "image/png",
+        source_size: tuple[int, int] | None = None,
+    ) -> None:
+        """Display an encoded image without going through a data URL.
+
+        Args:
+            data: The encoded image file
+            mime_type: The MIME type of the encoded image
+            source_size: Size of the full resolution image when a downscaled preview is displayed
+
+        """
+        self.image_manager.display_image_bytes(data, mime_type, source_size)
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Get the size in device pixels the image can be displayed at, None if not laid out yet."""
+        return self.image_manager.display_size()
+
+    def update_region(self, box: Box, data: bytes) -> None:
+        """Replace a region of the displayed image with raw pixels.
+
+        Args:
+            box: The region of the image being replaced
+            data: RGBA pixels of the region, row by row
+
+        """
+        self.image_manager.update_region(box, data)
+
+    def show_gallery(self, names: list[str]) -> None:
+        """Show a gallery of image files over the image.
+
+        Args:
+            names: File names of the images, their thumbnails arrive with `show_thumbnail`
+
+        """
+        self.gallery.show(names)
+
+    def show_thumbnail(self, name: str, data: bytes | memoryview, mime_type: str) -> None:
+        """Show the thumbnail of a file in the gallery.
+
+        Args:
+            name: File name of the image
+            data: The encoded thumbnail
+            mime_type: The MIME type of the thumbnail
+
+        """
+        self.gallery.show_thumbnail(name, data, mime_type)
+
+    def hide_gallery(self) -> None:
+        """Hide the gallery, showing the image again."""
+        self.gallery.hide()
+
+    def request_frame(self, callback: Callable[[Any], None]) -> None:
+        """Run a callback before the next repaint.
+
+        Args:
+            callback: Called with the frame timestamp
+
+        """
+        js.requestAnimationFrame(create_once_callable(callback))
@@ -8,7 +8,7 @@ import js  # type: ignore[import]
 from gui.element import Element, HTMLElement
 
 from .terminal_input import TerminalInput
-from .terminal_io import TerminalHistory, TerminalOutput, UserInput
+from .terminal_io import TerminalHistory
 
 if TYPE_CHECKING:
     from terminal import Terminal
@@ -58,8 +58,11 @@ class TerminalGui(Element):
 
     def print_terminal_output(self, text: str, color: str | None = None) -> None:
         """Print the given text to the terminal output."""
-        output = TerminalOutput(text, color=color)
-        self.history.add_history(output)
+        self.history.add_output(text, color)
+
+    def print_terminal_lines(self, lines: list[str], color: str | None = None) -> None:
+        """Print several lines to the terminal output, rendered together with the next frame."""
+        self.history.add_lines(lines, color)
 
     def clear_terminal_history(self) -> None:
         """Clear the terminal history."""
@@ -75,6 +78,7 @@ class TerminalGui(Element):
             background-color: var(--terminal-background-color);
             color: var(--terminal-output-color);
             flex-grow: 1;
+            position: relative;
             overflow-y: scroll;
             font-family: monospace;
             border: 0;
@@ -147,9 +151,14 @@ class TerminalGui(Element):
     def suggestion_color(self, value: str) -> None:
         self._suggestion_color_variable.set(value)
 
-    def _submit_input(self, event: Any) -> None:  # noqa: ANN401
-        value = event.target.value
-        self.history.add_history(UserInput(value))
+    def run_command(self, value: str) -> None:
+        """Echo a command line into the history and run it, as if it was typed.
+
+        Args:
+            value: The command line
+
+        """
+        self.history.add_input(value)
 
         last_command = self.previous_commands[-1] if self.previous_commands else None
         if value and (last_command is None or value != last_command):
@@ -160,6 +169,9 @@ class TerminalGui(Element):
         else:
             print("Warning: TerminalGui has no Terminal instance assigned.")
 
+    def _submit_input(self, event: Any) -> None:  # noqa: ANN401
+        self.run_command(event.target.value)
+
         event.target.value = ""
         self.input.set_suggestion(None)
         self.input.set_value("")
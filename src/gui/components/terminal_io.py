@@ -1,8 +1,28 @@
 """Terminal input and output components for the terminal GUI."""
 
 import re
+from collections import deque
+from collections.abc import Iterable
+from itertools import islice
+from typing import Any, NamedTuple
+
+import js  # type: ignore[import]
+from pyodide.ffi import create_once_callable
 
 from gui.element import Element, HTMLElement
+from tracing import tracer
+
+# Lines kept in the terminal history, older lines are dropped
+MAX_HISTORY_LINES = 5000
+# Rows rendered above and below the ones in view, so fast scrolling doesn't show empty space before the next frame
+OVERSCAN_ROWS = 10
+# Height of a row in CSS pixels until the first row is measured
+DEFAULT_ROW_HEIGHT = 18
+# Output in the terminal's own colors is styled by a class of the base style, other colors are set on each row
+COLOR_CLASSES = {
+    "var(--terminal-success-color)": "terminal-success",
+    "var(--terminal-error-color)": "terminal-error",
+}
 
 
 class UserInput(Element):
@@ -13,21 +33,19 @@ class UserInput(Element):
         self.class_name = "user-input"
         self.text = "$ "
 
-        command_verb_span = Element(tag_name="span")
-        command_verb_span.class_name = "command-verb-span"
-
         command_verb = re.search(r"^(\s*)(\S+)\b", text)
 
         if command_verb:
             self.text += command_verb.group(1)
 
+            # Created in place, after the text is set since setting it removes the children
+            command_verb_span = Element(tag_name="span", parent=self)
+            command_verb_span.class_name = "command-verb-span"
             command_verb_span.text = command_verb.group(2)
-            self.append_child(command_verb_span)
 
             command_end = text[len(command_verb.group(0)) :]
-            command_end_span = Element(tag_name="span")
+            command_end_span = Element(tag_name="span", parent=self)
             command_end_span.text = command_end
-            self.append_child(command_end_span)
         else:
             self.text += text
 
@@ -36,9 +54,13 @@ class TerminalOutput(Element):
     """A terminal output element for displaying command results in the terminal GUI."""
 
     def __init__(self, text: str, color: str | None = None, parent: HTMLElement | Element | None = None) -> None:
-        style = f"--terminal-output-color: {color};" if color is not None else ""
-        super().__init__(tag_name="div", parent=parent, style=style)
-        self.class_name = "terminal-output"
+        color_class = COLOR_CLASSES.get(color)
+        if color is None or color_class is not None:
+            super().__init__(tag_name="div", parent=parent)
+            self.class_name = f"terminal-output {color_class}" if color_class else "terminal-output"
+        else:
+            super().__init__(tag_name="div", parent=parent, style=f"--terminal-output-color: {color};")
+            self.class_name = "terminal-output"
         self.text = text
 
 
@@ -71,25 +93,197 @@ class TerminalInputVerb(Element):
         self.verb_span.text = " " * len(verb)
 
 
+class HistoryLine(NamedTuple):
+    """A line of the terminal history, rendered as a row only while it is scrolled into view."""
+
+    text: str
+    color: str | None = None
+    user_input: bool = False
+
+
 class TerminalHistory(Element):
-    """A terminal history element for the terminal GUI."""
+    """A terminal history element for the terminal GUI.
 
-    _elements: list[UserInput | TerminalOutput]
+    Lines are kept in a ring buffer of `max_lines`, the oldest are dropped once it is full. Only the rows scrolled
+    into view, plus `OVERSCAN_ROWS` around them, exist in the DOM: the history is sized as if every line was there
+    and the rendered rows are moved to where they belong. Lines are one row tall, unless a rendered row was measured
+    taller because its line wraps; those heights are kept until the width of the terminal changes. Rows are rendered
+    once per animation frame, however many lines were added: rows that scrolled out are removed and the new ones
+    appended as one `DocumentFragment`.
+    """
 
-    def __init__(self, parent: HTMLElement | Element | None = None) -> None:
-        super().__init__(tag_name="div", parent=parent, id="terminal-history")
-        self._elements = []
+    def __init__(self, parent: HTMLElement | Element | None = None, max_lines: int = MAX_HISTORY_LINES) -> None:
+        super().__init__(tag_name="div", parent=parent, id="terminal-history", style="position: relative;")
         self.class_name = "terminal-history"
+        self.lines: deque[HistoryLine] = deque(maxlen=max_lines)
+        self.row_height = 0
+        self.rows = Element(tag_name="div", parent=self)
+        # Number of the first kept line among all lines ever added, rendered rows are kept by line number
+        self._first_number = 0
+        self._rendered: dict[int, Element] = {}
+        # Heights of the lines measured taller than `row_height` because they wrap, by line number
+        self._wrapped: dict[int, int] = {}
+        self._width = 0
+        self._height = ""
+        self._transform = ""
+        self._frame_requested = False
+        self._scroll_to_end = False
+        if isinstance(parent, Element):
+            parent.on("scroll", self._on_scroll)
 
-    def add_history(self, element: UserInput | TerminalOutput) -> None:
-        """Add a terminal output or user input element to the history."""
-        self._elements.append(element)
-        self.append_child(element)
-        if self["parentElement"] is not None:
-            self["parentElement"].scrollTop = self["parentElement"].scrollHeight
+    @tracer.traced(category="gui")
+    def add_history(self, line: HistoryLine) -> None:
+        """Add a line to the history, shown with the next frame. Text with line breaks is split into lines."""
+        self._append(line)
+        self._scroll_to_end = True
+        self._request_render()
+
+    @tracer.traced(category="gui")
+    def add_lines(self, lines: Iterable[str], color: str | None = None) -> None:
+        """Add lines of command output, all shown with the next frame."""
+        for text in lines:
+            self._append(HistoryLine(text, color))
+        self._scroll_to_end = True
+        self._request_render()
+
+    def add_input(self, text: str) -> None:
+        """Add a command line the user entered."""
+        self.add_history(HistoryLine(text, user_input=True))
+
+    def add_output(self, text: str, color: str | None = None) -> None:
+        """Add a line of command output."""
+        self.add_history(HistoryLine(text, color))
 
     def clear_history(self) -> None:
         """Clear the terminal history."""
-        for element in self._elements:
-            self.remove_child(element)
-        self._elements.clear()
+        self._first_number += len(self.lines)
+        self.lines.clear()
+        self._rendered.clear()
+        self._wrapped.clear()
+        self.rows.html_element.replaceChildren()
+        self._height = "0px"
+        self["style"].height = self._height
+
+    def _append(self, line: HistoryLine) -> None:
+        for text in line.text.split("\n"):
+            if len(self.lines) == self.lines.maxlen:
+                self._first_number += 1
+            self.lines.append(line._replace(text=text))
+
+    def _on_scroll(self, _event: Any) -> None:  # noqa: ANN401
+        self._request_render()
+
+    def _request_render(self) -> None:
+        if not self._frame_requested:
+            self._frame_requested = True
+            js.requestAnimationFrame(create_once_callable(self._render))
+
+    @tracer.traced(category="gui")
+    def _render(self, _timestamp: float | None = None) -> None:
+        """Size the history for all lines and render the rows in view."""
+        self._frame_requested = False
+        container = self["parentElement"]
+        width = container.clientWidth
+        if width != self._width:
+            # Lines wrap differently at another width, the rendered rows are measured again below
+            self._width = width
+            self._wrapped.clear()
+            remeasure = list(self._rendered)
+        else:
+            remeasure = []
+        if self._wrapped and min(self._wrapped) < self._first_number:
+            self._wrapped = {number: h for number, h in self._wrapped.items() if number >= self._first_number}
+
+        height = f"{self._top(len(self.lines))}px"
+        if height != self._height:
+            self._height = height
+            self["style"].height = height
+
+        if self._scroll_to_end:
+            self._scroll_to_end = False
+            container.scrollTop = container.scrollHeight
+        top = container.scrollTop - self["offsetTop"]
+        first = max(self._line_at(top) - OVERSCAN_ROWS, 0)
+        last = min(self._line_at(top + container.clientHeight) + 1 + OVERSCAN_ROWS, len(self.lines))
+
+        new_rows = self._render_rows(self._first_number + first, self._first_number + max(first, last))
+        transform = f"translateY({self._top(first)}px)"
+        if transform != self._transform:
+            self._transform = transform
+            self.rows["style"].transform = transform
+
+        # Rows are measured once they are laid out, the layout is done again if one isn't as tall as assumed
+        if self._measure([*remeasure, *new_rows]):
+            self._request_render()
+
+    def _row_height(self) -> int:
+        return self.row_height or DEFAULT_ROW_HEIGHT
+
+    def _top(self, index: int) -> int:
+        """Return the offset of a line from the top of the history, its index counted from the first kept line."""
+        end = self._first_number + index
+        extra = sum(height - self._row_height() for number, height in self._wrapped.items() if number < end)
+        return index * self._row_height() + extra
+
+    def _line_at(self, offset: float) -> int:
+        """Return the index of the line at an offset from the top of the history."""
+        row_height = self._row_height()
+        above = 0
+        for number in sorted(self._wrapped):
+            index = number - self._first_number
+            line_top = index * row_height + above
+            if offset < line_top:
+                break
+            if offset < line_top + self._wrapped[number]:
+                return index
+            above += self._wrapped[number] - row_height
+        return max(int((offset - above) // row_height), 0)
+
+    def _measure(self, numbers: list[int]) -> bool:
+        """Measure rendered rows, return whether any of them isn't as tall as the layout assumed."""
+        heights = {number: self._rendered[number]["offsetHeight"] for number in numbers if number in self._rendered}
+        if not heights:
+            return False
+        changed = False
+        if not self.row_height:
+            # The shortest row is a single line of text, longer lines are multiples of it
+            self.row_height = min(heights.values()) or DEFAULT_ROW_HEIGHT
+            changed = self.row_height != DEFAULT_ROW_HEIGHT
+        for number, height in heights.items():
+            assumed = self._wrapped.get(number, self.row_height)
+            if height > self.row_height:
+                self._wrapped[number] = height
+            else:
+                self._wrapped.pop(number, None)
+            changed = changed or height != assumed
+        return changed
+
+    def _render_rows(self, start: int, end: int) -> range:
+        """Render the rows of the lines numbered from start to end, keeping the rows already rendered.
+
+        Returns the numbers of the lines rendered anew.
+        """
+        kept = {number: row for number, row in self._rendered.items() if start <= number < end}
+        # While output is added or the history is scrolled down, rows leave at the top and arrive at the bottom,
+        # only those change. Otherwise every row in view is put in place again.
+        if kept and next(iter(kept)) == start:
+            for number, row in self._rendered.items():
+                if number not in kept:
+                    self.rows.remove_child(row)
+        else:
+            kept = {}
+
+        fragment = js.document.createDocumentFragment()
+        rendered = dict(kept)
+        new_rows = range(start + len(kept), end)
+        for number, line in zip(new_rows, islice(self.lines, new_rows.start - self._first_number, None), strict=False):
+            if line.user_input:
+                rendered[number] = UserInput(line.text, parent=fragment)
+            else:
+                rendered[number] = TerminalOutput(line.text, line.color, parent=fragment)
+        if kept:
+            self.rows.html_element.appendChild(fragment)
+        else:
+            self.rows.html_element.replaceChildren(fragment)
+        self._rendered = rendered
+        return new_rows
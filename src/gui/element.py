@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections import Counter
 from typing import TYPE_CHECKING, Any, Protocol
 
 if TYPE_CHECKING:
@@ -37,10 +38,71 @@ class HTMLElement(Protocol):
         """Add an event listener to this element."""
         ...
 
+    def removeEventListener(self, event: str, handler: Callable) -> None:  # noqa: N802
+        """Remove an event listener from this element."""
+        ...
+
     def setAttribute(self, name: str, value: str) -> None:  # noqa: N802
         """Set an attribute on this element."""
         ...
 
+    def remove(self) -> None:
+        """Remove this element from its parent."""
+        ...
+
+
+# Proxies of the event listeners not removed yet, by event type. A count that keeps growing is a leak.
+live_listeners: Counter[str] = Counter()
+
+
+class EventListeners:
+    """Event listeners added from Python to a JS object, each through a proxy kept until the listener is removed.
+
+    A proxy keeps its handler alive, and everything the handler refers to, until it is destroyed. Removing a
+    listener destroys its proxy, a listener added with `once` is removed before it is called.
+    """
+
+    def __init__(self, target: Any) -> None:  # noqa: ANN401
+        self.target = target
+        self._proxies: dict[tuple[str, Callable[[Any], None]], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+    def add(self, event: str, handler: Callable[[Any], None], *, once: bool = False) -> None:
+        """Call the handler with every event of the type, or only the first one with `once`.
+
+        Like `addEventListener`, adding a handler already listening to the event does nothing.
+        """
+        if (event, handler) in self._proxies:
+            return
+
+        callback = handler
+        if once:
+
+            def callback(event_object: Any) -> None:  # noqa: ANN401
+                self.remove(event, handler)
+                handler(event_object)
+
+        proxy = create_proxy(callback)
+        self.target.addEventListener(event, proxy)
+        self._proxies[event, handler] = proxy
+        live_listeners[event] += 1
+
+    def remove(self, event: str, handler: Callable[[Any], None]) -> None:
+        """Stop calling the handler and destroy its proxy, nothing happens if it isn't listening."""
+        proxy = self._proxies.pop((event, handler), None)
+        if proxy is None:
+            return
+        self.target.removeEventListener(event, proxy)
+        proxy.destroy()
+        live_listeners[event] -= 1
+
+    def clear(self) -> None:
+        """Remove every listener."""
+        for event, handler in list(self._proxies):
+            self.remove(event, handler)
+
 
 class Element:
     """Base class for all GUI elements. This is a wrapper around an HTML element.
@@ -79,9 +141,11 @@ class Element:
                 msg = "Cannot specify both element and kwargs"
                 raise ValueError(msg)
             self._html_element = element
+            self.listeners = EventListeners(element)
             return
 
         self._html_element = js.document.createElement(tag_name)
+        self.listeners = EventListeners(self._html_element)
 
         for key, value in kwargs.items():
             self._html_element.setAttribute(key, value)
@@ -101,12 +165,24 @@ class Element:
         return self._html_element
 
     def on(self, event: str, handler: Callable[[Any], None]) -> None:
-        """Add an event handler to the element. The handler will be called with the element as the first argument."""
+        """Add an event handler to the element. The handler will be called with the event as the first argument.
+
+        The handler is kept until it is removed with `off` or `destroy`.
+        """
+        self.listeners.add(event, handler)
+
+    def once(self, event: str, handler: Callable[[Any], None]) -> None:
+        """Add an event handler to the element that is removed before its first call."""
+        self.listeners.add(event, handler, once=True)
 
-        def event_handler(event: Any) -> None:  # noqa: ANN401
-            handler(event)
+    def off(self, event: str, handler: Callable[[Any], None]) -> None:
+        """Remove an event handler added with `on`."""
+        self.listeners.remove(event, handler)
 
-        self.html_element.addEventListener(event, create_proxy(event_handler))
+    def destroy(self) -> None:
+        """Remove the event handlers of the element and take it out of the document."""
+        self.listeners.clear()
+        self.html_element.remove()
 
     @property
     def text(self) -> str:
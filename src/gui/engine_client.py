@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from engine_protocol import (
+    Channel,
+    Message,
+    load_message,
+    predict_message,
+    resize_message,
+    run_message,
+    startup_message,
+)
+from timing import publish_to_page, startup
+from tracing import tracer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from gui.components.image_preview import ImagePreview
+    from gui.components.terminal_gui import TerminalGui
+
+
+class EngineClient:
+    """Page side of an engine running in a Web Worker.
+
+    Stands in for the `Terminal` of the `TerminalGui` and the `PaintImage` of the `ImagePreview`, forwarding
+    their calls to the engine and applying what it sends back. Nothing waits for the engine, so typing and
+    dragging stay responsive while a command runs.
+
+    Predictions arrive asynchronously: `predict_command` returns the last prediction if it was for the same text,
+    otherwise it asks the engine and the suggestion is shown once the answer comes back.
+    """
+
+    def __init__(self, channel: Channel, terminal_gui: TerminalGui, image_preview: ImagePreview) -> None:
+        """Connect the GUI to the engine on the other end of `channel`.
+
+        Args:
+            channel: Channel to the engine
+            terminal_gui: The terminal the engine prints to
+            image_preview: The preview the engine displays the image in
+
+        """
+        self.channel = channel
+        self.terminal_gui = terminal_gui
+        self.image_preview = image_preview
+        self._prediction_id = 0
+        self._prediction: tuple[str, str | None] | None = None
+
+        self._handlers: dict[str, Callable[[Message], None]] = {
+            "output": self._on_output,
+            "output_lines": self._on_output_lines,
+            "terminal_style": self._on_terminal_style,
+            "prediction": self._on_prediction,
+            "image": self._on_image,
+            "image_link": self._on_image_link,
+            "region": self._on_region,
+            "gallery": self._on_gallery,
+            "thumbnail": self._on_thumbnail,
+            "gallery_close": self._on_gallery_close,
+            "error": self._on_error,
+            "startup_report": self._on_startup_report,
+            "trace": self._on_trace,
+        }
+        channel.on_message = self.handle_message
+        terminal_gui.terminal = self
+        image_preview.image = self
+        channel.post(startup_message(startup.origin, startup.marks))
+
+    def run_str(self, command_str: str) -> bool:
+        """Run a command line in the engine, its output arrives later."""
+        self.channel.post(run_message(command_str))
+        return True
+
+    def predict_command(self, command_str: str) -> str | None:
+        """Return the prediction for the typed text if known, otherwise request it from the engine."""
+        if self._prediction is not None and self._prediction[0] == command_str:
+            return self._prediction[1]
+        self._prediction_id += 1
+        self.channel.post(predict_message(self._prediction_id, command_str))
+        return None
+
+    def load_from_bytes(self, buffer: bytes | memoryview) -> int:
+        """Send an image file to the engine, errors are shown in the preview when the engine reports them."""
+        self.channel.post(load_message(buffer), transfer=[buffer])
+        return 0
+
+    def update_preview_scale(self) -> None:
+        """Tell the engine the size the preview is shown at."""
+        self.channel.post(resize_message(self.image_preview.display_size()))
+
+    def handle_message(self, message: Message) -> None:
+        """Handle a message from the engine."""
+        handler = self._handlers.get(message.get("type"))
+        if handler is None:
+            print(f"Warning: page received an unknown message {message.get('type')!r}.")
+            return
+        handler(message)
+
+    def _on_output(self, message: Message) -> None:
+        self.terminal_gui.print_terminal_output(message["text"], message["color"])
+
+    def _on_output_lines(self, message: Message) -> None:
+        self.terminal_gui.print_terminal_lines(message["lines"], message["color"])
+
+    def _on_terminal_style(self, message: Message) -> None:
+        if message["name"] in ("output_color", "background_color", "success_color", "error_color"):
+            setattr(self.terminal_gui, message["name"], message["value"])
+
+    def _on_prediction(self, message: Message) -> None:
+        if message["id"] != self._prediction_id:
+            return
+        self._prediction = (message["text"], message["prediction"])
+        if self.terminal_gui.input.text_input["value"] == message["text"]:
+            self.terminal_gui.input.set_suggestion(message["prediction"])
+
+    def _on_image(self, message: Message) -> None:
+        source_size = message["source_size"]
+        self.image_preview.display_image_bytes(
+            message["data"],
+            message["mime_type"],
+            tuple(source_size) if source_size else None,
+        )
+
+    def _on_image_link(self, message: Message) -> None:
+        source_size = message["source_size"]
+        self.image_preview.display_image(message["src"], tuple(source_size) if source_size else None)
+
+    def _on_region(self, message: Message) -> None:
+        self.image_preview.update_region(tuple(message["box"]), message["data"])
+
+    def _on_gallery(self, message: Message) -> None:
+        self.image_preview.show_gallery(message["names"])
+
+    def _on_thumbnail(self, message: Message) -> None:
+        self.image_preview.show_thumbnail(message["name"], message["data"], message["mime_type"])
+
+    def _on_gallery_close(self, _message: Message) -> None:
+        self.image_preview.hide_gallery()
+
+    def _on_error(self, message: Message) -> None:
+        self.image_preview.image_manager.show_error(message["message"])
+
+    def _on_startup_report(self, message: Message) -> None:
+        publish_to_page(message["report"])
+
+    def _on_trace(self, message: Message) -> None:
+        if message["action"] == "start":
+            tracer.start()
+        elif message["action"] == "stop":
+            tracer.stop()
+        elif message["action"] == "dump":
+            tracer.download(message["events"])
@@ -1,12 +1,15 @@
 from typing import Any
 
+import js  # type: ignore[import]
+
 from gui.components.description import Description
 from gui.components.image_preview import ImagePreview
 from gui.components.separator import Separator
 from gui.components.terminal_gui import TerminalGui
 from gui.element import Element, HTMLElement
-from image import PaintImage
-from terminal import Terminal
+from gui.engine_client import EngineClient
+from js_channel import JsChannel
+from timing import startup
 
 
 class Layout(Element):
@@ -19,12 +22,14 @@ class Layout(Element):
         - Ricky
     """
 
-    def __init__(self, parent: HTMLElement | Element | None = None) -> None:
+    def __init__(self, parent: HTMLElement | Element | None = None, worker_url: str | None = None) -> None:
         """Initialize the main layout component.
 
         Args:
             parent: Optional parent element that will contain this layout. If `None`, it becomes a
                 root component.
+            worker_url: Script of a Web Worker to run the terminal and image engine in. If `None`, the engine
+                runs on the page.
         ---
 
         :author: Jont
@@ -45,15 +50,39 @@ class Layout(Element):
         self.image_preview = ImagePreview(parent=self)
         self.separator = Separator(parent=self, on_resize=self._handle_resize)
         self.terminal_gui = TerminalGui(parent=self)
-
-        image = PaintImage(self.image_preview)
+        self.image_preview.gallery.on_select = self._on_gallery_select
+        startup.mark("layout_ready")
+
+        if worker_url is None:
+            self._start_engine()
+        else:
+            self.engine = EngineClient(JsChannel(js.Worker.new(worker_url)), self.terminal_gui, self.image_preview)
+            self.engine.update_preview_scale()
+
+    def _start_engine(self) -> None:
+        """Run the terminal and image engine on the page."""
+        # Imported here so the page doesn't load Pillow when the engine runs in a worker
+        from image import PaintImage  # noqa: PLC0415
+        from terminal import Terminal  # noqa: PLC0415
+
+        image = PaintImage(self.image_preview, request_frame=self.image_preview.request_frame)
         self.image_preview.image = image
 
         image.load()
+        startup.mark("image_loaded")
 
         # create a terminal
         self.terminal = Terminal(image, self.terminal_gui)
 
+    def _on_gallery_select(self, name: str) -> None:
+        """Load an image picked in the gallery through the terminal, so it shows in the history.
+
+        Args:
+            name: File name of the picked image
+
+        """
+        self.terminal_gui.run_command(f"load_image {name}")
+
     def _handle_resize(self, mouse_y: int) -> None:
         """Handle resizing of the image preview section.
 
@@ -66,6 +95,7 @@ class Layout(Element):
 
         """
         self.image_preview["style"].height = f"{mouse_y}px"
+        self.image_preview.image.update_preview_scale()
 
     def handle_global_mouse_up(self, event: Any) -> None:  # noqa: ANN401
         """Handle global mouse up event to stop separator dragging.
@@ -1,48 +1,291 @@
 import base64
+import contextlib
 import io
 import pathlib
+import warnings
+from collections.abc import Callable, Iterator
+from typing import Any, Protocol
 
 from PIL import Image, ImageDraw
 
-from gui.components.image_preview import ImagePreview
+from image_index import IMAGES_DIR, image_index
+from image_pyramid import ImagePyramid, preview_factor, reduce_image, scale_box
+from image_stats import ColorStats, ImageStats
+from profiling import profiler
+from render_scheduler import Box, RenderScheduler
+from timing import FINAL_PHASE, startup
+from tracing import tracer
+from undo_history import UndoHistory
 from utils.color import Color
 
-IMAGES_DIR = pathlib.Path(__file__).parent.resolve() / "images"
+# Opens an image file again from its start, used to decode a lazily loaded image at full resolution.
+ImageOpener = Callable[[], Image.Image]
+
+
+class ImageDisplay(Protocol):
+    """What an image needs from the preview it is displayed in.
+
+    `ImagePreview` is the preview on the page, `engine.RemoteImageDisplay` forwards to it from a worker.
+    """
+
+    def display_image(self, image_src: str, source_size: tuple[int, int] | None = None) -> None:
+        """Display an image from a URL."""
+        ...
+
+    def display_image_bytes(
+        self,
+        data: bytes | memoryview,
+        mime_type: str = "image/png",
+        source_size: tuple[int, int] | None = None,
+    ) -> None:
+        """Display an encoded image file."""
+        ...
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Return the size in device pixels the image can be displayed at, None if not known."""
+        ...
+
+    def update_region(self, box: Box, data: bytes) -> None:
+        """Replace a region of the displayed image with raw RGBA pixels."""
+        ...
+
+    def show_gallery(self, names: list[str]) -> None:
+        """Show a gallery of image files over the image, their thumbnails arrive with `show_thumbnail`."""
+        ...
+
+    def show_thumbnail(self, name: str, data: bytes, mime_type: str) -> None:
+        """Show the encoded thumbnail of a file in the gallery."""
+        ...
+
+    def hide_gallery(self) -> None:
+        """Hide the gallery, showing the image again."""
+        ...
 
 
 class PaintImage:
     """Image for creation of image objects.
 
+    `preview_transport` selects how full frames reach the preview:
+    "blob" hands the PNG bytes over as a Blob object URL, "data_url" sends a base64 data URL.
+
+    The preview is rendered from a downscaled copy of the image matching the size it is shown at,
+    only commands and `save` work on the full resolution `img`.
+
+    Loaded JPEGs are first decoded straight at preview resolution with `Image.draft`, the full resolution
+    image is decoded in the background after the first preview, or as soon as `img` is needed.
+    Files with more than `max_image_pixels` pixels are refused before anything is decoded, the limit replaces
+    Pillow's `Image.MAX_IMAGE_PIXELS` while files are opened, so it can be raised as well as lowered.
+
     :author: Mira
     """
 
-    def __init__(self, image_preview: ImagePreview) -> None:
-        """Create an image object."""
+    preview_transport: str = "blob"
+    max_image_pixels: int = Image.MAX_IMAGE_PIXELS
+
+    def __init__(
+        self,
+        image_preview: ImageDisplay,
+        request_frame: Callable[[Callable[[Any], None]], Any] | None = None,
+    ) -> None:
+        """Create an image object.
+
+        params request_frame: schedules preview renders, without it `flush` has to be called to render
+        """
         self.img_name = ""
-        self.img = Image.new("RGB", (400, 250), (0, 0, 0))
-        self.backupImage = self.img.copy()
-        self.undo_available = True
+        self._img = Image.new("RGB", (400, 250), (0, 0, 0))
+        # Set while only a draft of a loaded image has been decoded.
+        self._opener: ImageOpener | None = None
+        self._draft: Image.Image | None = None
+        self._size = self._img.size
         self.edits = 0
         self.image_preview = image_preview
-
-    def refresh_image(self) -> None:
-        """Display edits on screen."""
+        self.renderer = RenderScheduler(self._render, request_frame)
+        # Without frames deferred tasks only run on `flush`, edits are compressed right away instead
+        self.history = UndoHistory(defer=self.renderer.defer if request_frame is not None else None)
+        self.stats = ImageStats()
+        self.pyramid = ImagePyramid()
+        self.preview_factor = 1
+        # Bumped on every pixel change, caches derived from the image are keyed on it.
+        self.generation = 0
+
+    @property
+    def img(self) -> Image.Image:
+        """The full resolution image, decoded first if only a draft of it was loaded."""
+        if self._opener is not None:
+            self._decode_full()
+        return self._img
+
+    @img.setter
+    def img(self, img: Image.Image) -> None:
+        self._img = img
+        self._size = img.size
+        self._opener = None
+        self._draft = None
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Size of the full resolution image, known without decoding it."""
+        return self._size
+
+    def refresh_image(self, box: Box | None = None) -> None:
+        """Schedule edits to be displayed on screen.
+
+        params box: region touched by the edit, when given only that region is pushed to the preview
+        """
         self.edits += 1
-        self.image_preview.display_image(self.get_js_link())
+        self._changed(box)
+
+    def _changed(self, box: Box | None = None) -> None:
+        """Invalidate what is derived from the changed region and schedule it to be displayed."""
+        self.generation += 1
+        self.stats.invalidate(box)
+        self.pyramid.invalidate(box)
+        self.renderer.mark_dirty(box)
 
+    def flush(self) -> None:
+        """Display pending edits on screen right away."""
+        self.renderer.flush()
+
+    @tracer.traced(category="image")
+    def _render(self, regions: list[Box] | None) -> None:
+        """Push pending edits to the preview.
+
+        params regions: regions to update, None to send the whole image
+        """
+        if regions is None:
+            self.preview_factor = preview_factor(self.size, self.image_preview.display_size())
+            with profiler.stage("encode"):
+                if self._draft is not None:
+                    frame = self._draft_frame()
+                    self.renderer.defer(self._decode_full)
+                else:
+                    frame = self.pyramid.level(self.img, self.preview_factor)
+                encoded = self.get_png_bytes(frame) if self.preview_transport == "blob" else self.get_js_link(frame)
+            with profiler.stage("dom"):
+                if self.preview_transport == "blob":
+                    self.image_preview.display_image_bytes(encoded, "image/png", self.size)
+                else:
+                    self.image_preview.display_image(encoded, self.size)
+            startup.mark(FINAL_PHASE)
+            return
+
+        with profiler.stage("encode"):
+            frame = self.pyramid.level(self.img, self.preview_factor)
+        for region in regions:
+            box = self.clip_box(region)
+            if box is not None:
+                box = scale_box(box, self.preview_factor)
+                with profiler.stage("encode"):
+                    pixels = frame.crop(box).convert("RGBA").tobytes()
+                with profiler.stage("dom"):
+                    self.image_preview.update_region(box, pixels)
+
+    def update_preview_scale(self) -> None:
+        """Render the preview again if the size it is shown at calls for another resolution."""
+        if preview_factor(self.size, self.image_preview.display_size()) != self.preview_factor:
+            self.renderer.mark_dirty()
+
+    def clip_box(self, box: Box) -> Box | None:
+        """Clip a box to the image bounds.
+
+        return the clipped box, None if it doesn't overlap the image
+        """
+        width, height = self.size
+        left, upper = max(box[0], 0), max(box[1], 0)
+        right, lower = min(box[2], width), min(box[3], height)
+        if left >= right or upper >= lower:
+            return None
+        return left, upper, right, lower
+
+    @tracer.traced(category="image")
     def load(self, image_name: str = "default.png") -> int:
         """Load image from images.
 
         params image_name: name of an image with .ext
-        return returns 0 if image has loaded 1 if the image wasn't located
+        return returns 0 if image has loaded 1 if the image wasn't located or couldn't be read,
+            2 if it has more than `max_image_pixels` pixels
         """
-        if (IMAGES_DIR / image_name).exists():
-            self.img = Image.open(IMAGES_DIR / image_name, "r").copy()
+        result = self.load_path(IMAGES_DIR / image_name)
+        if result == 0:
             self.img_name = image_name
-            self.edits = -1
-            self.refresh_image()
-            return 0
-        return 1
+        return result
+
+    def load_path(self, path: pathlib.Path) -> int:
+        """Load an image file from anywhere, starting a new undo history.
+
+        params path: path of the image file
+        return 0 if the image has loaded, 1 if it wasn't found or couldn't be read, 2 if it has too many pixels
+        """
+        if not path.is_file():
+            return 1
+        result = self._open(lambda: Image.open(path, "r"))
+        if result == 0:
+            self.history.clear()
+        return result
+
+    def _open(self, opener: ImageOpener, *, undoable: bool = False) -> int:
+        """Replace the image by an image file, decoding only what the first preview needs.
+
+        params opener: opens the file, it is called again when the full resolution image is decoded
+        params undoable: save the current image for undo before replacing it
+        return 0 if the image was opened, 1 if it couldn't be read, 2 if it has too many pixels
+        """
+        try:
+            with self._pixel_limit():
+                source = opener()
+        except Image.DecompressionBombError:
+            return 2
+        except OSError:
+            return 1
+        if source.width * source.height > self.max_image_pixels:
+            source.close()
+            return 2
+
+        if undoable:
+            self.undo_save()
+        factor = preview_factor(source.size, self.image_preview.display_size())
+        if source.format == "JPEG" and factor > 1:
+            size = source.size
+            source.draft(source.mode, (max(size[0] // factor, 1), max(size[1] // factor, 1)))
+            with source:
+                self.img = source.copy()
+            self._size = size
+            self._opener = opener
+            self._draft = self._img
+        else:
+            with source:
+                self.img = source.copy()
+
+        self.edits = -1
+        self.refresh_image()
+        return 0
+
+    def _draft_frame(self) -> Image.Image:
+        """Return the draft of a lazily loaded image, reduced further if the decoder couldn't scale it enough."""
+        factor = preview_factor(self._draft.size, self.image_preview.display_size())
+        if factor > 1:
+            self._draft = reduce_image(self._draft, factor)
+        return self._draft
+
+    @tracer.traced(category="image")
+    def _decode_full(self) -> None:
+        """Decode a lazily loaded image at full resolution."""
+        if self._opener is None:
+            return
+        with self._pixel_limit(), self._opener() as source:
+            self.img = source.copy()
+
+    @contextlib.contextmanager
+    def _pixel_limit(self) -> Iterator[None]:
+        """Let Pillow open files up to `max_image_pixels` pixels, `_open` refuses larger ones itself."""
+        default = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = self.max_image_pixels
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                yield
+        finally:
+            Image.MAX_IMAGE_PIXELS = default
 
     def save(self, img_name: str) -> int:
         """Save image to images/<img_name>.
@@ -53,70 +296,121 @@ class PaintImage:
             print("Can't save an empty image.")
             return 1
         self.img.save(IMAGES_DIR / img_name, format="PNG")
+        image_index.update(img_name)
         self.edits = 0
         return 0
 
-    def get_js_link(self) -> str:
+    @tracer.traced(category="image")
+    def get_png_bytes(self, img: Image.Image | None = None) -> memoryview:
+        """Return the image encoded as PNG.
+
+        params img: image to encode instead of the full resolution image
+        return memoryview over the encoded file, no copy of the encoder output is made
+        """
+        buf = io.BytesIO()
+        (img or self.img).save(buf, format="PNG")
+        return buf.getbuffer()
+
+    @tracer.traced(category="image")
+    def get_js_link(self, img: Image.Image | None = None) -> str:
         """Return base64 link for an image file.
 
+        params img: image to encode instead of the full resolution image
         return string - image src link
         """
-        buf = io.BytesIO()
-        self.img.save(buf, format="PNG")
-        data = base64.b64encode(buf.getvalue()).decode("utf-8")
+        data = base64.b64encode(self.get_png_bytes(img)).decode("utf-8")
         return f"data:image/png;base64,{data}"
 
-    def load_from_image_link(self, js_link: str) -> None:
+    @tracer.traced(category="image")
+    def load_from_bytes(self, buffer: bytes | memoryview) -> int:
+        """Load image from the contents of an image file into self.img.
+
+        params buffer: the encoded file, bytes are used as they are, other buffers are copied once
+        return 0 if the image has loaded, 1 if it couldn't be read, 2 if it has too many pixels
+        """
+        # BytesIO shares bytes instead of copying them, so the file can be opened again for a lazy decode.
+        # `bytes` returns bytes as they are, e.g. an upload already copied out of JS.
+        data = bytes(buffer)
+        return self._open(lambda: Image.open(io.BytesIO(data)), undoable=True)
+
+    @tracer.traced(category="image")
+    def load_from_image_link(self, js_link: str) -> int:
         """Load image from a base64 image src link (data URL) into self.img.
 
         js_link: str - base64 data URL like "data:image/png;base64,iVBORw0..."
+        return 0 if the image has loaded, 1 if it couldn't be read, 2 if it has too many pixels
         """
         header, encoded = js_link.split(",", 1)
-        img_data = base64.b64decode(encoded)
-        buf = io.BytesIO(img_data)
-        self.img = Image.open(buf)
-        self.undo_save()
-        self.edits = -1
-        self.refresh_image()
+        return self.load_from_bytes(base64.b64decode(encoded))
 
+    @tracer.traced(category="image")
     def undo(self) -> int:
         """Return 0 if chages undone, otherwise 1."""
-        if self.undo_available:
-            self.img = self.backup_image
-            self.undo_available = False
-            self.refresh_image()
-            return 0
-        return 1
-
-    def undo_save(self) -> None:
-        """Save for undo."""
-        self.backup_image = self.img.copy()
-        self.undo_available = True
-
-    def get_info(self) -> dict[str, tuple[int, int] | str | bool | list | None]:
+        return self._restore(self.history.undo(self.img))
+
+    @tracer.traced(category="image")
+    def redo(self) -> int:
+        """Return 0 if undone chages were reapplied, otherwise 1."""
+        return self._restore(self.history.redo(self.img))
+
+    def _restore(self, restored: tuple[Image.Image, list[Box] | None] | None) -> int:
+        """Display an image restored from history.
+
+        return 0 if there was something to restore, otherwise 1
+        """
+        if restored is None:
+            return 1
+        self.img, regions = restored
+        self.edits += 1
+        if regions is None:
+            self._changed()
+        for region in regions or ():
+            self._changed(region)
+        return 0
+
+    def undo_save(self, box: Box | None = None) -> None:
+        """Save for undo.
+
+        params box: region the next edit changes, None if it can change the whole image
+        """
+        with profiler.stage("undo"):
+            self.history.record(self.img, box)
+
+    def get_color_stats(self) -> ColorStats:
+        """Return color statistics of the image, only regions edited since the last call are rescanned."""
+        return self.stats.get(self.img, self.generation)
+
+    def get_info(self) -> dict[str, tuple[int, int] | str | int | ColorStats | None]:
         """Return image information dictionary.
 
-        return dictionary containing basic information including: size, format, colors
+        return dictionary containing basic information including: size, format, color statistics
         """
         return {
-            "size": self.img.size,
+            "size": self.size,
             "format": self.img.format,
             "edits": self.edits,
-            "colors": self.img.getcolors(),
+            "colors": self.get_color_stats(),
+            "history_bytes": self.history.nbytes,
+            "undo_levels": self.history.undo_levels,
+            "redo_levels": self.history.redo_levels,
         }
 
+    @tracer.traced(category="image")
     def set_pixel(self, x: int, y: int, color: Color) -> None:
         """Set an image pixel."""
-        self.undo_save()
+        box = (x, y, x + 1, y + 1)
+        self.undo_save(box)
 
-        draw = ImageDraw.Draw(self.img, "RGBA")
-        draw.point((x, y), color.rgb)
-        self.refresh_image()
+        with profiler.stage("rasterize"):
+            draw = ImageDraw.Draw(self.img, "RGBA")
+            draw.point((x, y), color.rgb)
+        self.refresh_image(box)
 
     def get_pixel(self, x: int, y: int) -> tuple[int, ...]:
         """Get an image pixel."""
         return self.img.getpixel((x, y))
 
+    @tracer.traced(category="image")
     def fill_rect(  # noqa: PLR0913
         self,
         x: int,
@@ -134,27 +428,33 @@ class PaintImage:
         if width <= 0 or height <= 0:
             return 1
 
-        self.undo_save()
-
-        draw = ImageDraw.Draw(self.img, "RGBA")
-        draw.rectangle(
-            [x, y, x + width - 1, y + height - 1],
-            fill=fill_color.rgba if fill_color else None,
-            outline=outline_color.rgba if outline_color else None,
-            width=outline_size,
-        )
-        self.refresh_image()
+        box = (x, y, x + width, y + height)
+        self.undo_save(box)
+
+        with profiler.stage("rasterize"):
+            draw = ImageDraw.Draw(self.img, "RGBA")
+            draw.rectangle(
+                [x, y, x + width - 1, y + height - 1],
+                fill=fill_color.rgba if fill_color else None,
+                outline=outline_color.rgba if outline_color else None,
+                width=outline_size,
+            )
+        self.refresh_image(box)
         return 0
 
+    @tracer.traced(category="image")
     def draw_line(self, x1: int, y1: int, x2: int, y2: int, color: Color) -> int:
         """Draw a straight line on the image."""
-        self.undo_save()
+        box = (min(x1, x2), min(y1, y2), max(x1, x2) + 1, max(y1, y2) + 1)
+        self.undo_save(box)
 
-        draw = ImageDraw.Draw(self.img, "RGBA")
-        draw.line((x1, y1, x2, y2), fill=color.rgb)
-        self.refresh_image()
+        with profiler.stage("rasterize"):
+            draw = ImageDraw.Draw(self.img, "RGBA")
+            draw.line((x1, y1, x2, y2), fill=color.rgb)
+        self.refresh_image(box)
         return 0
 
+    @tracer.traced(category="image")
     def draw_circle(  # noqa: PLR0913
         self,
         cx: int,
@@ -165,19 +465,22 @@ class PaintImage:
         outline_size: int = 0,
     ) -> int:
         """Draw a circle on the image."""
-        self.undo_save()
-
-        draw = ImageDraw.Draw(self.img, "RGBA")
-        bbox = [cx - radius, cy - radius, cx + radius, cy + radius]
-        draw.ellipse(
-            bbox,
-            fill=fill_color.rgba if fill_color else None,
-            outline=outline_color.rgba if outline_color else None,
-            width=outline_size,
-        )
-        self.refresh_image()
+        box = (cx - radius, cy - radius, cx + radius + 1, cy + radius + 1)
+        self.undo_save(box)
+
+        with profiler.stage("rasterize"):
+            draw = ImageDraw.Draw(self.img, "RGBA")
+            bbox = [cx - radius, cy - radius, cx + radius, cy + radius]
+            draw.ellipse(
+                bbox,
+                fill=fill_color.rgba if fill_color else None,
+                outline=outline_color.rgba if outline_color else None,
+                width=outline_size,
+            )
+        self.refresh_image(box)
         return 0
 
+    @tracer.traced(category="image")
     def draw_polygon(
         self,
         points: list[tuple[int, int]],
@@ -189,14 +492,17 @@ class PaintImage:
 
         Return 0 on success 1 on fail
         """
-        self.undo_save()
-
-        draw = ImageDraw.Draw(self.img, "RGBA")
-        draw.polygon(
-            points,
-            fill=fill_color.rgba if fill_color else None,
-            outline=outline_color.rgba if outline_color else None,
-            width=outline_size,
-        )
-        self.refresh_image()
+        xs, ys = [x for x, _ in points], [y for _, y in points]
+        box = (min(xs), min(ys), max(xs) + 1, max(ys) + 1)
+        self.undo_save(box)
+
+        with profiler.stage("rasterize"):
+            draw = ImageDraw.Draw(self.img, "RGBA")
+            draw.polygon(
+                points,
+                fill=fill_color.rgba if fill_color else None,
+                outline=outline_color.rgba if outline_color else None,
+                width=outline_size,
+            )
+        self.refresh_image(box)
         return 0
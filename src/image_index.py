@@ -0,0 +1,131 @@
+"""In-memory index of the image directory, shared by `ls`, `load_image`, `save_image` and completion.
+
+Each file's byte size, dimensions, mode and modification time are read once, from the image header without
+decoding the pixels. `refresh` costs a single stat of the directory while nothing changed, after a change only
+new or modified files are read again. Writers in the app, e.g. `PaintImage.save`, call `update` for the file they
+wrote so the index is current right away, the next refresh then only lists the directory. Listeners are told
+about every file added, changed or removed. A file rewritten in place by another program doesn't change the
+directory's modification time, it is only read again once the directory itself changes.
+"""
+
+import pathlib
+from collections.abc import Callable, Iterator, Mapping
+from typing import NamedTuple
+
+from PIL import Image, UnidentifiedImageError
+
+from completion import PrefixTrie
+
+IMAGES_DIR = pathlib.Path(__file__).parent.resolve() / "images"
+
+
+class ImageEntry(NamedTuple):
+    """What is known about a file of the image directory, size and mode are None if it isn't an image."""
+
+    name: str
+    bytes: int
+    mtime: float
+    size: tuple[int, int] | None
+    mode: str | None
+
+
+# Called with the name of a file and its new entry, or None if it was removed.
+IndexListener = Callable[[str, ImageEntry | None], None]
+
+
+def read_entry(path: pathlib.Path) -> ImageEntry:
+    """Return the entry of a file, only reading its header."""
+    stat = path.stat()
+    try:
+        with Image.open(path) as img:
+            size, mode = img.size, img.mode
+    # Files too large to open are listed like files that aren't images
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        size, mode = None, None
+    return ImageEntry(path.name, stat.st_size, stat.st_mtime, size, mode)
+
+
+class ImageIndex(Mapping[str, ImageEntry]):
+    """Entries of the files in a directory by name, `version` changes whenever they do."""
+
+    def __init__(self, directory: pathlib.Path) -> None:
+        self.directory = directory
+        self.version = 0
+        self._entries: dict[str, ImageEntry] = {}
+        self._listeners: list[IndexListener] = []
+        self._directory_mtime: int | None = -1
+        self._trie = PrefixTrie()
+        self._trie_version = 0
+
+    def __getitem__(self, name: str) -> ImageEntry:
+        # Not refreshed when the name is known, so iterating over the items costs one refresh
+        entry = self._entries.get(name)
+        if entry is None:
+            self.refresh()
+            entry = self._entries[name]
+        return entry
+
+    def __contains__(self, name: object) -> bool:
+        self.refresh()
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        self.refresh()
+        return iter(sorted(self._entries))
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._entries)
+
+    def subscribe(self, listener: IndexListener) -> None:
+        """Call the listener for every file added, changed or removed from now on."""
+        self._listeners.append(listener)
+
+    def refresh(self) -> None:
+        """Bring the index up to date if the directory changed since it was last read."""
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._directory_mtime:
+            return
+        self._directory_mtime = mtime
+
+        paths = {} if mtime is None else {path.name: path for path in self.directory.iterdir() if path.is_file()}
+        for name in self._entries.keys() - paths.keys():
+            self._set(name, None)
+        for name, path in paths.items():
+            entry = self._entries.get(name)
+            stat = path.stat()
+            if entry is None or entry.bytes != stat.st_size or entry.mtime != stat.st_mtime:
+                self._set(name, read_entry(path))
+
+    def update(self, name: str) -> None:
+        """Read a file of the directory again after it was written or deleted."""
+        path = self.directory / name
+        self._set(name, read_entry(path) if path.is_file() else None)
+        # The directory's modification time is left as it was, files added or removed by others since the last
+        # refresh are still found by the next one. This file isn't read again there, its entry is current.
+
+    def first(self, prefix: str) -> str | None:
+        """Return the first file name starting with the prefix."""
+        self.refresh()
+        if self._trie_version != self.version:
+            self._trie = PrefixTrie(self._entries)
+            self._trie_version = self.version
+        return self._trie.first(prefix)
+
+    def _set(self, name: str, entry: ImageEntry | None) -> None:
+        if entry is None:
+            if self._entries.pop(name, None) is None:
+                return
+        elif self._entries.get(name) == entry:
+            return
+        else:
+            self._entries[name] = entry
+        self.version += 1
+        for listener in self._listeners:
+            listener(name, entry)
+
+
+image_index = ImageIndex(IMAGES_DIR)
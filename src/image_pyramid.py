@@ -0,0 +1,88 @@
+from PIL import Image
+
+from render_scheduler import Box
+
+# Modes Image.reduce works on, anything else is converted to RGBA first.
+REDUCIBLE_MODES = ("L", "LA", "RGB", "RGBA")
+
+
+def reduce_image(img: Image.Image, factor: int) -> Image.Image:
+    """Downscale an image by an integer factor, averaging each factor x factor block."""
+    if img.mode not in REDUCIBLE_MODES:
+        img = img.convert("RGBA")
+    return img.reduce(factor)
+
+
+def scale_box(box: Box, factor: int) -> Box:
+    """Return the box of a downscaled image covering a region of the full image."""
+    return box[0] // factor, box[1] // factor, -(-box[2] // factor), -(-box[3] // factor)
+
+
+def preview_factor(size: tuple[int, int], display_size: tuple[int, int] | None) -> int:
+    """Return the largest power of two an image can be downscaled by and still fill its display size.
+
+    :param size: size of the full image
+    :param display_size: device pixels available to show the image in, None if unknown
+    """
+    if not display_size or min(display_size) <= 0:
+        return 1
+    scale = min(display_size[0] / size[0], display_size[1] / size[1])
+    factor = 1
+    while factor * 2 * scale <= 1:
+        factor *= 2
+    return factor
+
+
+class ImagePyramid:
+    """Cache of downscaled copies of an image, used to render previews at the resolution they are shown at.
+
+    Levels are built on first use with `Image.reduce`. Edited regions are `invalidate`d and patched into every
+    cached level the next time a level is requested, only the blocks covering those regions are reduced again.
+    """
+
+    def __init__(self) -> None:
+        self._levels: dict[int, Image.Image] = {}
+        self._dirty: list[Box] = []
+
+    def invalidate(self, box: Box | None = None) -> None:
+        """Mark a region, or with no box the whole image, as changed.
+
+        :param box: region that changed, None if the whole image changed
+        """
+        if box is None:
+            self._levels.clear()
+            self._dirty.clear()
+        elif self._levels:
+            self._dirty.append(box)
+
+    def level(self, img: Image.Image, factor: int) -> Image.Image:
+        """Return the image downscaled by `factor`.
+
+        :param img: the full image, it must be the one the invalidated regions refer to
+        :param factor: downscale factor, 1 returns the image itself
+        """
+        if factor == 1:
+            return img
+        self._apply_dirty(img)
+
+        level = self._levels.get(factor)
+        if level is None or level.size != scale_box((0, 0, *img.size), factor)[2:]:
+            level = self._levels[factor] = reduce_image(img, factor)
+        return level
+
+    def _apply_dirty(self, img: Image.Image) -> None:
+        """Reduce the blocks covering edited regions again and paste them into the cached levels."""
+        dirty, self._dirty = self._dirty, []
+        for box in dirty:
+            for factor, level in self._levels.items():
+                left, upper, right, lower = scale_box(box, factor)
+                right, lower = min(right, level.width), min(lower, level.height)
+                if left >= right or upper >= lower:
+                    continue
+                source = (
+                    left * factor,
+                    upper * factor,
+                    min(right * factor, img.width),
+                    min(lower * factor, img.height),
+                )
+                level.paste(reduce_image(img.crop(source), factor), (left, upper))
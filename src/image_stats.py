@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from render_scheduler import Box
+
+STATS_TILE_SIZE = 256
+DOMINANT_COLORS = 5
+# Above this many changed tiles, merging every tile at once is cheaper than updating the totals tile by tile.
+INCREMENTAL_TILE_LIMIT = 8
+
+_CHANNEL_VALUES = np.arange(256, dtype=np.float64)
+
+
+@dataclass
+class TileStats:
+    """Color counts of one tile of the image.
+
+    `colors` are the distinct packed RGBA values of the tile, sorted, with their pixel count in `counts`.
+    """
+
+    colors: np.ndarray
+    counts: np.ndarray
+    histograms: np.ndarray
+
+
+@dataclass
+class ColorStats:
+    """Color statistics of a whole image, channels are in RGBA order."""
+
+    pixel_count: int
+    color_count: int
+    histograms: np.ndarray
+    mean: tuple[float, float, float, float]
+    stddev: tuple[float, float, float, float]
+    dominant_colors: list[tuple[tuple[int, int, int, int], int]]
+
+
+def pack_rgba(pixels: np.ndarray) -> np.ndarray:
+    """Pack an (h, w, 4) uint8 RGBA array into one uint32 per pixel."""
+    return np.ascontiguousarray(pixels).view("<u4").ravel()
+
+
+def unpack_rgba(color: int) -> tuple[int, int, int, int]:
+    """Unpack a packed RGBA value."""
+    return color & 0xFF, (color >> 8) & 0xFF, (color >> 16) & 0xFF, (color >> 24) & 0xFF
+
+
+def tile_stats(img: Image.Image, box: Box) -> TileStats:
+    """Count the colors of a region of an image."""
+    pixels = np.asarray(img.crop(box).convert("RGBA"))
+    colors, counts = np.unique(pack_rgba(pixels), return_counts=True)
+    histograms = np.stack([np.bincount(pixels[..., channel].ravel(), minlength=256) for channel in range(4)])
+    return TileStats(colors, counts.astype(np.int64), histograms.astype(np.int64))
+
+
+class ImageStats:
+    """Color statistics of an image, kept up to date incrementally.
+
+    The image is split in tiles with their own color counts. Edits `invalidate` the tiles they touched, and the
+    next `get` recomputes only those, subtracting their old counts from the image wide totals and adding the new
+    ones. Results are cached against the generation of the image passed to `get`.
+    """
+
+    def __init__(self, tile_size: int = STATS_TILE_SIZE) -> None:
+        self.tile_size = tile_size
+        self._layout: tuple[tuple[int, int], str] | None = None
+        self._tiles: dict[tuple[int, int], TileStats] = {}
+        self._dirty: set[tuple[int, int]] = set()
+        self._colors = np.empty(0, dtype=np.uint32)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._histograms = np.zeros((4, 256), dtype=np.int64)
+        self._result: ColorStats | None = None
+        self._generation: int | None = None
+
+    def invalidate(self, box: Box | None = None) -> None:
+        """Mark a region, or with no box the whole image, as changed.
+
+        :param box: region that changed, None if the whole image changed
+        """
+        self._result = None
+        if box is None or self._layout is None:
+            self._layout = None
+            return
+        (width, height), _mode = self._layout
+        size = self.tile_size
+        left, upper = max(box[0], 0), max(box[1], 0)
+        right, lower = min(box[2], width), min(box[3], height)
+        self._dirty.update(
+            (x, y) for y in range(upper - upper % size, lower, size) for x in range(left - left % size, right, size)
+        )
+
+    def get(self, img: Image.Image, generation: int | None = None) -> ColorStats:
+        """Return the statistics of the image, recomputing only changed tiles.
+
+        :param img: the image, it must be the one the invalidated regions refer to
+        :param generation: edit generation of the image, a cached result is returned if it hasn't changed
+        """
+        if self._result is not None and generation is not None and generation == self._generation:
+            return self._result
+
+        if self._layout != (img.size, img.mode):
+            self._reset(img)
+
+        incremental = len(self._dirty) <= INCREMENTAL_TILE_LIMIT
+        for origin in self._dirty:
+            old = self._tiles.get(origin)
+            x, y = origin
+            new = tile_stats(img, (x, y, min(x + self.tile_size, img.width), min(y + self.tile_size, img.height)))
+            self._tiles[origin] = new
+            if incremental:
+                if old is not None:
+                    self._remove(old)
+                self._add(new)
+        self._dirty.clear()
+
+        if incremental:
+            used = self._counts > 0
+            self._colors, self._counts = self._colors[used], self._counts[used]
+        else:
+            self._merge_tiles()
+
+        self._result = self._summarize()
+        self._generation = generation
+        return self._result
+
+    def _reset(self, img: Image.Image) -> None:
+        self._layout = (img.size, img.mode)
+        self._tiles.clear()
+        self._dirty = {
+            (x, y) for y in range(0, img.height, self.tile_size) for x in range(0, img.width, self.tile_size)
+        }
+        self._colors = np.empty(0, dtype=np.uint32)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._histograms = np.zeros((4, 256), dtype=np.int64)
+
+    def _merge_tiles(self) -> None:
+        """Recompute the totals from the counts of every tile."""
+        tiles = self._tiles.values()
+        colors, inverse = np.unique(np.concatenate([tile.colors for tile in tiles]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([tile.counts for tile in tiles]))
+        self._colors = colors
+        self._counts = counts.astype(np.int64)
+        self._histograms = sum(tile.histograms for tile in tiles)
+
+    def _add(self, tile: TileStats) -> None:
+        """Add a tile's counts to the totals, inserting colors not seen yet in sorted position."""
+        self._histograms += tile.histograms
+        index = np.searchsorted(self._colors, tile.colors)
+        known = index < len(self._colors)
+        known[known] = self._colors[index[known]] == tile.colors[known]
+        self._counts[index[known]] += tile.counts[known]
+        self._colors = np.insert(self._colors, index[~known], tile.colors[~known])
+        self._counts = np.insert(self._counts, index[~known], tile.counts[~known])
+
+    def _remove(self, tile: TileStats) -> None:
+        """Subtract a tile's counts from the totals, colors left at zero are dropped afterwards."""
+        self._histograms -= tile.histograms
+        self._counts[np.searchsorted(self._colors, tile.colors)] -= tile.counts
+
+    def _summarize(self) -> ColorStats:
+        pixel_count = int(self._histograms[0].sum())
+        if pixel_count == 0:
+            zeros = (0.0, 0.0, 0.0, 0.0)
+            return ColorStats(0, 0, self._histograms.copy(), zeros, zeros, [])
+
+        mean = self._histograms @ _CHANNEL_VALUES / pixel_count
+        variance = self._histograms @ (_CHANNEL_VALUES**2) / pixel_count - mean**2
+        stddev = np.sqrt(np.maximum(variance, 0))
+
+        top = min(DOMINANT_COLORS, len(self._counts))
+        dominant = np.argpartition(self._counts, -top)[-top:]
+        dominant = dominant[np.argsort(self._counts[dominant])[::-1]]
+
+        return ColorStats(
+            pixel_count=pixel_count,
+            color_count=len(self._colors),
+            histograms=self._histograms.copy(),
+            mean=tuple(float(value) for value in mean),
+            stddev=tuple(float(value) for value in stddev),
+            dominant_colors=[(unpack_rgba(int(self._colors[i])), int(self._counts[i])) for i in dominant],
+        )
@@ -0,0 +1,55 @@
+"""Engine channel over `postMessage`, between the page and a Web Worker."""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import js  # type: ignore[import]
+from pyodide.ffi import create_proxy, to_js
+
+from engine_protocol import Buffer, Message
+
+
+class JsChannel:
+    """Channel end posting messages to a `Worker`, or from inside a worker to the page.
+
+    Buffers are copied once into a new `ArrayBuffer`, which is transferred rather than cloned when listed in
+    `transfer`. Received buffers arrive as bytes, copied once out of JS.
+    """
+
+    def __init__(self, target: Any) -> None:  # noqa: ANN401
+        """Listen to messages from a worker.
+
+        :param target: the `Worker` object on the page, or the worker's global scope inside the worker
+        """
+        self.target = target
+        self.on_message: Callable[[Message], None] | None = None
+        self._listener = create_proxy(lambda event: self.receive(event.data))
+        target.addEventListener("message", self._listener)
+
+    def post(self, message: Message, transfer: Sequence[Buffer] = ()) -> None:
+        """Send a message to the other end."""
+        transferred = {id(buffer) for buffer in transfer}
+        fields = {}
+        js_transfer = []
+        for key, value in message.items():
+            if isinstance(value, Buffer):
+                array = js.Uint8Array.new(memoryview(value).nbytes)
+                array.assign(value)
+                value = array.buffer  # noqa: PLW2901
+                if id(message[key]) in transferred:
+                    js_transfer.append(value)
+            fields[key] = value
+        self.target.postMessage(to_js(fields, dict_converter=js.Object.fromEntries), to_js(js_transfer))
+
+    def receive(self, data: Any) -> None:  # noqa: ANN401
+        """Deliver a message received from JS, e.g. one the worker queued before Python was ready."""
+        message = {}
+        for key, value in data.to_py(depth=1).items():
+            if hasattr(value, "to_bytes"):
+                message[key] = value.to_bytes()
+            elif hasattr(value, "to_py"):
+                message[key] = value.to_py()
+            else:
+                message[key] = value
+        if self.on_message is not None:
+            self.on_message(message)
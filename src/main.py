@@ -1,8 +1,20 @@
 """The main entry point for client-side code."""
 
+from typing import Any
+
 from gui import init_gui
+from timing import publish_to_page, startup
+
 
+def main(worker_url: str | None = None, startup_marks: Any = None) -> None:  # noqa: ANN401
+    """Run the client-side Python code. This is the entry point for the browser.
 
-def main() -> None:
-    """Run the client-side Python code. This is the entry point for the browser."""
-    init_gui()
+    :param worker_url: script of a Web Worker to run the terminal and image engine in, None to run it on the page
+    :param startup_marks: JS object with the `origin` of the page and the `marks` of the phases it went through
+    """
+    if startup_marks is not None:
+        marks = startup_marks.to_py()
+        startup.record(marks["marks"], marks["origin"])
+    startup.publish = publish_to_page
+    init_gui(worker_url)
+    startup.mark("gui_ready")
@@ -0,0 +1,126 @@
+"""Stage timings of commands, reported by the `time` command.
+
+Code on the command path marks its stages with `profiler.stage(name)`. Only while `profiler.profile()` is active
+is time measured, otherwise a stage costs one attribute check. Stages nest, time is attributed to the innermost
+stage, so the stages of a command add up to its wall time.
+"""
+
+import math
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from types import TracebackType
+
+# Stages in pipeline order, `time` prints them in this order.
+STAGES = ("parse", "validation", "undo", "rasterize", "encode", "dom")
+# Latest run times kept per command for percentiles.
+STATS_WINDOW = 1000
+
+
+class _Stage:
+    """Context manager attributing the time spent inside it to a stage."""
+
+    __slots__ = ("name", "profiler")
+
+    def __init__(self, profiler: "StageProfiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        if self.profiler.timings is not None:
+            self.profiler.enter(self.name)
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.profiler.timings is not None:
+            self.profiler.exit()
+
+
+class StageProfiler:
+    """Accumulates the time spent in each stage while profiling."""
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] | None = None
+        self._stack: list[str] = []
+        self._since = 0.0
+
+    def stage(self, name: str) -> _Stage:
+        """Return a context manager attributing the time spent in it to stage `name`."""
+        return _Stage(self, name)
+
+    @contextmanager
+    def profile(self) -> Iterator[dict[str, float]]:
+        """Measure stages for the duration of the `with` block.
+
+        Yields the seconds spent per stage, filled in as stages run. Time outside any stage is under "other".
+        """
+        outer = self.timings, self._stack, self._since
+        self.timings = timings = {}
+        self._stack = ["other"]
+        self._since = time.perf_counter()
+        try:
+            yield timings
+        finally:
+            self._charge()
+            self.timings, self._stack, self._since = outer
+
+    def enter(self, name: str) -> None:
+        """Start attributing time to stage `name`, pausing the current one."""
+        self._charge()
+        self._stack.append(name)
+
+    def exit(self) -> None:
+        """Return to the stage that was current before the last `enter`."""
+        self._charge()
+        self._stack.pop()
+
+    def _charge(self) -> None:
+        """Attribute the time since the last change of stage to the current stage."""
+        now = time.perf_counter()
+        name = self._stack[-1]
+        self.timings[name] = self.timings.get(name, 0.0) + now - self._since
+        self._since = now
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class CommandStats:
+    """Rolling run times of each command, over its latest `window` runs."""
+
+    def __init__(self, window: int = STATS_WINDOW) -> None:
+        self.window = window
+        self._runs: dict[str, deque[float]] = {}
+
+    def record(self, command: str, seconds: float) -> None:
+        """Add a run of a command."""
+        runs = self._runs.get(command)
+        if runs is None:
+            runs = self._runs[command] = deque(maxlen=self.window)
+        runs.append(seconds)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return the number of runs and the p50, p95 and p99 run time in milliseconds of each command."""
+        summary = {}
+        for command, runs in sorted(self._runs.items()):
+            values = sorted(runs)
+            summary[command] = {
+                "count": len(values),
+                "p50": percentile(values, 0.50) * 1000,
+                "p95": percentile(values, 0.95) * 1000,
+                "p99": percentile(values, 0.99) * 1000,
+            }
+        return summary
+
+
+profiler = StageProfiler()
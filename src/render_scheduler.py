@@ -0,0 +1,107 @@
+from collections.abc import Callable
+from typing import Any
+
+# Region of the image in Pillow box convention: (left, upper, right, lower), right and lower exclusive.
+Box = tuple[int, int, int, int]
+
+# Past this many separate regions a single bounding box is cheaper to render than the pieces.
+MAX_REGIONS = 16
+
+
+def union_box(a: Box, b: Box) -> Box:
+    """Return the smallest box containing both boxes."""
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def boxes_touch(a: Box, b: Box) -> bool:
+    """Return True if the boxes overlap or share an edge."""
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class RenderScheduler:
+    """Coalesces preview refreshes so an image is rendered at most once per animation frame.
+
+    Edits mark the image dirty, either fully or by region. Pending regions are merged and handed to
+    `render` on the next frame, `None` is passed instead when the whole image has to be redrawn.
+
+    `request_frame` schedules a callback for the next frame, in the browser this is `requestAnimationFrame`.
+    Without it nothing is rendered until `flush` is called, which is what tests and headless runs rely on.
+
+    Work that shouldn't delay an edit can be `defer`red, it runs after the next render.
+    Tasks deferred while rendering wait for the frame after, so the rendered frame isn't held back by them.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[list[Box] | None], None],
+        request_frame: Callable[[Callable[[Any], None]], Any] | None = None,
+    ) -> None:
+        self.render = render
+        self.request_frame = request_frame
+        self._full = False
+        self._regions: list[Box] = []
+        self._frame_requested = False
+        self._tasks: list[Callable[[], None]] = []
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes waiting to be rendered."""
+        return self._full or bool(self._regions)
+
+    def mark_dirty(self, box: Box | None = None) -> None:
+        """Mark a region, or with no box the whole image, as needing a render.
+
+        :param box: region that changed, None if the whole image changed
+        """
+        if box is None:
+            self._full = True
+            self._regions.clear()
+        elif not self._full:
+            self._add_region(box)
+        self._schedule()
+
+    def defer(self, task: Callable[[], None]) -> None:
+        """Run a task after the next render, off the path of the edit that requested it."""
+        self._tasks.append(task)
+        self._schedule()
+
+    def flush(self) -> None:
+        """Render pending changes now, then run deferred tasks."""
+        tasks, self._tasks = self._tasks, []
+        if self.dirty:
+            regions = None if self._full else self._regions
+            self._full = False
+            self._regions = []
+            self.render(regions)
+
+        for task in tasks:
+            task()
+
+    def _add_region(self, box: Box) -> None:
+        """Add a region, merging it with any pending region it touches."""
+        merged = True
+        while merged:
+            merged = False
+            for i, region in enumerate(self._regions):
+                if boxes_touch(region, box):
+                    box = union_box(region, box)
+                    del self._regions[i]
+                    merged = True
+                    break
+        self._regions.append(box)
+
+        if len(self._regions) > MAX_REGIONS:
+            bounds = self._regions[0]
+            for region in self._regions[1:]:
+                bounds = union_box(bounds, region)
+            self._regions = [bounds]
+
+    def _schedule(self) -> None:
+        if self._frame_requested or self.request_frame is None:
+            return
+        self._frame_requested = True
+        self.request_frame(self._on_frame)
+
+    def _on_frame(self, _timestamp: Any = None) -> None:  # noqa: ANN401
+        self._frame_requested = False
+        self.flush()
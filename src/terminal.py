@@ -1,6 +1,14 @@
+import time
+from collections.abc import Iterable
+from typing import Protocol
+
 from commands import all_commands
-from gui.components.terminal_gui import TerminalGui
+from completion import CompletionEngine
 from image import PaintImage
+from image_index import image_index
+from profiling import CommandStats, profiler
+from thumbnails import Gallery
+from tracing import tracer
 from utils.color import Color, create_color
 
 SUCCESS_COLOUR = "var(--terminal-success-color)"
@@ -26,6 +34,24 @@ def get_options(args: list[str]) -> tuple[list[str], dict[str, str]]:
     return args[:options_start], options
 
 
+class TerminalDisplay(Protocol):
+    """What the terminal needs from the display it prints to.
+
+    `TerminalGui` is the display on the page, `engine.RemoteTerminalDisplay` forwards to it from a worker.
+    """
+
+    terminal: "Terminal | None"
+    background_color: str
+
+    def print_terminal_output(self, text: str, color: str | None = None) -> None:
+        """Print the given text to the terminal output."""
+        ...
+
+    def print_terminal_lines(self, lines: list[str], color: str | None = None) -> None:
+        """Print several lines to the terminal output at once."""
+        ...
+
+
 class Terminal:
     """Terminal manages a custom command environment.
 
@@ -35,12 +61,23 @@ class Terminal:
     foreground_color = Color(255, 255, 255)
     background_color = Color(0, 0, 0)
 
-    def __init__(self, image: PaintImage, display: TerminalGui) -> None:
+    def __init__(self, image: PaintImage, display: TerminalDisplay) -> None:
         self.image = image
+        self.command_stats = CommandStats()
+        self.completion = CompletionEngine(all_commands, image_index)
+        self._gallery: Gallery | None = None
 
         self.terminal_display = display
         display.terminal = self
 
+    @property
+    def gallery(self) -> Gallery:
+        """The gallery of saved images shown over the preview, created when first shown."""
+        if self._gallery is None:
+            self._gallery = Gallery(self.image.image_preview, self.image.renderer.defer)
+        return self._gallery
+
+    @tracer.traced(category="terminal")
     def run_str(self, command_str: str) -> bool:
         """Parse and then run the given command.
 
@@ -52,84 +89,73 @@ class Terminal:
         if command_str.strip() == "":
             return False
 
-        command: str
-        args: list[str]
-        command, *args = command_str.strip().split()
-
-        options: dict[str, str | Color]
-        args, options = get_options(args)
-
+        start = time.perf_counter()
+        result = self._run(command_str)
+        command = command_str.split()[0]
         if command in all_commands:
-            command_obj = all_commands[command]
-        else:
-            self.output_error(f"`{command}` is not a valid command.")
-            self.output_error("use `help` to see list of available commands`")
-            return False
-
-        invalid_options: tuple[str, ...] = tuple(
-            option for option in options if option not in command_obj.known_options
-        )
+            self.command_stats.record(command, time.perf_counter() - start)
+        return result
+
+    def _run(self, command_str: str) -> bool:
+        """Parse and run a command, marking the parse and validation stages for `profiler`."""
+        with profiler.stage("parse"):
+            command: str
+            args: list[str]
+            command, *args = command_str.strip().split()
+
+            options: dict[str, str | Color] = {}
+            if command in all_commands and not all_commands.raw_args(command):
+                args, options = get_options(args)
+
+        with profiler.stage("validation"):
+            if command not in all_commands:
+                self.output_error(f"`{command}` is not a valid command.")
+                self.output_error("use `help` to see list of available commands`")
+                return False
+
+            # Checked against the command index, the command module is only imported once the input is valid
+            known_options = all_commands.known_options(command)
+            invalid_options: tuple[str, ...] = tuple(option for option in options if option not in known_options)
+
+            if any(option not in known_options for option in options):
+                self.output_error(f"{invalid_options} are not a valid option(s) for the command.")
+                return False
+
+            try:
+                with profiler.stage("parse"):
+                    if "fg" in known_options:
+                        if "fg" in options:
+                            options["fg"] = create_color(options["fg"])
+                        else:
+                            options["fg"] = self.foreground_color
+                    if "bg" in known_options:
+                        if "bg" in options:
+                            options["bg"] = create_color(options["bg"])
+                        else:
+                            options["bg"] = self.background_color
+
+            except ValueError as e:
+                self.output_error(e.args[0])
+                return False
 
-        if any(option not in command_obj.known_options for option in options):
-            self.output_error(f"{invalid_options} are not a valid option(s) for the command.")
-            return False
-
-        try:
-            if "fg" in command_obj.known_options:
-                if "fg" in options:
-                    options["fg"] = create_color(options["fg"])
-                else:
-                    options["fg"] = self.foreground_color
-            if "bg" in command_obj.known_options:
-                if "bg" in options:
-                    options["bg"] = create_color(options["bg"])
-                else:
-                    options["bg"] = self.background_color
-
-        except ValueError as e:
-            self.output_error(e.args[0])
-            return False
+            command_obj = all_commands[command]
 
+        # Time spent by the command itself outside a stage of its own is reported as "other"
         command_obj(self, *args, **options)
-
         return True
 
     def predict_command(self, command_str: str) -> str | None:
         """Predicts the command and arguments the user is typing.
 
-        Argument handling is offloaded to commands predict_args.
+        Argument handling is offloaded to commands predict_args, names, options and colors are completed from
+        the indexes of `completion`.
 
         :param command_str: Currently typed text in terminal.
         :return: The full predicted command with next argument. Returns None on error.
 
         @author Philip
         """
-        if command_str.strip() == "":
-            return ""
-
-        command, *args = command_str.strip().split()
-
-        args, options = get_options(args)
-
-        if command in all_commands:
-            output = command
-            prediction = all_commands[command].predict_args(self, *args, **options)
-            if prediction is None:
-                return None
-            if prediction == "":
-                return command_str
-            if not prediction.startswith(" "):
-                args.pop()
-                prediction = " " + prediction
-            if args:
-                output += " " + " ".join(args)
-            output += prediction
-            return output
-
-        for full_command in all_commands:
-            if full_command.startswith(command):
-                return full_command
-        return None
+        return self.completion.predict(self, command_str)
 
     def output_info(self, output: str) -> None:
         """Output the given input to the display with `info_colour`.
@@ -139,7 +165,22 @@ class Terminal:
 
         @authors Philip
         """
-        self.terminal_display.print_terminal_output(output)
+        with profiler.stage("dom"):
+            self.terminal_display.print_terminal_output(output)
+
+    def output_lines(self, lines: Iterable[str], color: str | None = None) -> None:
+        """Output several lines to the display at once, e.g. a help page or a table.
+
+        The lines are sent to the display together and rendered in the same frame, instead of one by one.
+
+        :param lines: Lines to be printed, without line breaks
+        :param color: Color of the lines, `info_colour` if None
+        :return: None
+        """
+        lines = list(lines)
+        if lines:
+            with profiler.stage("dom"):
+                self.terminal_display.print_terminal_lines(lines, color)
 
     def output_success(self, output: str) -> None:
         """Output the given input to the display with `success_colour`.
@@ -149,7 +190,8 @@ class Terminal:
 
         @author Philip
         """
-        self.terminal_display.print_terminal_output(output, SUCCESS_COLOUR)
+        with profiler.stage("dom"):
+            self.terminal_display.print_terminal_output(output, SUCCESS_COLOUR)
 
     def output_error(self, output: str) -> None:
         """Output the given input to the display with `error_colour`.
@@ -159,4 +201,5 @@ class Terminal:
 
         @author Philip
         """
-        self.terminal_display.print_terminal_output(output, ERROR_COLOUR)
+        with profiler.stage("dom"):
+            self.terminal_display.print_terminal_output(output, ERROR_COLOUR)
@@ -0,0 +1,231 @@
+"""Thumbnails of the image directory, shown by the `gallery` command over the preview.
+
+Thumbnails are keyed by file name, modification time and byte size, so a file written again never hits a stale
+thumbnail. They are kept encoded in an LRU bounded by their total size, JPEG for opaque images and PNG for images
+with transparency, and can also be persisted to a directory. They are made from the file on disk, the image being
+edited is neither decoded again nor evicted to make them.
+
+A `Gallery` sends the thumbnails it has to the display at once and makes the missing ones a few at a time after
+each preview frame, so typing and drawing stay responsive while the gallery fills in.
+"""
+
+import functools
+import hashlib
+import io
+import pathlib
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from typing import TYPE_CHECKING, NamedTuple
+
+from PIL import Image, ImageDraw, UnidentifiedImageError
+
+from image_index import ImageEntry, ImageIndex, image_index
+
+if TYPE_CHECKING:
+    from image import ImageDisplay
+
+# Longest side of a thumbnail in pixels
+THUMBNAIL_SIZE = 160
+# Total size of the encoded thumbnails kept in memory
+THUMBNAIL_CACHE_BYTES = 16 * 1024 * 1024
+# Seconds spent making thumbnails after a frame, so the page stays responsive
+THUMBNAIL_FRAME_BUDGET = 0.008
+JPEG_QUALITY = 85
+
+ThumbnailKey = tuple[str, float, int]
+
+
+class Thumbnail(NamedTuple):
+    """An encoded thumbnail."""
+
+    data: bytes
+    mime_type: str
+
+
+def thumbnail_key(entry: ImageEntry) -> ThumbnailKey:
+    """Return the cache key of a file, which changes whenever the file does."""
+    return entry.name, entry.mtime, entry.bytes
+
+
+def make_thumbnail(path: pathlib.Path, size: int = THUMBNAIL_SIZE) -> Thumbnail:
+    """Decode an image file at a reduced size and encode it as a thumbnail.
+
+    JPEG files are decoded at a reduced scale with `draft`, other formats are shrunk with `reduce` before
+    resampling, so large files cost little more than small ones.
+    """
+    with Image.open(path) as img:
+        img.draft("RGB", (size, size))
+        img.thumbnail((size, size), reducing_gap=2.0)
+        transparent = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        thumbnail = img.convert("RGBA" if transparent else "RGB")
+
+    buffer = io.BytesIO()
+    if transparent:
+        thumbnail.save(buffer, format="PNG")
+        return Thumbnail(buffer.getvalue(), "image/png")
+    thumbnail.save(buffer, format="JPEG", quality=JPEG_QUALITY)
+    return Thumbnail(buffer.getvalue(), "image/jpeg")
+
+
+@functools.cache
+def placeholder_thumbnail(size: int = THUMBNAIL_SIZE) -> Thumbnail:
+    """Return the thumbnail shown for files that can't be read, a crossed out square."""
+    placeholder = Image.new("RGBA", (size, size), (128, 128, 128, 64))
+    draw = ImageDraw.Draw(placeholder)
+    draw.line((0, 0, size - 1, size - 1), fill=(128, 128, 128, 255), width=2)
+    draw.line((0, size - 1, size - 1, 0), fill=(128, 128, 128, 255), width=2)
+    buffer = io.BytesIO()
+    placeholder.save(buffer, format="PNG")
+    return Thumbnail(buffer.getvalue(), "image/png")
+
+
+class ThumbnailCache:
+    """Least recently used thumbnails, bounded by their total size in bytes.
+
+    :param max_bytes: total size of the thumbnails kept in memory
+    :param persist_dir: directory thumbnails are also written to and read back from when not in memory
+    """
+
+    def __init__(self, max_bytes: int = THUMBNAIL_CACHE_BYTES, persist_dir: pathlib.Path | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self.nbytes = 0
+        self._thumbnails: OrderedDict[ThumbnailKey, Thumbnail] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._thumbnails)
+
+    def get(self, key: ThumbnailKey) -> Thumbnail | None:
+        """Return a thumbnail if it is cached, marking it as recently used."""
+        thumbnail = self._thumbnails.get(key)
+        if thumbnail is not None:
+            self._thumbnails.move_to_end(key)
+            return thumbnail
+        thumbnail = self._read(key)
+        if thumbnail is not None:
+            self._keep(key, thumbnail)
+        return thumbnail
+
+    def put(self, key: ThumbnailKey, thumbnail: Thumbnail) -> None:
+        """Cache a thumbnail, evicting the least recently used ones past `max_bytes`."""
+        self._keep(key, thumbnail)
+        if self.persist_dir is not None:
+            self.persist_dir.mkdir(parents=True, exist_ok=True)
+            self._path(key, thumbnail.mime_type).write_bytes(thumbnail.data)
+
+    def discard(self, name: str) -> None:
+        """Drop the thumbnails of a file, e.g. once it changed or was removed."""
+        for key in [key for key in self._thumbnails if key[0] == name]:
+            self.nbytes -= len(self._thumbnails.pop(key).data)
+
+    def _keep(self, key: ThumbnailKey, thumbnail: Thumbnail) -> None:
+        previous = self._thumbnails.pop(key, None)
+        if previous is not None:
+            self.nbytes -= len(previous.data)
+        self._thumbnails[key] = thumbnail
+        self.nbytes += len(thumbnail.data)
+        while self.nbytes > self.max_bytes and len(self._thumbnails) > 1:
+            self.nbytes -= len(self._thumbnails.popitem(last=False)[1].data)
+
+    def _path(self, key: ThumbnailKey, mime_type: str) -> pathlib.Path:
+        name = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        return self.persist_dir / f"{name}.{mime_type.removeprefix('image/')}"
+
+    def _read(self, key: ThumbnailKey) -> Thumbnail | None:
+        if self.persist_dir is None:
+            return None
+        for mime_type in ("image/jpeg", "image/png"):
+            path = self._path(key, mime_type)
+            if path.is_file():
+                return Thumbnail(path.read_bytes(), mime_type)
+        return None
+
+
+class Gallery:
+    """Thumbnails of image files shown on an image display, the missing ones made after each frame.
+
+    :param display: the display the gallery is shown on
+    :param defer: schedules a task after the next frame, e.g. `RenderScheduler.defer`
+    :param index: the index of the image directory
+    :param cache: where thumbnails are kept
+    """
+
+    def __init__(
+        self,
+        display: "ImageDisplay",
+        defer: Callable[[Callable[[], None]], None],
+        index: ImageIndex = image_index,
+        cache: ThumbnailCache | None = None,
+    ) -> None:
+        self.display = display
+        self.defer = defer
+        self.index = index
+        self.cache = thumbnails if cache is None else cache
+        self.names: list[str] = []
+        self.open = False
+        self._pending: deque[str] = deque()
+        self._scheduled = False
+        index.subscribe(self._on_index_change)
+
+    def show(self, names: list[str]) -> int:
+        """Show the thumbnails of the files, return how many still have to be made."""
+        # Refreshed first, so the files it reads now aren't queued again as changes
+        self.index.refresh()
+        # Files removed since the names were listed are left out
+        entries = {name: entry for name in names if (entry := self.index.get(name)) is not None}
+        self.names = list(entries)
+        self.open = True
+        self._pending.clear()
+        self.display.show_gallery(self.names)
+        for name, entry in entries.items():
+            thumbnail = self.cache.get(thumbnail_key(entry))
+            if thumbnail is None:
+                self._pending.append(name)
+            else:
+                self.display.show_thumbnail(name, thumbnail.data, thumbnail.mime_type)
+        self._schedule()
+        return len(self._pending)
+
+    def close(self) -> None:
+        """Hide the gallery and stop making thumbnails for it."""
+        if self.open:
+            self.open = False
+            self._pending.clear()
+            self.display.hide_gallery()
+
+    def _schedule(self) -> None:
+        if self._pending and not self._scheduled:
+            self._scheduled = True
+            self.defer(self._make_pending)
+
+    def _make_pending(self) -> None:
+        """Make thumbnails until the frame budget is spent, then continue after the next frame."""
+        self._scheduled = False
+        deadline = time.perf_counter() + THUMBNAIL_FRAME_BUDGET
+        while self._pending and time.perf_counter() < deadline:
+            name = self._pending.popleft()
+            entry = self.index.get(name)
+            if entry is None:
+                continue
+            key = thumbnail_key(entry)
+            thumbnail = self.cache.get(key)
+            if thumbnail is None:
+                try:
+                    thumbnail = make_thumbnail(self.index.directory / name)
+                # Files too large to open, or not images, get a placeholder and are tried again once they change
+                except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+                    thumbnail = placeholder_thumbnail()
+                else:
+                    self.cache.put(key, thumbnail)
+            self.display.show_thumbnail(name, thumbnail.data, thumbnail.mime_type)
+        self._schedule()
+
+    def _on_index_change(self, name: str, entry: ImageEntry | None) -> None:
+        if self.open and entry is not None and name in self.names and name not in self._pending:
+            self._pending.append(name)
+            self._schedule()
+
+
+thumbnails = ThumbnailCache()
+image_index.subscribe(lambda name, _entry: thumbnails.discard(name))
@@ -0,0 +1,82 @@
+"""Timestamps of the startup phases, reported by the `startup` command.
+
+Phases are marked with wall clock timestamps in milliseconds since the epoch, in JS as
+`performance.timeOrigin + performance.now()`. This keeps marks from the page and from a worker, which have
+different time origins, on one timeline. Outside the browser `time.time` is used instead.
+"""
+
+import json
+import time
+from collections.abc import Callable, Mapping
+from typing import Any
+
+try:
+    import js  # type: ignore[import]
+except ImportError:
+    js = None
+
+# Mark of the last phase, the report is published once it is reached.
+FINAL_PHASE = "first_frame"
+
+
+def now() -> float:
+    """Return the current time in milliseconds since the epoch, with sub-millisecond precision in the browser."""
+    if js is not None:
+        return js.performance.timeOrigin + js.performance.now()
+    return time.time() * 1000
+
+
+class StartupTimeline:
+    """Marks of the startup phases, in the order they were reached.
+
+    The page passes the marks it took in JS to `record`, Python marks later phases with `mark`.
+    Once `FINAL_PHASE` is marked the report is handed to `publish`, if set.
+    """
+
+    def __init__(self) -> None:
+        self.origin: float | None = None
+        self.marks: dict[str, float] = {}
+        self.publish: Callable[[dict[str, Any]], None] | None = None
+
+    def record(self, marks: Mapping[str, float], origin: float | None = None) -> None:
+        """Add marks taken elsewhere.
+
+        :param marks: timestamps by phase
+        :param origin: when the page started loading, phases are reported relative to it
+        """
+        if origin is not None:
+            self.origin = origin
+        for phase, timestamp in marks.items():
+            self.marks.setdefault(phase, float(timestamp))
+
+    def mark(self, phase: str) -> None:
+        """Mark a phase as reached now, a phase is only marked the first time."""
+        if phase in self.marks:
+            return
+        self.marks[phase] = now()
+        if phase == FINAL_PHASE and self.publish is not None:
+            self.publish(self.report())
+
+    def report(self) -> dict[str, Any]:
+        """Return the phases with when they ended and how long they took, in milliseconds."""
+        ordered = sorted(self.marks.items(), key=lambda mark: mark[1])
+        origin = self.origin if self.origin is not None else (ordered[0][1] if ordered else 0.0)
+        phases = []
+        previous = origin
+        for phase, timestamp in ordered:
+            phases.append({"phase": phase, "end_ms": timestamp - origin, "duration_ms": timestamp - previous})
+            previous = timestamp
+        return {"origin": origin, "total_ms": previous - origin, "phases": phases}
+
+    def to_json(self) -> str:
+        """Return the report as JSON."""
+        return json.dumps(self.report())
+
+
+def publish_to_page(report: dict[str, Any]) -> None:
+    """Expose a startup report to scripts on the page as `globalThis.startupTiming`."""
+    if js is not None:
+        js.globalThis.startupTiming = js.JSON.parse(json.dumps(report))
+
+
+startup = StartupTimeline()
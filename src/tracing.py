@@ -0,0 +1,183 @@
+"""Spans of engine and GUI work, exported as Chrome trace events by the `trace` command.
+
+Functions are traced with the `tracer.traced()` decorator, blocks of code with `tracer.span(name)`. While tracing
+is stopped a traced call costs one attribute check. Spans are kept in a ring buffer, the oldest are dropped once
+it is full. The export loads in chrome://tracing and https://ui.perfetto.dev.
+
+Timestamps are taken with `time.perf_counter` and placed on the wall clock timeline of `timing.now` when tracing
+starts, so spans of the page and of a worker line up in one trace.
+"""
+
+import functools
+import json
+import time
+from collections import deque
+from collections.abc import Callable, Iterable
+from types import TracebackType
+from typing import Any, ParamSpec, TypeVar
+
+from timing import now
+
+try:
+    import js  # type: ignore[import]
+    from pyodide.ffi import create_once_callable, to_js
+except ImportError:
+    js = None
+
+# Number of spans kept, about 1 MB of trace JSON.
+TRACE_CAPACITY = 10_000
+TRACE_FILE = "trace.json"
+
+P = ParamSpec("P")
+R = TypeVar("R")
+# A span: name, category, start and end in seconds of `time.perf_counter`.
+Span = tuple[str, str, float, float]
+TraceEvent = dict[str, Any]
+
+
+class _Span:
+    """Context manager recording the time spent inside it as a span."""
+
+    __slots__ = ("category", "name", "start", "tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.start: float | None = None
+
+    def __enter__(self) -> None:
+        if self.tracer.enabled:
+            self.start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.tracer.enabled and self.start is not None:
+            self.tracer.spans.append((self.name, self.category, self.start, time.perf_counter()))
+
+
+class Tracer:
+    """Records spans into a ring buffer while enabled.
+
+    `thread_name` and `tid` tell the page and a worker apart in the trace. In a worker `relay` is set to hand
+    `start`, `stop` and `dump` to the page, which traces the GUI and downloads the trace.
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY, thread_name: str = "page", tid: int = 1) -> None:
+        self.enabled = False
+        self.spans: deque[Span] = deque(maxlen=capacity)
+        self.thread_name = thread_name
+        self.tid = tid
+        self.relay: Callable[[str, list[TraceEvent]], None] | None = None
+        self._origin = 0.0
+
+    def span(self, name: str, category: str = "engine") -> _Span:
+        """Return a context manager recording the time spent in it as a span."""
+        return _Span(self, name, category)
+
+    def traced(self, name: str | None = None, category: str = "engine") -> Callable[[Callable[P, R]], Callable[P, R]]:
+        """Decorate a function to record each call as a span.
+
+        :param name: name of the span, the qualified name of the function by default
+        :param category: category of the span, traces can be filtered by it
+        """
+
+        def decorate(func: Callable[P, R]) -> Callable[P, R]:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.spans.append((span_name, category, start, time.perf_counter()))
+
+            return wrapper
+
+        return decorate
+
+    def start(self) -> None:
+        """Clear the recorded spans and start tracing."""
+        self.spans.clear()
+        self._origin = now() - time.perf_counter() * 1000
+        self.enabled = True
+        if self.relay is not None:
+            self.relay("start", [])
+
+    def stop(self) -> None:
+        """Stop tracing, the recorded spans are kept until tracing starts again."""
+        self.enabled = False
+        if self.relay is not None:
+            self.relay("stop", [])
+
+    def trace_events(self) -> list[TraceEvent]:
+        """Return the recorded spans as Chrome trace events, timestamps in microseconds since the epoch."""
+        events: list[TraceEvent] = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": self.tid, "args": {"name": self.thread_name}},
+        ]
+        for name, category, start, end in self.spans:
+            events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (self._origin + start * 1000) * 1000,
+                    "dur": (end - start) * 1_000_000,
+                    "pid": 1,
+                    "tid": self.tid,
+                },
+            )
+        return events
+
+    def to_json(self, other_events: Iterable[TraceEvent] = ()) -> str:
+        """Return the trace in Chrome's JSON trace format.
+
+        :param other_events: trace events recorded elsewhere, e.g. by the engine in a worker
+        """
+        return json.dumps({"traceEvents": [*other_events, *self.trace_events()], "displayTimeUnit": "ms"})
+
+    def dump(self) -> bool:
+        """Download the trace, from a worker by handing the spans to the page.
+
+        :return: False if the trace can't be downloaded outside the browser
+        """
+        if self.relay is not None:
+            self.relay("dump", self.trace_events())
+            return True
+        return self.download()
+
+    def download(self, other_events: Iterable[TraceEvent] = ()) -> bool:
+        """Download the trace as `TRACE_FILE` from the page.
+
+        :param other_events: trace events recorded elsewhere, e.g. by the engine in a worker
+        :return: False if there is no page to download from
+        """
+        return download_file(self.to_json(other_events), TRACE_FILE, "application/json")
+
+
+def download_file(text: str, filename: str, mime_type: str) -> bool:
+    """Let the browser download text as a file through a Blob object URL.
+
+    :return: False outside of the page, where nothing can be downloaded
+    """
+    if js is None or not hasattr(js, "document"):
+        return False
+    blob = js.Blob.new(to_js([text]), to_js({"type": mime_type}, dict_converter=js.Object.fromEntries))
+    url = js.URL.createObjectURL(blob)
+    link = js.document.createElement("a")
+    link.href = url
+    link.download = filename
+    link.click()
+    # The download reads the Blob asynchronously, the URL is only revoked once it had the chance to start
+    js.setTimeout(create_once_callable(lambda: js.URL.revokeObjectURL(url)), 0)
+    return True
+
+
+tracer = Tracer()
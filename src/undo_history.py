@@ -0,0 +1,232 @@
+import zlib
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from PIL import Image
+
+from render_scheduler import Box
+
+TILE_SIZE = 64
+# zlib level used for stored pixels, edits are mostly flat fills so fast levels already compress well.
+COMPRESSION_LEVEL = 3
+# Memory the history may hold before the oldest entries are dropped.
+DEFAULT_BUDGET = 64 * 1024 * 1024
+DEFAULT_MAX_LEVELS = 100
+
+
+def image_nbytes(img: Image.Image) -> int:
+    """Return the approximate memory used by an image's pixels."""
+    return img.width * img.height * len(img.getbands())
+
+
+class StoredPixels:
+    """Pixels of a tile or image kept in the history.
+
+    Pixels start out as an image and are zlib compressed by `compress`, they are only decompressed when restored.
+    """
+
+    def __init__(self, img: Image.Image) -> None:
+        self.mode = img.mode
+        self.size = img.size
+        self.palette = img.getpalette() if img.mode in ("P", "PA") else None
+        self._image: Image.Image | None = img
+        self._data: bytes | None = None
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the pixels have been compressed."""
+        return self._data is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored pixels."""
+        if self._data is not None:
+            return len(self._data)
+        return image_nbytes(self._image)
+
+    def compress(self) -> None:
+        """Replace the stored image by its compressed pixels."""
+        if self._image is None:
+            return
+        self._data = zlib.compress(self._image.tobytes(), COMPRESSION_LEVEL)
+        self._image = None
+
+    def image(self) -> Image.Image:
+        """Return the stored pixels as an image."""
+        if self._image is not None:
+            return self._image
+        img = Image.frombytes(self.mode, self.size, zlib.decompress(self._data))
+        if self.palette is not None:
+            img.putpalette(self.palette)
+        return img
+
+
+@dataclass
+class HistoryEntry:
+    """Pixels an edit replaced.
+
+    Either the tiles the edit touched, keyed by the top left corner of the tile,
+    or the whole image when the edit replaced or resized it.
+    """
+
+    tiles: dict[tuple[int, int], StoredPixels] = field(default_factory=dict)
+    image: StoredPixels | None = None
+
+    @property
+    def pixels(self) -> list[StoredPixels]:
+        """All stored pixels of the entry."""
+        return [self.image] if self.image is not None else list(self.tiles.values())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the stored pixels."""
+        return sum(pixels.nbytes for pixels in self.pixels)
+
+
+class UndoHistory:
+    """Multi-level undo/redo history storing only the tiles each edit changed.
+
+    `record` is called before an edit with the region it is about to change, the tiles covering that region are
+    copied. Undoing swaps those tiles with the current pixels, which become the redo entry, so undo and redo
+    cost scales with the edited area rather than the image size.
+
+    Stored pixels are zlib compressed after the edit returns: new pixels are queued and `defer` is asked to run
+    `compress_pending` later, without it they are compressed right away.
+
+    The oldest entries are dropped once the history holds more than `max_levels` entries or, once compressed,
+    more than `budget` bytes. Redo entries count toward the budget and are dropped last.
+    """
+
+    def __init__(
+        self,
+        tile_size: int = TILE_SIZE,
+        budget: int = DEFAULT_BUDGET,
+        max_levels: int = DEFAULT_MAX_LEVELS,
+        defer: Callable[[Callable[[], None]], None] | None = None,
+    ) -> None:
+        self.tile_size = tile_size
+        self.budget = budget
+        self.max_levels = max_levels
+        self.defer = defer
+        self._undo: deque[HistoryEntry] = deque()
+        self._redo: list[HistoryEntry] = []
+        self._pending: list[StoredPixels] = []
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by all stored entries."""
+        return sum(entry.nbytes for entry in self._undo) + sum(entry.nbytes for entry in self._redo)
+
+    @property
+    def undo_levels(self) -> int:
+        """Number of edits that can be undone."""
+        return len(self._undo)
+
+    @property
+    def redo_levels(self) -> int:
+        """Number of undone edits that can be redone."""
+        return len(self._redo)
+
+    def clear(self) -> None:
+        """Forget all entries."""
+        self._undo.clear()
+        self._redo.clear()
+        self._pending.clear()
+
+    def compress_pending(self) -> None:
+        """Compress pixels stored since the last call and drop entries over the budget."""
+        pending, self._pending = self._pending, []
+        for pixels in pending:
+            pixels.compress()
+        self._evict()
+
+    def tile_boxes(self, img: Image.Image, box: Box) -> list[Box]:
+        """Return the boxes of the tiles covering a region of the image."""
+        size = self.tile_size
+        left, upper = max(box[0], 0), max(box[1], 0)
+        right, lower = min(box[2], img.width), min(box[3], img.height)
+        return [
+            (x, y, min(x + size, img.width), min(y + size, img.height))
+            for y in range(upper - upper % size, lower, size)
+            for x in range(left - left % size, right, size)
+        ]
+
+    def record(self, img: Image.Image, box: Box | None = None) -> None:
+        """Save the pixels an edit is about to change, clearing the redo entries.
+
+        :param img: the image before the edit
+        :param box: region the edit changes, None if it replaces the whole image
+        """
+        if box is None:
+            entry = HistoryEntry(image=StoredPixels(img.copy()))
+        else:
+            entry = HistoryEntry(tiles={tile[:2]: StoredPixels(img.crop(tile)) for tile in self.tile_boxes(img, box)})
+
+        self._redo.clear()
+        self._undo.append(entry)
+        while len(self._undo) > max(self.max_levels, 1):
+            self._undo.popleft()
+        self._queue(entry)
+
+    def undo(self, img: Image.Image) -> tuple[Image.Image, list[Box] | None] | None:
+        """Revert the last recorded edit.
+
+        :param img: the current image, tiles are restored into it in place
+        :return: the image to display and the regions that changed (None if all of it), None if nothing to undo
+        """
+        if not self._undo:
+            return None
+        img, redo_entry, regions = self._swap(img, self._undo.pop())
+        self._redo.append(redo_entry)
+        self._queue(redo_entry)
+        return img, regions
+
+    def redo(self, img: Image.Image) -> tuple[Image.Image, list[Box] | None] | None:
+        """Reapply the last undone edit.
+
+        :param img: the current image, tiles are restored into it in place
+        :return: the image to display and the regions that changed (None if all of it), None if nothing to redo
+        """
+        if not self._redo:
+            return None
+        img, undo_entry, regions = self._swap(img, self._redo.pop())
+        self._undo.append(undo_entry)
+        self._queue(undo_entry)
+        return img, regions
+
+    def _swap(self, img: Image.Image, entry: HistoryEntry) -> tuple[Image.Image, HistoryEntry, list[Box] | None]:
+        """Restore an entry, returning the new image, an entry with the replaced pixels and the changed regions."""
+        if entry.image is not None:
+            return entry.image.image(), HistoryEntry(image=StoredPixels(img)), None
+
+        replaced = HistoryEntry()
+        regions = []
+        for (x, y), tile in entry.tiles.items():
+            box = (x, y, x + tile.size[0], y + tile.size[1])
+            replaced.tiles[x, y] = StoredPixels(img.crop(box))
+            img.paste(tile.image(), box)
+            regions.append(box)
+        return img, replaced, regions
+
+    def _queue(self, entry: HistoryEntry) -> None:
+        """Queue the pixels of a new entry for compression."""
+        if self.defer is None:
+            for pixels in entry.pixels:
+                pixels.compress()
+            self._evict()
+            return
+        if not self._pending:
+            self.defer(self.compress_pending)
+        self._pending.extend(entry.pixels)
+
+    def _evict(self) -> None:
+        """Drop the oldest entries until the history fits its budget, always keeping the newest edit.
+
+        Redo entries are dropped too, the furthest first, once dropping undo entries isn't enough.
+        """
+        nbytes = self.nbytes
+        while nbytes > self.budget and len(self._undo) > 1:
+            nbytes -= self._undo.popleft().nbytes
+        while nbytes > self.budget and self._redo:
+            nbytes -= self._redo.pop(0).nbytes
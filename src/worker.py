@@ -0,0 +1,42 @@
+"""Entry point of the engine inside a Web Worker, started by `public/worker.js`."""
+
+from collections.abc import Callable
+from typing import Any
+
+import js  # type: ignore[import]
+from pyodide.ffi import create_once_callable
+
+from engine import Engine
+from engine_protocol import startup_report_message, trace_message
+from js_channel import JsChannel
+from timing import startup
+from tracing import tracer
+
+# Render interval when the worker has no requestAnimationFrame.
+FRAME_INTERVAL_MS = 16
+
+
+def request_frame(callback: Callable[[Any], None]) -> None:
+    """Schedule a callback for the next frame, from inside the worker."""
+    if hasattr(js, "requestAnimationFrame"):
+        js.requestAnimationFrame(create_once_callable(callback))
+    else:
+        js.setTimeout(create_once_callable(callback), FRAME_INTERVAL_MS)
+
+
+def main(pending: Any = None, startup_marks: Any = None) -> Engine:  # noqa: ANN401
+    """Start the engine and handle the messages the page sent while Python was loading.
+
+    :param pending: `data` of the message events received before the engine started
+    :param startup_marks: timestamps of the phases the worker went through while loading, by phase
+    """
+    channel = JsChannel(js)
+    if startup_marks is not None:
+        startup.record(startup_marks.to_py())
+    startup.publish = lambda report: channel.post(startup_report_message(report))
+    tracer.thread_name, tracer.tid = "worker", 2
+    tracer.relay = lambda action, events: channel.post(trace_message(action, events))
+    engine = Engine(channel, request_frame)
+    for data in pending or ():
+        channel.receive(data)
+    return engine